@@ -0,0 +1,107 @@
+"""Board-level authorization helpers.
+
+Every card, list, checklist, checklist item, label and attachment belongs to
+exactly one board, and access is granted per board (owner or member). This
+module resolves any of those objects to its board in a single joined query.
+
+``has_board_access`` reads the board's owner and version by primary key on
+every check, so a deleted board or a changed membership is seen at once by
+every worker process. Owners need nothing more; for members the answer is
+cached per process against the board version, which every membership change
+bumps, so a cached answer is only reused while the membership is unchanged.
+Both are also kept on ``flask.g`` for the rest of the request.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import abort, g, has_app_context
+
+from models import db, Board, BoardMember, Card, Checklist, ChecklistItem, FileAttachment, Label, List
+
+# Users whose membership answers are kept, least recently used dropped first
+CACHE_SIZE = 1024
+
+# user_id -> {board_id: (board version, is member)}
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _per_request(name):
+    return g.setdefault(name, {}) if has_app_context() else {}
+
+
+def accessible_board_ids(user_id):
+    """Return the frozenset of ids of boards the user owns or is a member of"""
+    per_request = _per_request('_board_access')
+    if user_id not in per_request:
+        per_request[user_id] = frozenset(db.session.execute(db.union(
+            db.select(Board.id).where(Board.user_id == user_id),
+            db.select(BoardMember.board_id).where(BoardMember.user_id == user_id)
+        )).scalars())
+    return per_request[user_id]
+
+
+def _is_member(board_id, user_id, version):
+    with _cache_lock:
+        cached = _cache.get(user_id, {}).get(board_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    is_member = db.session.execute(db.select(BoardMember.id).where(
+        BoardMember.board_id == board_id, BoardMember.user_id == user_id
+    ).limit(1)).first() is not None
+    with _cache_lock:
+        _cache.setdefault(user_id, {})[board_id] = (version, is_member)
+        _cache.move_to_end(user_id)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return is_member
+
+
+def has_board_access(board_id, user_id):
+    per_request = _per_request('_board_access_checks')
+    key = (user_id, board_id)
+    if key not in per_request:
+        board = db.session.execute(
+            db.select(Board.user_id, Board.version).where(Board.id == board_id)
+        ).first()
+        per_request[key] = board is not None and (
+            board.user_id == user_id or _is_member(board_id, user_id, board.version)
+        )
+    return per_request[key]
+
+
+def invalidate_board_access(user_ids):
+    """Forget cached board access for the given users, in this process and request"""
+    per_request = _per_request('_board_access')
+    checks = _per_request('_board_access_checks')
+    with _cache_lock:
+        for user_id in user_ids:
+            _cache.pop(user_id, None)
+            per_request.pop(user_id, None)
+    for key in [key for key in checks if key[0] in user_ids]:
+        del checks[key]
+
+
+def _with_board_id(model):
+    if model in (List, Label):
+        return db.session.query(model, model.board_id)
+
+    query = db.session.query(model, List.board_id)
+    if model is ChecklistItem:
+        query = query.join(Checklist, Checklist.id == ChecklistItem.checklist_id).join(
+            Card, Card.id == Checklist.card_id
+        )
+    elif model is Checklist:
+        query = query.join(Card, Card.id == Checklist.card_id)
+    elif model is FileAttachment:
+        query = query.join(Card, Card.id == FileAttachment.card_id)
+    return query.join(List, List.id == Card.list_id)
+
+
+def get_with_board_or_404(model, object_id):
+    """Load ``model`` by id together with its board id in one query, or abort with 404"""
+    row = _with_board_id(model).filter(model.id == object_id).first()
+    if row is None:
+        abort(404)
+    return row
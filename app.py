@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
+from flask import Flask, Response, abort, g, render_template, request, jsonify, redirect, url_for, send_file, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from models import (
     db,
@@ -11,17 +11,54 @@ from models import (
     Checklist,
     ChecklistItem,
     Label,
+    BoardChange,
+    UploadSession,
     card_labels,
+    is_label_color,
 )
-from datetime import datetime
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+import base64
+import io
+import json
+import logging
+import mimetypes
 import os
+import re
+import threading
 import uuid
+import zlib
+from urllib.parse import quote
+from werkzeug.exceptions import HTTPException, RequestedRangeNotSatisfiable
 from werkzeug.utils import secure_filename
+import blob_store
+import board_transfer
+import database
+import chunked_uploads
+import compression
+import json_provider
+import live_updates
+import metrics
+import ranking
+import search_index
+import structured_logging
+import thumbnails
+from access import (
+    accessible_board_ids,
+    get_with_board_or_404,
+    has_board_access,
+    invalidate_board_access,
+)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///taskhive.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+structured_logging.init_app(app)
+json_provider.init_app(app)
+
+logger = logging.getLogger(__name__)
+# Board payload building runs on every board open; sample it with LOG_SAMPLING
+board_load_logger = logging.getLogger(f'{__name__}.board_load')
 
 # Configuration for file uploads
 UPLOAD_FOLDER = 'uploads'
@@ -29,14 +66,34 @@ ALLOWED_EXTENSIONS = {
     'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx',
     'xls', 'xlsx', 'ppt', 'pptx', 'zip', 'rar', 'mp4', 'mp3', 'avi', 'mov', 'wav'
 }
-MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
+MAX_FILE_SIZE = 1024 * 1024 * 1024  # 1GB, enforced while chunked uploads stream in
+MAX_FORM_UPLOAD_SIZE = 16 * 1024 * 1024  # 16MB, single-request multipart uploads
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Chunk size suggested to clients
+UPLOAD_SESSION_TTL = timedelta(days=1)  # Unfinished uploads idle this long are discarded
+UPLOAD_CLAIM_TIMEOUT = timedelta(minutes=10)  # A chunk writer holding its claim this long is presumed dead
+# Thumbnail sizes (see thumbnails.py) shown on board cards and in the card modal
+BOARD_THUMBNAIL_SIZE = 320
+CARD_THUMBNAIL_SIZE = 800
+# Types the browser may display in place (?inline=1) rather than download
+INLINE_MIME_PREFIXES = ('image/', 'video/', 'audio/', 'application/pdf')
+# How downloads are sent: 'none' streams them from Python; 'x-sendfile' (Apache,
+# lighttpd) and 'x-accel-redirect' (nginx) hand the file to the front proxy
+ATTACHMENT_OFFLOAD_MODES = ('none', 'x-sendfile', 'x-accel-redirect')
+ATTACHMENT_OFFLOAD = os.environ.get('ATTACHMENT_OFFLOAD', 'none').lower()
+# Internal proxy location that serves UPLOAD_FOLDER (x-accel-redirect only)
+ATTACHMENT_OFFLOAD_PREFIX = os.environ.get('ATTACHMENT_OFFLOAD_PREFIX', '/_protected_uploads/')
+if ATTACHMENT_OFFLOAD not in ATTACHMENT_OFFLOAD_MODES:
+    raise ValueError(f'ATTACHMENT_OFFLOAD must be one of {", ".join(ATTACHMENT_OFFLOAD_MODES)}')
 
 # Ensure upload directory exists
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['ATTACHMENT_OFFLOAD'] = ATTACHMENT_OFFLOAD
+app.config['ATTACHMENT_OFFLOAD_PREFIX'] = ATTACHMENT_OFFLOAD_PREFIX
 
+database.init_app(app)
 db.init_app(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -44,7 +101,11 @@ login_manager.login_view = 'login'
 
 # Ensure DB tables exist when the app starts (for Render / gunicorn)
 with app.app_context():
-    db.create_all()
+    database.create_tables()
+
+search_index.init_app(app)
+metrics.metrics.init_app(app)
+compression.init_app(app)
 
 
 
@@ -77,22 +138,235 @@ def get_file_icon(mime_type, filename):
     return icon_map.get(extension, '📎')  # Default paperclip icon
 
 
-def has_board_access(board_id, user_id):
+# The change log keeps the last BOARD_CHANGE_RETENTION versions of each board;
+# older entries are deleted every BOARD_CHANGE_PRUNE_INTERVAL versions, and a
+# client further behind than that reloads the whole board
+BOARD_CHANGE_RETENTION = 1000
+BOARD_CHANGE_PRUNE_INTERVAL = 100
+
+
+def bump_board_version(board_id):
+    """Increment a board's version so cached snapshots and ETags go stale.
+
+    Returns the new version. The UPDATE takes the write lock, so reading the
+    value back in the same transaction is safe against concurrent writers.
+    """
+    db.session.execute(
+        db.update(Board).where(Board.id == board_id).values(version=Board.version + 1)
+    )
+    return db.session.execute(
+        db.select(Board.version).where(Board.id == board_id)
+    ).scalar_one()
+
+
+def mark_board_changed(board_id):
+    """Wake the board's live update streams once this transaction commits"""
+    db.session.info.setdefault('changed_boards', set()).add(board_id)
+
+
+def record_changes(board_id, changes):
+    """Bump the board version once and log ``(entity_type, entity_id, action)`` changes.
+
+    Must be called before the commit of every request that changes what
+    get_board returns, so the version bump and the change log land in the
+    same transaction as the change itself.
+    """
+    version = bump_board_version(board_id)
+    mark_board_changed(board_id)
+    db.session.execute(db.insert(BoardChange), [{
+        'board_id': board_id,
+        'version': version,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'action': action
+    } for entity_type, entity_id, action in changes])
+    if version % BOARD_CHANGE_PRUNE_INTERVAL == 0:
+        db.session.execute(db.delete(BoardChange).where(
+            BoardChange.board_id == board_id,
+            BoardChange.version <= version - BOARD_CHANGE_RETENTION
+        ))
+    return version
+
+
+def record_change(board_id, entity_type, entity_id, action):
+    return record_changes(board_id, [(entity_type, entity_id, action)])
+
+
+def in_batch():
+    return g.get('batch_after_commit') is not None
+
+
+def commit_request():
+    """Commit the request's changes; inside /api/batch only flush them, as the batch commits once at the end"""
+    if in_batch():
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def after_commit(function, *args):
+    """Call ``function(*args)`` once the request's changes are committed (straight away outside a batch)"""
+    if in_batch():
+        g.batch_after_commit.append((function, args))
+    else:
+        function(*args)
+
+
+def refresh_board_access(user_ids):
+    """Forget cached board access of ``user_ids`` after their boards or memberships changed.
+
+    In a batch the cache is dropped at once, so later operations see the
+    change, and again after the commit, so no other request keeps what it
+    read in between.
+    """
+    invalidate_board_access(user_ids)
+    if in_batch():
+        after_commit(invalidate_board_access, user_ids)
+
+
+# Serialized board snapshots keyed by (board_id, version, is_owner, cards_limit). Entries
+# never go stale because any change bumps the version; old ones age out LRU.
+BOARD_CACHE_SIZE = 256
+_board_cache = OrderedDict()
+_board_cache_lock = threading.Lock()
+
+
+def get_cached_board(key):
+    with _board_cache_lock:
+        body = _board_cache.get(key)
+        if body is not None:
+            _board_cache.move_to_end(key)
+        return body
+
+
+def store_cached_board(key, body):
+    with _board_cache_lock:
+        _board_cache[key] = body
+        _board_cache.move_to_end(key)
+        while len(_board_cache) > BOARD_CACHE_SIZE:
+            _board_cache.popitem(last=False)
+
+
+# Ordered siblings share a scope: lists per board, cards per list, items per checklist
+RANKED_SCOPES = {
+    List: List.board_id,
+    Card: Card.list_id,
+    ChecklistItem: ChecklistItem.checklist_id,
+}
+
+
+def is_id_list(value):
+    return isinstance(value, list) and all(isinstance(item, int) and not isinstance(item, bool) for item in value)
+
+
+def lock_board(board_id):
+    """Hold the board's write lock until commit.
+
+    Taken before reading sibling positions, so keys computed from them are
+    still current when written, even with the rebalancer running.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        # No row locks in SQLite: a no-op write takes the database write lock
+        db.session.execute(
+            db.update(Board).where(Board.id == board_id).values(version=Board.version),
+            execution_options={'synchronize_session': False}
+        )
+    else:
+        db.session.execute(db.select(Board.id).where(Board.id == board_id).with_for_update())
+
+
+def resolve_position(board_id, model, scope_id, data, item_id=None):
+    """Rank key for an item placed in ``scope_id`` as described by ``data``.
+
+    ``after_id`` puts the item right after that sibling, otherwise
+    ``before_id`` right before it; a raw ``position`` rank key is taken as is.
+    With none of them the item goes last. Only the item's own row changes.
+    """
+    lock_board(board_id)
+    scope = RANKED_SCOPES[model]
+    siblings = db.session.query(model.position).filter(scope == scope_id, model.id != item_id)
+
+    def sibling_key(sibling_id):
+        key = siblings.filter(model.id == sibling_id).scalar()
+        if key is None:
+            raise ranking.RankError(f'{sibling_id} is not a sibling of this item')
+        return key
+
+    if data.get('after_id') is not None:
+        lower = sibling_key(data['after_id'])
+        upper = siblings.filter(model.position > lower).with_entities(db.func.min(model.position)).scalar()
+        return ranking.key_between(lower, upper)
+    if data.get('before_id') is not None:
+        upper = sibling_key(data['before_id'])
+        lower = siblings.filter(model.position < upper).with_entities(db.func.max(model.position)).scalar()
+        return ranking.key_between(lower, upper)
+    if data.get('position') is not None:
+        ranking.validate_key(data['position'])
+        return data['position']
+    return ranking.key_between(siblings.with_entities(db.func.max(model.position)).scalar(), None)
+
+
+def rebalance_positions(model, scope_id):
+    """Rewrite all keys of one scope as short, evenly spaced keys in current order"""
+    if model is List:
+        board_id = scope_id
+    elif model is Card:
+        board_id = db.session.query(List.board_id).filter(List.id == scope_id).scalar()
+    else:
+        board_id = db.session.query(List.board_id).join(Card).join(Checklist).filter(
+            Checklist.id == scope_id
+        ).scalar()
+    if board_id is None:
+        return
+    lock_board(board_id)
+
+    scope = RANKED_SCOPES[model]
+    ids = db.session.execute(
+        db.select(model.id).where(scope == scope_id).order_by(model.position, model.id)
+    ).scalars().all()
+    if not ids:
+        return
+    positions = dict(zip(ids, ranking.evenly_spaced_keys(len(ids))))
+    db.session.execute(
+        db.update(model).where(model.id.in_(ids)).values(position=db.case(positions, value=model.id)),
+        execution_options={'synchronize_session': False}
+    )
+
+    if model is ChecklistItem:
+        record_change(board_id, 'checklist', scope_id, 'updated')
+    else:
+        entity_type = 'list' if model is List else 'card'
+        record_changes(board_id, [(entity_type, item_id, 'updated') for item_id in ids])
+
+
+_pending_rebalances = set()
+_rebalance_lock = threading.Lock()
+
+
+def _run_rebalance(model, scope_id):
     try:
-        board = Board.query.get(board_id)
-        if not board:
-            return False
+        with app.app_context():
+            rebalance_positions(model, scope_id)
+            db.session.commit()
+    except Exception:
+        logger.exception('Error rebalancing %s positions in %s', model.__name__, scope_id)
+    finally:
+        with _rebalance_lock:
+            _pending_rebalances.discard((model, scope_id))
 
-        # User is owner
-        if board.user_id == user_id:
-            return True
 
-        # User is member
-        member = BoardMember.query.filter_by(board_id=board_id, user_id=user_id).first()
-        return member is not None
-    except Exception as e:
-        print(f"DEBUG: Error in has_board_access: {str(e)}")
-        return False
+def rebalance_if_needed(model, scope_id, *keys):
+    """Respace a scope in the background once any of ``keys`` has grown too long.
+
+    Call after the commit that wrote ``keys`` so the rebalancer sees them.
+    """
+    if not any(ranking.needs_rebalance(key) for key in keys):
+        return
+    with _rebalance_lock:
+        if (model, scope_id) in _pending_rebalances:
+            return
+        _pending_rebalances.add((model, scope_id))
+    threading.Thread(target=_run_rebalance, args=(model, scope_id), daemon=True).start()
 
 
 @app.route('/')
@@ -102,17 +376,150 @@ def index():
     return render_template('index.html')
 
 
+# Dashboard helpers
+DASHBOARD_PAGE_SIZE = 24
+DASHBOARD_MAX_PAGE_SIZE = 100
+# Sort name: direction; every order is tie-broken by board id in the same direction
+DASHBOARD_SORTS = {'activity': 'desc', 'created': 'desc', 'title': 'asc'}
+
+
+def board_last_activity():
+    """When the board last changed: its newest change log entry, or its creation"""
+    latest_change = db.select(BoardChange.created_at).where(
+        BoardChange.board_id == Board.id
+    ).order_by(BoardChange.version.desc()).limit(1).correlate(Board).scalar_subquery()
+    return db.func.coalesce(latest_change, Board.created_at)
+
+
+def dashboard_sort_key(sort):
+    if sort == 'title':
+        return Board.title
+    if sort == 'created':
+        return Board.created_at
+    return board_last_activity()
+
+
+def encode_dashboard_cursor(sort, key, board_id):
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([sort, key, board_id]).encode()).decode()
+
+
+def decode_dashboard_cursor(cursor, sort):
+    """Decode a dashboard cursor into ``(sort key, board id)``; raises ValueError if malformed"""
+    try:
+        cursor_sort, key, board_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort or not isinstance(key, str) or not isinstance(board_id, int):
+            raise ValueError('Invalid cursor')
+        return (key if sort == 'title' else datetime.fromisoformat(key)), board_id
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def load_dashboard_page(user_id, sort='activity', cursor=None, limit=DASHBOARD_PAGE_SIZE):
+    """One page of the boards ``user_id`` owns or belongs to, with per-board aggregates.
+
+    A single statement: the union of owned and member boards (so a board is
+    listed once), paged by keyset on ``(sort key, id)``, and the aggregates
+    computed only for the boards on the page. Returns ``(boards, next_cursor)``.
+    Raises ValueError for an unknown sort or malformed cursor.
+    """
+    if sort not in DASHBOARD_SORTS:
+        raise ValueError(f'Unknown sort {sort!r}')
+    descending = DASHBOARD_SORTS[sort] == 'desc'
+    sort_key = dashboard_sort_key(sort)
+
+    accessible = db.union(
+        db.select(Board.id.label('board_id')).where(Board.user_id == user_id),
+        db.select(BoardMember.board_id).where(BoardMember.user_id == user_id)
+    ).subquery()
+    page_query = db.select(Board.id, sort_key.label('sort_key')).join(
+        accessible, accessible.c.board_id == Board.id
+    )
+    if cursor:
+        after_key, after_id = decode_dashboard_cursor(cursor, sort)
+        position = db.tuple_(sort_key, Board.id)
+        page_query = page_query.where(position < (after_key, after_id) if descending else position > (after_key, after_id))
+    ordering = (sort_key.desc(), Board.id.desc()) if descending else (sort_key.asc(), Board.id.asc())
+    page = page_query.order_by(*ordering).limit(limit + 1).subquery()
+
+    # Correlated counts run once per board on the page, each through an index
+    list_count = db.select(db.func.count(List.id)).where(
+        List.board_id == Board.id
+    ).correlate(Board).scalar_subquery()
+    card_count = db.select(db.func.count(Card.id)).join(List, List.id == Card.list_id).where(
+        List.board_id == Board.id
+    ).correlate(Board).scalar_subquery()
+    overdue_count = db.select(db.func.count(Card.id)).join(List, List.id == Card.list_id).where(
+        List.board_id == Board.id, Card.due_date < datetime.utcnow()
+    ).correlate(Board).scalar_subquery()
+    member_count = db.select(db.func.count(BoardMember.id)).where(
+        BoardMember.board_id == Board.id
+    ).correlate(Board).scalar_subquery()
+
+    last_activity = page.c.sort_key if sort == 'activity' else board_last_activity()
+    page_ordering = (page.c.sort_key.desc(), page.c.id.desc()) if descending else (page.c.sort_key.asc(), page.c.id.asc())
+    rows = db.session.execute(
+        db.select(
+            Board, User.username, page.c.sort_key, last_activity,
+            list_count, card_count, overdue_count, member_count
+        ).join(page, page.c.id == Board.id)
+        .join(User, User.id == Board.user_id)
+        .order_by(*page_ordering)
+    ).all()
+
+    boards = []
+    for board, owner_name, _, last_activity, lists, cards, overdue, members in rows[:limit]:
+        boards.append({
+            'id': board.id,
+            'title': board.title,
+            'description': board.description,
+            'owner': {'id': board.user_id, 'username': owner_name},
+            'is_owner': board.user_id == user_id,
+            'member_count': members,
+            'list_count': lists,
+            'card_count': cards,
+            'overdue_count': overdue,
+            'created_at': board.created_at,
+            'last_activity': last_activity
+        })
+    next_cursor = None
+    if len(rows) > limit:
+        last_board, _, last_key = rows[limit - 1][:3]
+        next_cursor = encode_dashboard_cursor(sort, last_key, last_board.id)
+    return boards, next_cursor
+
+
+def dashboard_page_args():
+    """``(sort, cursor, limit)`` from the query string; raises ValueError if invalid"""
+    sort = request.args.get('sort', 'activity')
+    limit = request.args.get('limit', DASHBOARD_PAGE_SIZE, type=int)
+    if limit is None or not 1 <= limit <= DASHBOARD_MAX_PAGE_SIZE:
+        raise ValueError(f'limit must be between 1 and {DASHBOARD_MAX_PAGE_SIZE}')
+    return sort, request.args.get('cursor'), limit
+
+
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    # Get boards where user is owner or member
-    owned_boards = Board.query.filter_by(user_id=current_user.id).all()
-    member_boards = Board.query.join(BoardMember).filter(
-        BoardMember.user_id == current_user.id
-    ).all()
+    try:
+        sort, cursor, limit = dashboard_page_args()
+        boards, next_cursor = load_dashboard_page(current_user.id, sort, cursor, limit)
+    except ValueError:
+        return redirect(url_for('dashboard'))
+    return render_template('board.html', boards=boards, next_cursor=next_cursor, sort=sort)
 
-    all_boards = owned_boards + member_boards
-    return render_template('board.html', boards=all_boards)
+
+@app.route('/api/boards')
+@login_required
+def list_boards():
+    """Page through the dashboard's boards; ``sort``, ``cursor`` and ``limit`` as for /dashboard"""
+    try:
+        sort, cursor, limit = dashboard_page_args()
+        boards, next_cursor = load_dashboard_page(current_user.id, sort, cursor, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'boards': boards, 'next_cursor': next_cursor, 'sort': sort})
 
 
 @app.route('/register', methods=['GET', 'POST'])
@@ -169,139 +576,612 @@ def create_board():
     data = request.get_json()
     board = Board(title=data['title'], user_id=current_user.id)
     db.session.add(board)
-    db.session.commit()
+    commit_request()
+    refresh_board_access([current_user.id])
     return jsonify({'id': board.id, 'title': board.title})
 
 
+# Board snapshot helpers
+# Card fields clients can pick with ?fields=a,b,c; "summary" stands for what
+# the board view draws, leaving descriptions and attachment details to the card modal
+CARD_FIELDS = frozenset({
+    'id', 'list_id', 'title', 'description', 'has_description', 'position', 'due_date',
+    'created_by', 'created_at', 'labels', 'label_ids', 'attachments', 'attachment_count',
+    'cover_url', 'checklists', 'checklist_progress'
+})
+CARD_SUMMARY_FIELDS = frozenset({
+    'id', 'title', 'position', 'due_date', 'has_description', 'label_ids',
+    'attachment_count', 'cover_url', 'checklist_progress'
+})
+BOARD_CARD_FIELDS = frozenset({
+    'id', 'list_id', 'title', 'description', 'position', 'due_date', 'created_by', 'labels', 'attachments'
+})
+DETAIL_CARD_FIELDS = BOARD_CARD_FIELDS | {'created_at', 'checklists'}
+
+
+def requested_fields(allowed, summary, default):
+    """The fields named by ``?fields=`` (``summary`` expands to ``summary``), else ``default``.
+
+    ``id`` is always included. Raises ValueError for a field outside ``allowed``.
+    """
+    value = request.args.get('fields', '').strip()
+    if not value:
+        return default
+    fields = {'id'}
+    for name in value.split(','):
+        name = name.strip()
+        if name == 'summary':
+            fields.update(summary)
+        elif name in allowed:
+            fields.add(name)
+        elif name:
+            raise ValueError(f'Unknown field {name!r}; choose from summary, {", ".join(sorted(allowed))}')
+    return frozenset(fields)
+
+
+def fields_tag(fields):
+    """Short, stable tag of a field set for cache keys and ETags"""
+    return format(zlib.crc32(','.join(sorted(fields)).encode()), '08x')
+
+
+def load_card_payloads(cards, fields=BOARD_CARD_FIELDS, thumbnail_size=BOARD_THUMBNAIL_SIZE):
+    """Serialize ``fields`` of each card using a fixed number of set-based queries.
+
+    Labels, attachments, checklists and every referenced user are fetched
+    with one ``IN (...)`` query each, and only when a requested field needs
+    them, so the cost does not grow with the card count. Cards whose creator
+    no longer exists are skipped, as are attachments whose uploader no
+    longer exists.
+    """
+    card_ids = [card.id for card in cards]
+    if not card_ids:
+        return []
+
+    labels_by_card = defaultdict(list)
+    if 'labels' in fields:
+        label_rows = db.session.query(card_labels.c.card_id, Label).join(
+            Label, Label.id == card_labels.c.label_id
+        ).filter(card_labels.c.card_id.in_(card_ids)).order_by(Label.id).all()
+        for card_id, label in label_rows:
+            labels_by_card[card_id].append({
+                'id': label.id,
+                'name': label.name,
+                'color': label.color,
+                'board_id': label.board_id
+            })
+
+    label_ids_by_card = defaultdict(list)
+    if 'label_ids' in fields:
+        for card_id, label_id in db.session.query(card_labels.c.card_id, card_labels.c.label_id).filter(
+            card_labels.c.card_id.in_(card_ids)
+        ).order_by(card_labels.c.label_id):
+            label_ids_by_card[card_id].append(label_id)
+
+    attachments_by_card = defaultdict(list)
+    attachments = []
+    if 'attachments' in fields:
+        attachments = FileAttachment.query.filter(
+            FileAttachment.card_id.in_(card_ids)
+        ).order_by(FileAttachment.id).all()
+        for attachment in attachments:
+            attachments_by_card[attachment.card_id].append(attachment)
+    thumbnailed = thumbnails.thumbnailed_ids(attachments)
+
+    attachment_counts = {}
+    if 'attachment_count' in fields:
+        attachment_counts = dict(db.session.query(FileAttachment.card_id, db.func.count(FileAttachment.id)).filter(
+            FileAttachment.card_id.in_(card_ids)
+        ).group_by(FileAttachment.card_id).all())
+
+    covers = thumbnails.cover_attachment_ids(card_ids) if 'cover_url' in fields else {}
+    cover_ids = set(covers.values())
+
+    checklists_by_card = defaultdict(list)
+    if 'checklists' in fields:
+        checklists = Checklist.query.filter(Checklist.card_id.in_(card_ids)).order_by(
+            Checklist.position, Checklist.id
+        ).all()
+        for checklist_data in load_checklist_payloads(checklists):
+            checklists_by_card[checklist_data['card_id']].append(checklist_data)
+
+    checklist_progress = {}
+    if 'checklist_progress' in fields:
+        progress_rows = db.session.query(
+            Checklist.card_id,
+            db.func.count(ChecklistItem.id),
+            db.func.sum(db.case((ChecklistItem.is_completed, 1), else_=0))
+        ).join(ChecklistItem, ChecklistItem.checklist_id == Checklist.id).filter(
+            Checklist.card_id.in_(card_ids)
+        ).group_by(Checklist.card_id).all()
+        checklist_progress = {
+            card_id: {'completed': int(completed or 0), 'total': total}
+            for card_id, total, completed in progress_rows
+        }
+
+    user_ids = {card.created_by for card in cards}
+    user_ids.update(attachment.uploaded_by for attachment in attachments)
+    users = {user.id: user for user in User.query.filter(User.id.in_(user_ids)).all()}
+
+    payloads = []
+    for card in cards:
+        card_creator = users.get(card.created_by)
+        if not card_creator:
+            logger.warning('Card creator %s not found for card %s', card.created_by, card.id)
+            continue
+
+        card_data = {}
+        for field in fields:
+            if field == 'id':
+                card_data['id'] = card.id
+            elif field == 'list_id':
+                card_data['list_id'] = card.list_id
+            elif field == 'title':
+                card_data['title'] = card.title
+            elif field == 'description':
+                card_data['description'] = card.description
+            elif field == 'has_description':
+                card_data['has_description'] = bool(card.description)
+            elif field == 'position':
+                card_data['position'] = card.position
+            elif field == 'due_date':
+                card_data['due_date'] = card.due_date
+            elif field == 'created_by':
+                card_data['created_by'] = {
+                    'id': card_creator.id,
+                    'username': card_creator.username
+                }
+            elif field == 'created_at':
+                card_data['created_at'] = card.created_at
+            elif field == 'labels':
+                card_data['labels'] = labels_by_card[card.id]
+            elif field == 'label_ids':
+                card_data['label_ids'] = label_ids_by_card[card.id]
+            elif field == 'attachments':
+                card_data['attachments'] = [
+                    attachment_payload(attachment, users[attachment.uploaded_by], thumbnailed, thumbnail_size)
+                    for attachment in attachments_by_card[card.id] if attachment.uploaded_by in users
+                ]
+            elif field == 'attachment_count':
+                card_data['attachment_count'] = attachment_counts.get(card.id, 0)
+            elif field == 'cover_url':
+                card_data['cover_url'] = thumbnail_url(covers.get(card.id), cover_ids, BOARD_THUMBNAIL_SIZE)
+            elif field == 'checklists':
+                card_data['checklists'] = checklists_by_card[card.id]
+            elif field == 'checklist_progress':
+                card_data['checklist_progress'] = checklist_progress.get(card.id)
+        payloads.append(card_data)
+
+    return payloads
+
+
+def load_checklist_payloads(checklists):
+    """Serialize checklists with their items, fetching all items in one query"""
+    items_by_checklist = defaultdict(list)
+    if checklists:
+        items = ChecklistItem.query.filter(
+            ChecklistItem.checklist_id.in_([checklist.id for checklist in checklists])
+        ).order_by(ChecklistItem.position, ChecklistItem.id).all()
+        for item in items:
+            items_by_checklist[item.checklist_id].append(item)
+
+    checklists_data = []
+    for checklist in checklists:
+        items = items_by_checklist[checklist.id]
+        items_data = []
+        completed_count = 0
+
+        for item in items:
+            if item.is_completed:
+                completed_count += 1
+            items_data.append({
+                'id': item.id,
+                'text': item.text,
+                'is_completed': item.is_completed,
+                'position': item.position,
+                'created_at': item.created_at,
+                'completed_at': item.completed_at
+            })
+
+        progress = (completed_count / len(items)) * 100 if items else 0
+
+        checklists_data.append({
+            'id': checklist.id,
+            'card_id': checklist.card_id,
+            'title': checklist.title,
+            'position': checklist.position,
+            'items': items_data,
+            'progress': round(progress),
+            'completed_count': completed_count,
+            'total_count': len(items)
+        })
+
+    return checklists_data
+
+
+def encode_card_cursor(card):
+    return base64.urlsafe_b64encode(json.dumps([card.position, card.id]).encode()).decode()
+
+
+def decode_card_cursor(cursor):
+    """Decode a card cursor into ``(position, card id)``; raises ValueError if malformed"""
+    try:
+        position, card_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(position, str) or not isinstance(card_id, int):
+        raise ValueError('Invalid cursor')
+    return position, card_id
+
+
+def load_board_cards(board_id, cards_limit=None):
+    """The board's cards in order; with ``cards_limit``, at most that many plus one per list.
+
+    The extra card tells whether a list has more. The window is cut with
+    ``ROW_NUMBER() OVER (PARTITION BY list_id ...)``, which walks each list in
+    ``(list_id, position)`` index order.
+    """
+    query = Card.query.join(List).filter(List.board_id == board_id)
+    if cards_limit is not None:
+        ranked = db.select(
+            Card.id,
+            db.func.row_number().over(partition_by=Card.list_id, order_by=(Card.position, Card.id)).label('rank')
+        ).join(List, List.id == Card.list_id).where(List.board_id == board_id).subquery()
+        query = query.join(ranked, ranked.c.id == Card.id).filter(ranked.c.rank <= cards_limit + 1)
+    return query.order_by(Card.position, Card.id).all()
+
+
+def load_board_snapshot(board, user_id, cards_limit=None, fields=BOARD_CARD_FIELDS):
+    """Build the full board payload (members, lists, cards) for ``user_id``.
+
+    The number of queries is fixed regardless of how many lists, cards,
+    labels or attachments the board has. With ``cards_limit`` each list
+    carries only its first cards and a ``next_cursor`` for
+    ``GET /api/lists/<id>/cards`` when it has more. Cards carry ``fields``;
+    when those include ``label_ids`` the board's labels come along once as
+    ``labels``. Returns None if the owner is missing.
+    """
+    owner = db.session.get(User, board.user_id)
+    if not owner:
+        logger.warning('Owner %s not found for board %s', board.user_id, board.id)
+        return None
+
+    member_rows = db.session.query(BoardMember, User).join(
+        User, User.id == BoardMember.user_id
+    ).filter(BoardMember.board_id == board.id).order_by(BoardMember.id).all()
+    member_data = [{
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'role': member.role
+    } for member, user in member_rows]
+
+    board_data = {
+        'id': board.id,
+        'title': board.title,
+        'description': board.description,
+        'owner': {
+            'id': owner.id,
+            'username': owner.username
+        },
+        'is_owner': board.user_id == user_id,
+        'version': board.version,
+        'members': member_data,
+        'lists': []
+    }
+    if 'label_ids' in fields:
+        board_data['labels'] = [{
+            'id': label.id,
+            'name': label.name,
+            'color': label.color
+        } for label in Label.query.filter_by(board_id=board.id).order_by(Label.id)]
+
+    # Order lists by position
+    lists = List.query.filter_by(board_id=board.id).order_by(List.position, List.id).all()
+
+    # Order cards by position, all lists at once
+    cards = load_board_cards(board.id, cards_limit)
+
+    next_cursors = {}
+    if cards_limit is not None:
+        window = defaultdict(list)
+        for card in cards:
+            window[card.list_id].append(card)
+        for list_id, list_cards in window.items():
+            if len(list_cards) > cards_limit:
+                next_cursors[list_id] = encode_card_cursor(list_cards[cards_limit - 1])
+        cards = [card for list_cards in window.values() for card in list_cards[:cards_limit]]
+        cards.sort(key=lambda card: (card.position, card.id))
+
+    cards_by_list = defaultdict(list)
+    for card_data in load_card_payloads(cards, fields | {'list_id'}):
+        cards_by_list[card_data.pop('list_id')].append(card_data)
+
+    for list_item in lists:
+        list_cards = cards_by_list[list_item.id]
+        list_data = {
+            'id': list_item.id,
+            'title': list_item.title,
+            'position': list_item.position,
+            'cards': list_cards
+        }
+        if cards_limit is not None:
+            list_data['next_cursor'] = next_cursors.get(list_item.id)
+        board_data['lists'].append(list_data)
+
+    board_load_logger.debug('Loaded board snapshot', extra={
+        'board_id': board.id, 'lists': len(lists), 'cards': len(cards)
+    })
+    return board_data
+
+
 # UPDATED get_board (single version, includes labels + attachments)
 @app.route('/api/boards/<int:board_id>')
 @login_required
 def get_board(board_id):
     try:
-        print(f"DEBUG: Fetching board {board_id} for user {current_user.id}")
-
         if not has_board_access(board_id, current_user.id):
-            print(f"DEBUG: Access denied for user {current_user.id} to board {board_id}")
+            logger.info('Access denied to board', extra={'board_id': board_id, 'user_id': current_user.id})
             return jsonify({'error': 'Access denied'}), 403
 
+        cards_limit = request.args.get('cards_limit', type=int)
+        if 'cards_limit' in request.args and (cards_limit is None or not 1 <= cards_limit <= LIST_CARDS_MAX_PAGE_SIZE):
+            return jsonify({'error': f'cards_limit must be between 1 and {LIST_CARDS_MAX_PAGE_SIZE}'}), 400
+        try:
+            fields = requested_fields(CARD_FIELDS, CARD_SUMMARY_FIELDS, BOARD_CARD_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         board = Board.query.get(board_id)
         if not board:
-            print(f"DEBUG: Board {board_id} not found")
             return jsonify({'error': 'Board not found'}), 404
 
-        print(f"DEBUG: Board found - Title: {board.title}, Owner: {board.user_id}")
-
-        # Get board owner info
-        owner = User.query.get(board.user_id)
-        if not owner:
-            print(f"DEBUG: Owner {board.user_id} not found for board {board_id}")
-            return jsonify({'error': 'Board owner not found'}), 500
-
-        # Get board members
-        members = BoardMember.query.filter_by(board_id=board_id).all()
-        member_data = []
-        for member in members:
-            user = User.query.get(member.user_id)
-            if user:
-                member_data.append({
-                    'id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'role': member.role
-                })
-            else:
-                print(f"DEBUG: Member user {member.user_id} not found")
+        is_owner = board.user_id == current_user.id
+        cache_key = (board.id, board.version, is_owner, cards_limit, fields)
+        etag = f"board-{board.id}-v{board.version}-{'o' if is_owner else 'm'}"
+        if cards_limit is not None:
+            etag += f'-c{cards_limit}'
+        if fields != BOARD_CARD_FIELDS:
+            etag += f'-f{fields_tag(fields)}'
 
-        # Get board data with lists and cards
-        board_data = {
-            'id': board.id,
-            'title': board.title,
-            'description': board.description,
-            'owner': {
-                'id': owner.id,
-                'username': owner.username
-            },
-            'is_owner': board.user_id == current_user.id,
-            'members': member_data,
-            'lists': []
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+        else:
+            body = get_cached_board(cache_key)
+            if body is None:
+                board_data = load_board_snapshot(board, current_user.id, cards_limit, fields)
+                if board_data is None:
+                    return jsonify({'error': 'Board owner not found'}), 500
+
+                body = jsonify(board_data).get_data()
+                store_cached_board(cache_key, body)
+            response = app.response_class(body, mimetype='application/json')
+
+        # Let the browser keep the payload but revalidate it on every open
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    except HTTPException:
+        # Let abort() answer with its own status rather than a 500
+        raise
+    except Exception as e:
+        logger.exception('Error in get_board')
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+def board_changes_available(since, until):
+    """Whether the change log still covers every version after ``since``"""
+    return since >= until - BOARD_CHANGE_RETENTION
+
+
+def load_board_changes(board_id, since, until):
+    """Collect everything that changed on a board between versions ``since`` and ``until``.
+
+    Each entity appears once: as its current state under ``upserted`` or,
+    if it no longer exists on the board, by id under ``deleted``. Returns
+    None when the log no longer reaches back to ``since``.
+    """
+    if not board_changes_available(since, until):
+        return None
+
+    rows = db.session.query(
+        BoardChange.entity_type, BoardChange.entity_id, BoardChange.action
+    ).filter(
+        BoardChange.board_id == board_id,
+        BoardChange.version > since,
+        BoardChange.version <= until
+    ).order_by(BoardChange.id).all()
+
+    # Last action wins; anything not deleted is re-read from its table below
+    touched = defaultdict(dict)
+    for entity_type, entity_id, action in rows:
+        touched[entity_type][entity_id] = action
+
+    def upserted_ids(entity_type):
+        return [entity_id for entity_id, action in touched[entity_type].items() if action != 'deleted']
+
+    changes = {}
+
+    list_ids = upserted_ids('list')
+    lists = List.query.filter(List.id.in_(list_ids), List.board_id == board_id).order_by(
+        List.position, List.id
+    ).all() if list_ids else []
+    changes['lists'] = [{
+        'id': list_item.id,
+        'title': list_item.title,
+        'position': list_item.position
+    } for list_item in lists]
+
+    checklist_ids = upserted_ids('checklist')
+    checklists = Checklist.query.join(Card).join(List).filter(
+        Checklist.id.in_(checklist_ids), List.board_id == board_id
+    ).order_by(Checklist.position, Checklist.id).all() if checklist_ids else []
+    changes['checklists'] = load_checklist_payloads(checklists)
+
+    # Cards whose checklists changed are resent too, for their checklist progress
+    card_ids = set(upserted_ids('card')) | {checklist.card_id for checklist in checklists}
+    cards = Card.query.join(List).filter(Card.id.in_(card_ids), List.board_id == board_id).order_by(
+        Card.position, Card.id
+    ).all() if card_ids else []
+    # Both the full and the summary shape, whichever the viewer loaded the board with
+    changes['cards'] = load_card_payloads(cards, BOARD_CARD_FIELDS | CARD_SUMMARY_FIELDS)
+
+    label_ids = upserted_ids('label')
+    labels = Label.query.filter(Label.id.in_(label_ids), Label.board_id == board_id).all() if label_ids else []
+    changes['labels'] = [{
+        'id': label.id,
+        'name': label.name,
+        'color': label.color,
+        'board_id': label.board_id
+    } for label in labels]
+
+    member_ids = upserted_ids('member')
+    member_rows = db.session.query(BoardMember, User).join(User, User.id == BoardMember.user_id).filter(
+        BoardMember.board_id == board_id, BoardMember.user_id.in_(member_ids)
+    ).all() if member_ids else []
+    changes['members'] = [{
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'role': member.role
+    } for member, user in member_rows]
+
+    result = {}
+    for entity_type, key in (('list', 'lists'), ('card', 'cards'), ('label', 'labels'),
+                             ('checklist', 'checklists'), ('member', 'members')):
+        found = {item['id'] for item in changes[key]}
+        # Entities removed by a cascade (e.g. cards of a deleted list) are
+        # missing from their table even though only an update was logged
+        result[key] = {
+            'upserted': changes[key],
+            'deleted': [entity_id for entity_id in touched[entity_type] if entity_id not in found]
         }
+    return result
 
-        # Order lists by position
-        lists = List.query.filter_by(board_id=board_id).order_by(List.position).all()
-        print(f"DEBUG: Found {len(lists)} lists for board {board_id}")
 
-        for list_item in lists:
-            list_data = {
-                'id': list_item.id,
-                'title': list_item.title,
-                'position': list_item.position,
-                'cards': []
-            }
+live_updates.broker.init_app(app, load_board_changes)
 
-            # Order cards by position
-            cards = Card.query.filter_by(list_id=list_item.id).order_by(Card.position).all()
-            print(f"DEBUG: Found {len(cards)} cards for list {list_item.id}")
-
-            for card in cards:
-                card_creator = User.query.get(card.created_by)
-                if not card_creator:
-                    print(f"DEBUG: Card creator {card.created_by} not found for card {card.id}")
-                    continue
-
-                # Get labels for this card
-                labels_data = []
-                for label in card.labels:
-                    labels_data.append({
-                        'id': label.id,
-                        'name': label.name,
-                        'color': label.color
-                    })
-
-                # Get attachments for this card
-                attachments = FileAttachment.query.filter_by(card_id=card.id).all()
-                attachments_data = []
-                for attachment in attachments:
-                    uploader = User.query.get(attachment.uploaded_by)
-                    if uploader:
-                        attachments_data.append({
-                            'id': attachment.id,
-                            'filename': attachment.original_filename,
-                            'file_size': attachment.file_size,
-                            'mime_type': attachment.mime_type,
-                            'uploaded_at': attachment.uploaded_at.isoformat(),
-                            'uploaded_by': {
-                                'id': uploader.id,
-                                'username': uploader.username
-                            },
-                            'icon': get_file_icon(attachment.mime_type, attachment.original_filename),
-                            'download_url': f"/api/attachments/{attachment.id}/download"
-                        })
-
-                card_data = {
-                    'id': card.id,
-                    'title': card.title,
-                    'description': card.description,
-                    'position': card.position,
-                    'due_date': card.due_date.isoformat() if card.due_date else None,
-                    'created_by': {
-                        'id': card_creator.id,
-                        'username': card_creator.username
-                    },
-                    'labels': labels_data,
-                    'attachments': attachments_data
-                }
-                list_data['cards'].append(card_data)
 
-            board_data['lists'].append(list_data)
+def thumbnails_ready(attachment):
+    """Bump the board so cached snapshots and open viewers pick up new thumbnails"""
+    record_change(attachment.card.list.board_id, 'card', attachment.card_id, 'updated')
+
+
+thumbnails.init_app(app, thumbnails_ready)
+
+
+@app.route('/api/boards/<int:board_id>/changes')
+@login_required
+def get_board_changes(board_id):
+    try:
+        if not has_board_access(board_id, current_user.id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        since = request.args.get('since', type=int)
+        if since is None or since < 0:
+            return jsonify({'error': 'A non-negative integer "since" version is required'}), 400
 
-        print(f"DEBUG: Successfully returning board data with {len(board_data['lists'])} lists")
-        return jsonify(board_data)
+        board = Board.query.get_or_404(board_id)
+        if since > board.version:
+            # The client is ahead of us (e.g. the database was reset); it must reload
+            return jsonify({'error': 'Unknown board version', 'version': board.version}), 409
+
+        changes = load_board_changes(board_id, since, board.version)
+        if changes is None:
+            # Pruned from the change log; the client must reload
+            return jsonify({'error': 'Changes since this version are no longer available', 'version': board.version}), 409
+        changes.update({
+            'board_id': board_id,
+            'since': since,
+            'version': board.version
+        })
+        return jsonify(changes)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error in get_board: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        logger.exception('Error getting board changes')
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/boards/<int:board_id>/events')
+@login_required
+def board_events(board_id):
+    """Server-Sent Events stream of the board's changes.
+
+    Each ``changes`` event carries the same payload as the changes endpoint
+    and uses the board version as its id, so a reconnecting EventSource
+    resumes from ``Last-Event-ID``. ``reset``, ``deleted`` and ``revoked``
+    events end the stream and tell the client to reload or leave the board.
+    """
+    try:
+        if not has_board_access(board_id, current_user.id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        board = Board.query.get_or_404(board_id)
+        since = request.headers.get('Last-Event-ID', type=int)
+        if since is None:
+            since = request.args.get('since', board.version, type=int)
+        if since < 0:
+            return jsonify({'error': '"since" must be a non-negative version'}), 400
+
+        subscription = live_updates.broker.subscribe(board_id, current_user.id, since)
+        response = Response(live_updates.broker.stream(subscription), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Keep reverse proxies from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error opening board events')
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/boards/<int:board_id>/export')
+@login_required
+def export_board(board_id):
+    """The board as JSON Lines (see board_transfer), streamed as it is read"""
+    try:
+        if not has_board_access(board_id, current_user.id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        board = Board.query.get_or_404(board_id)
+        response = Response(stream_with_context(board_transfer.export_lines(board)), mimetype='application/x-ndjson')
+        filename = secure_filename(board.title) or f'board-{board.id}'
+        response.headers.set('Content-Disposition', 'attachment', filename=f'{filename}.jsonl')
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error exporting board')
+        return jsonify({'error': str(e)}), 500
+
+
+IMPORT_READ_BUFFER = 64 * 1024
+
+
+@app.route('/api/boards/import', methods=['POST'])
+@login_required
+def import_board():
+    """Create a board from a JSON Lines export, read from the body line by line"""
+    try:
+        # The raw stream reads lines a byte at a time; buffer it
+        lines = io.BufferedReader(request.stream, IMPORT_READ_BUFFER)
+        board_id, counts, skipped = board_transfer.import_lines(lines, current_user.id)
+    except board_transfer.TransferError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'line': e.line}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Error importing board')
+        return jsonify({'error': str(e)}), 500
+
+    db.session.commit()
+    refresh_board_access([current_user.id])
+    return jsonify({'id': board_id, 'imported': counts, 'skipped': skipped}), 201
 
 
 @app.route('/api/boards/<int:board_id>/members', methods=['GET'])
@@ -319,7 +1199,7 @@ def get_board_members(board_id):
             'username': user.username,
             'email': user.email,
             'role': member.role,
-            'joined_at': member.joined_at.isoformat()
+            'joined_at': member.joined_at
         })
 
     return jsonify(member_data)
@@ -350,7 +1230,9 @@ def add_board_member(board_id):
         # Add user as member
         member = BoardMember(board_id=board_id, user_id=user.id, role='member')
         db.session.add(member)
-        db.session.commit()
+        record_change(board_id, 'member', user.id, 'created')
+        commit_request()
+        refresh_board_access([user.id])
 
         return jsonify({
             'message': 'User added to board',
@@ -362,8 +1244,10 @@ def add_board_member(board_id):
             }
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error adding board member: {str(e)}")
+        logger.exception('Error adding board member')
         return jsonify({'error': str(e)}), 500
 
 
@@ -385,12 +1269,16 @@ def remove_board_member(board_id, user_id):
             return jsonify({'error': 'User is not a member of this board'}), 404
 
         db.session.delete(member)
-        db.session.commit()
+        record_change(board_id, 'member', user_id, 'deleted')
+        commit_request()
+        refresh_board_access([user_id])
 
         return jsonify({'message': 'User removed from board'})
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error removing board member: {str(e)}")
+        logger.exception('Error removing board member')
         return jsonify({'error': str(e)}), 500
 
 
@@ -402,9 +1290,13 @@ def create_list(board_id):
             return jsonify({'error': 'Access denied'}), 403
 
         data = request.get_json()
-        list_item = List(title=data['title'], board_id=board_id)
+        position = resolve_position(board_id, List, board_id, {})
+        list_item = List(title=data['title'], board_id=board_id, position=position)
         db.session.add(list_item)
-        db.session.commit()
+        db.session.flush()
+        record_change(board_id, 'list', list_item.id, 'created')
+        commit_request()
+        after_commit(rebalance_if_needed, List, board_id, position)
 
         return jsonify({
             'id': list_item.id,
@@ -413,8 +1305,200 @@ def create_list(board_id):
             'cards': []
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error creating list: {str(e)}")
+        logger.exception('Error creating list')
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/boards/<int:board_id>/order', methods=['PATCH'])
+@login_required
+def update_board_order(board_id):
+    """Apply a new ordering of lists and/or of the cards in some lists.
+
+    Body: ``{"lists": [list ids], "cards": {"<list_id>": [card ids]}, "partial_lists": [list ids]}``.
+    ``lists`` must name every list of the board; each entry of ``cards`` is
+    the complete new content of that list, which may take in cards from other
+    lists as long as every card of the affected lists ends up somewhere.
+    For a list in ``partial_lists`` (one the client has loaded only a window
+    of) the entry is the new order of its first cards; its cards not named
+    anywhere stay after them in their current order.
+    Positions are rank keys: the longest run of items already in order keeps
+    its keys and only the others get new ones, so moving one item writes one
+    row. Changed rows are written with one bulk UPDATE per table.
+    """
+    try:
+        if not has_board_access(board_id, current_user.id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+        list_order = data.get('lists')
+        card_order = data.get('cards') or {}
+        if list_order is None and not card_order:
+            return jsonify({'error': 'Nothing to reorder'}), 400
+
+        # Shape checks come first, so a malformed body never takes the board lock
+        if list_order is not None and not is_id_list(list_order):
+            return jsonify({'error': 'lists must be a list of list ids'}), 400
+        if card_order:
+            if not isinstance(card_order, dict):
+                return jsonify({'error': 'cards must map list ids to lists of card ids'}), 400
+            try:
+                card_order = {int(list_id): card_ids for list_id, card_ids in card_order.items()}
+            except (TypeError, ValueError):
+                return jsonify({'error': 'cards must be keyed by list id'}), 400
+            if not all(is_id_list(card_ids) for card_ids in card_order.values()):
+                return jsonify({'error': 'cards must map list ids to lists of card ids'}), 400
+            partial_lists = data.get('partial_lists') or []
+            if not isinstance(partial_lists, list):
+                return jsonify({'error': 'partial_lists must be list ids'}), 400
+            try:
+                partial_lists = {int(list_id) for list_id in partial_lists}
+            except (TypeError, ValueError):
+                return jsonify({'error': 'partial_lists must be list ids'}), 400
+
+        lock_board(board_id)
+        board_lists = dict(db.session.query(List.id, List.position).filter(List.board_id == board_id).all())
+        changes = []
+
+        list_positions = {}
+        if list_order is not None:
+            if sorted(list_order) != sorted(board_lists):
+                return jsonify({'error': 'lists must contain every list of the board exactly once'}), 400
+            list_positions = {
+                list_order[index]: position
+                for index, position in ranking.rekey([board_lists[list_id] for list_id in list_order]).items()
+            }
+
+        card_positions = {}
+        card_lists = {}
+        if card_order:
+            if not set(card_order) <= set(board_lists):
+                return jsonify({'error': 'Cannot order cards of a list on another board'}), 400
+            if not partial_lists <= set(card_order):
+                return jsonify({'error': 'partial_lists must be among the lists in cards'}), 400
+
+            ordered_ids = [card_id for card_ids in card_order.values() for card_id in card_ids]
+            if len(ordered_ids) != len(set(ordered_ids)):
+                return jsonify({'error': 'A card may appear only once'}), 400
+
+            current = {
+                card_id: (list_id, position)
+                for card_id, list_id, position in db.session.query(Card.id, Card.list_id, Card.position).join(List).filter(
+                    List.board_id == board_id,
+                    db.or_(Card.id.in_(ordered_ids), Card.list_id.in_(list(card_order)))
+                ).all()
+            }
+            if partial_lists:
+                named = set(ordered_ids)
+                for card_id, (list_id, _) in sorted(current.items(), key=lambda item: (item[1][1], item[0])):
+                    if list_id in partial_lists and card_id not in named:
+                        card_order[list_id].append(card_id)
+                        ordered_ids.append(card_id)
+            if set(ordered_ids) != set(current):
+                return jsonify({'error': 'cards must cover every card of the affected lists, all from this board'}), 400
+
+            for list_id, card_ids in card_order.items():
+                new_keys = ranking.rekey([current[card_id][1] for card_id in card_ids])
+                for index, card_id in enumerate(card_ids):
+                    if index in new_keys or current[card_id][0] != list_id:
+                        card_positions[card_id] = new_keys.get(index, current[card_id][1])
+                        card_lists[card_id] = list_id
+
+        if list_positions:
+            db.session.execute(
+                db.update(List).where(List.id.in_(list(list_positions))).values(
+                    position=db.case(list_positions, value=List.id)
+                ),
+                execution_options={'synchronize_session': False}
+            )
+            changes.extend(('list', list_id, 'updated') for list_id in list_positions)
+
+        if card_positions:
+            db.session.execute(
+                db.update(Card).where(Card.id.in_(list(card_positions))).values(
+                    position=db.case(card_positions, value=Card.id),
+                    list_id=db.case(card_lists, value=Card.id)
+                ),
+                execution_options={'synchronize_session': False}
+            )
+            changes.extend(('card', card_id, 'updated') for card_id in card_positions)
+
+        version = record_changes(board_id, changes) if changes else Board.query.get(board_id).version
+        commit_request()
+
+        after_commit(rebalance_if_needed, List, board_id, *list_positions.values())
+        for list_id in card_order:
+            after_commit(rebalance_if_needed, Card, list_id, *(
+                position for card_id, position in card_positions.items() if card_lists[card_id] == list_id
+            ))
+
+        return jsonify({
+            'version': version,
+            'updated_lists': len(list_positions),
+            'updated_cards': len(card_positions)
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error reordering board')
+        return jsonify({'error': str(e)}), 500
+
+
+# Card windows of long lists
+LIST_CARDS_PAGE_SIZE = 50
+LIST_CARDS_MAX_PAGE_SIZE = 500
+
+
+@app.route('/api/lists/<int:list_id>/cards')
+@login_required
+def list_cards(list_id):
+    """The next cards of a list after ``after`` (a ``next_cursor``), ``limit`` at a time"""
+    try:
+        list_item = List.query.get_or_404(list_id)
+
+        if not has_board_access(list_item.board_id, current_user.id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        limit = request.args.get('limit', LIST_CARDS_PAGE_SIZE, type=int)
+        if limit is None or not 1 <= limit <= LIST_CARDS_MAX_PAGE_SIZE:
+            return jsonify({'error': f'limit must be between 1 and {LIST_CARDS_MAX_PAGE_SIZE}'}), 400
+        try:
+            fields = requested_fields(CARD_FIELDS, CARD_SUMMARY_FIELDS, BOARD_CARD_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        query = Card.query.filter(Card.list_id == list_id)
+        if request.args.get('after'):
+            try:
+                position, card_id = decode_card_cursor(request.args['after'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            # Keyset on (position, id), served by the (list_id, position) index
+            query = query.filter(db.or_(
+                Card.position > position,
+                db.and_(Card.position == position, Card.id > card_id)
+            ))
+        cards = query.order_by(Card.position, Card.id).limit(limit + 1).all()
+
+        page = cards[:limit]
+        payloads = load_card_payloads(page, fields | {'list_id'})
+        for card_data in payloads:
+            card_data.pop('list_id')
+        return jsonify({
+            'list_id': list_id,
+            'cards': payloads,
+            'next_cursor': encode_card_cursor(page[-1]) if len(cards) > limit else None
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error listing cards')
         return jsonify({'error': str(e)}), 500
 
 
@@ -428,14 +1512,19 @@ def create_card(list_id):
             return jsonify({'error': 'Access denied'}), 403
 
         data = request.get_json()
+        position = resolve_position(list_item.board_id, Card, list_id, {})
         card = Card(
             title=data['title'],
             list_id=list_id,
             description=data.get('description', ''),
+            position=position,
             created_by=current_user.id
         )
         db.session.add(card)
-        db.session.commit()
+        db.session.flush()
+        record_change(list_item.board_id, 'card', card.id, 'created')
+        commit_request()
+        after_commit(rebalance_if_needed, Card, list_id, position)
 
         card_creator = User.query.get(card.created_by)
 
@@ -450,8 +1539,10 @@ def create_card(list_id):
             }
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error creating card: {str(e)}")
+        logger.exception('Error creating card')
         return jsonify({'error': str(e)}), 500
 
 
@@ -459,14 +1550,14 @@ def create_card(list_id):
 @login_required
 def update_card(card_id):
     try:
-        card = Card.query.get_or_404(card_id)
+        card, board_id = get_with_board_or_404(Card, card_id)
 
-        if not has_board_access(card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
         data = request.get_json()
 
-        print(f"DEBUG: Updating card {card_id} with data:", data)
+        logger.debug('Updating card', extra={'card_id': card_id, 'fields': sorted(data)})
 
         if 'title' in data:
             card.title = data['title']
@@ -475,18 +1566,29 @@ def update_card(card_id):
         if 'list_id' in data:
             # Verify the target list belongs to the same board
             target_list = List.query.get_or_404(data['list_id'])
-            if target_list.board_id != card.list.board_id:
+            if target_list.board_id != board_id:
                 return jsonify({'error': 'Cannot move card to different board'}), 400
-            card.list_id = data['list_id']
-        if 'position' in data:
-            card.position = data['position']
+        target_list_id = data.get('list_id', card.list_id)
+        if target_list_id != card.list_id or any(
+            data.get(field) is not None for field in ('position', 'after_id', 'before_id')
+        ):
+            try:
+                position = resolve_position(board_id, Card, target_list_id, data, card.id)
+            except ranking.RankError as e:
+                return jsonify({'error': str(e)}), 400
+            card.list_id = target_list_id
+            card.position = position
+        else:
+            position = None
         if 'due_date' in data:
             if data['due_date']:
                 card.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
             else:
                 card.due_date = None
 
-        db.session.commit()
+        record_change(board_id, 'card', card.id, 'updated')
+        commit_request()
+        after_commit(rebalance_if_needed, Card, target_list_id, position)
 
         card_creator = User.query.get(card.created_by)
 
@@ -495,7 +1597,7 @@ def update_card(card_id):
             'id': card.id,
             'title': card.title,
             'description': card.description,
-            'due_date': card.due_date.isoformat() if card.due_date else None,
+            'due_date': card.due_date,
             'position': card.position,
             'list_id': card.list_id,
             'created_by': {
@@ -506,8 +1608,10 @@ def update_card(card_id):
 
         return jsonify(card_data)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error updating card: {str(e)}")
+        logger.exception('Error updating card')
         return jsonify({'error': str(e)}), 500
 
 
@@ -516,110 +1620,40 @@ def update_card(card_id):
 @login_required
 def get_card(card_id):
     try:
-        card = Card.query.get_or_404(card_id)
+        card, board_id = get_with_board_or_404(Card, card_id)
 
-        if not has_board_access(card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
-        card_creator = User.query.get(card.created_by)
-
-        # Get attachments for this card
-        attachments = FileAttachment.query.filter_by(card_id=card_id).all()
-        attachments_data = []
-        for attachment in attachments:
-            uploader = User.query.get(attachment.uploaded_by)
-            attachments_data.append({
-                'id': attachment.id,
-                'filename': attachment.original_filename,
-                'file_size': attachment.file_size,
-                'mime_type': attachment.mime_type,
-                'uploaded_at': attachment.uploaded_at.isoformat(),
-                'uploaded_by': {
-                    'id': uploader.id,
-                    'username': uploader.username
-                },
-                'icon': get_file_icon(attachment.mime_type, attachment.original_filename),
-                'download_url': f"/api/attachments/{attachment.id}/download"
-            })
-
-        # Get checklists for this card
-        checklists = Checklist.query.filter_by(card_id=card_id).order_by(Checklist.position).all()
-        checklists_data = []
-        for checklist in checklists:
-            items = ChecklistItem.query.filter_by(checklist_id=checklist.id).order_by(
-                ChecklistItem.position
-            ).all()
-            items_data = []
-            completed_count = 0
-
-            for item in items:
-                if item.is_completed:
-                    completed_count += 1
-                items_data.append({
-                    'id': item.id,
-                    'text': item.text,
-                    'is_completed': item.is_completed,
-                    'position': item.position,
-                    'created_at': item.created_at.isoformat(),
-                    'completed_at': item.completed_at.isoformat() if item.completed_at else None
-                })
-
-            progress = (completed_count / len(items)) * 100 if items else 0
-
-            checklists_data.append({
-                'id': checklist.id,
-                'title': checklist.title,
-                'position': checklist.position,
-                'items': items_data,
-                'progress': round(progress),
-                'completed_count': completed_count,
-                'total_count': len(items)
-            })
-
-        # Get labels for this card
-        labels_data = []
-        for label in card.labels:
-            labels_data.append({
-                'id': label.id,
-                'name': label.name,
-                'color': label.color,
-                'board_id': label.board_id
-            })
-
-        card_data = {
-            'id': card.id,
-            'title': card.title,
-            'description': card.description,
-            'due_date': card.due_date.isoformat() if card.due_date else None,
-            'position': card.position,
-            'list_id': card.list_id,
-            'created_by': {
-                'id': card_creator.id,
-                'username': card_creator.username
-            },
-            'created_at': card.created_at.isoformat(),
-            'attachments': attachments_data,
-            'checklists': checklists_data,
-            'labels': labels_data
-        }
+        try:
+            fields = requested_fields(CARD_FIELDS, CARD_SUMMARY_FIELDS, DETAIL_CARD_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        payloads = load_card_payloads([card], fields, thumbnail_size=CARD_THUMBNAIL_SIZE)
+        if not payloads:
+            return jsonify({'error': 'Card creator not found'}), 500
+        card_data = payloads[0]
 
         return jsonify(card_data)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error getting card: {str(e)}")
+        logger.exception('Error getting card')
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/cards/<int:card_id>', methods=['DELETE'])
 @login_required
 def delete_card(card_id):
-    card = Card.query.get_or_404(card_id)
+    card, board_id = get_with_board_or_404(Card, card_id)
 
-    if not has_board_access(card.list.board_id, current_user.id):
+    if not has_board_access(board_id, current_user.id):
         return jsonify({'error': 'Access denied'}), 403
 
     db.session.delete(card)
-    db.session.commit()
+    record_change(board_id, 'card', card_id, 'deleted')
+    commit_request()
     return jsonify({'message': 'Card deleted'})
 
 
@@ -631,8 +1665,10 @@ def delete_list(list_id):
     if not has_board_access(list_item.board_id, current_user.id):
         return jsonify({'error': 'Access denied'}), 403
 
+    board_id = list_item.board_id
     db.session.delete(list_item)
-    db.session.commit()
+    record_change(board_id, 'list', list_id, 'deleted')
+    commit_request()
     return jsonify({'message': 'List deleted'})
 
 
@@ -645,8 +1681,12 @@ def delete_board(board_id):
     if board.user_id != current_user.id:
         return jsonify({'error': 'Only board owner can delete the board'}), 403
 
+    affected_user_ids = [board.user_id] + [member.user_id for member in board.members]
+    BoardChange.query.filter_by(board_id=board_id).delete()
     db.session.delete(board)
-    db.session.commit()
+    mark_board_changed(board_id)
+    commit_request()
+    refresh_board_access(affected_user_ids)
     return jsonify({'message': 'Board deleted'})
 
 
@@ -656,10 +1696,14 @@ def delete_board(board_id):
 def upload_file(card_id):
     try:
         # Check if card exists and user has access
-        card = Card.query.get_or_404(card_id)
-        if not has_board_access(card.list.board_id, current_user.id):
+        card, board_id = get_with_board_or_404(Card, card_id)
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
+        # Refuse oversized bodies before Werkzeug spools them (64KB for multipart overhead)
+        if request.content_length and request.content_length > MAX_FORM_UPLOAD_SIZE + 64 * 1024:
+            return jsonify({'error': f'File too large. Maximum size is {MAX_FORM_UPLOAD_SIZE // (1024*1024)}MB, use a chunked upload for larger files'}), 400
+
         # Check if file was uploaded
         if 'file' not in request.files:
             return jsonify({'error': 'No file provided'}), 400
@@ -675,54 +1719,302 @@ def upload_file(card_id):
         file_length = file.tell()
         file.seek(0)
 
-        if file_length > MAX_FILE_SIZE:
-            return jsonify({'error': f'File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB'}), 400
+        if file_length > MAX_FORM_UPLOAD_SIZE:
+            return jsonify({'error': f'File too large. Maximum size is {MAX_FORM_UPLOAD_SIZE // (1024*1024)}MB, use a chunked upload for larger files'}), 400
 
         # Check file extension
         if file and allowed_file(file.filename):
-            # Generate unique filename
             filename = secure_filename(file.filename)
-            unique_filename = f"{uuid.uuid4().hex}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
 
-            # Save file
-            file.save(file_path)
+            # Store the content once; a file we already hold is not written again
+            file_path, sha256, file_size = blob_store.add_stream(file.stream)
 
             # Create file attachment record
             attachment = FileAttachment(
-                filename=unique_filename,
+                filename=sha256,
                 original_filename=filename,
                 file_path=file_path,
-                file_size=file_length,
+                file_size=file_size,
                 mime_type=file.mimetype,
+                sha256=sha256,
                 card_id=card_id,
                 uploaded_by=current_user.id
             )
 
             db.session.add(attachment)
+            record_change(board_id, 'card', card_id, 'updated')
             db.session.commit()
+            thumbnails.schedule(attachment)
 
-            # Get uploader info
-            uploader = User.query.get(attachment.uploaded_by)
-
-            return jsonify({
-                'id': attachment.id,
-                'filename': attachment.original_filename,
-                'file_size': attachment.file_size,
-                'mime_type': attachment.mime_type,
-                'uploaded_at': attachment.uploaded_at.isoformat(),
-                'uploaded_by': {
-                    'id': uploader.id,
-                    'username': uploader.username
-                },
-                'icon': get_file_icon(attachment.mime_type, attachment.original_filename),
-                'download_url': f"/api/attachments/{attachment.id}/download"
-            })
+            return jsonify(attachment_payload(attachment))
         else:
             return jsonify({'error': 'File type not allowed'}), 400
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error uploading file')
+        return jsonify({'error': str(e)}), 500
+
+
+def thumbnail_url(attachment_id, thumbnailed, size):
+    if attachment_id not in thumbnailed:
+        return None
+    return f"/api/attachments/{attachment_id}/thumbnail/{size}"
+
+
+def attachment_payload(attachment, uploader=None, thumbnailed=None, thumbnail_size=CARD_THUMBNAIL_SIZE):
+    """Serialize an attachment; pass ``uploader`` and ``thumbnailed`` when they are already loaded"""
+    if uploader is None:
+        uploader = User.query.get(attachment.uploaded_by)
+    if thumbnailed is None:
+        thumbnailed = thumbnails.thumbnailed_ids([attachment])
+    return {
+        'id': attachment.id,
+        'filename': attachment.original_filename,
+        'file_size': attachment.file_size,
+        'mime_type': attachment.mime_type,
+        'uploaded_at': attachment.uploaded_at,
+        'uploaded_by': {
+            'id': uploader.id,
+            'username': uploader.username
+        },
+        'icon': get_file_icon(attachment.mime_type, attachment.original_filename),
+        'download_url': f"/api/attachments/{attachment.id}/download",
+        'thumbnail_url': thumbnail_url(attachment.id, thumbnailed, thumbnail_size)
+    }
+
+
+# Chunked upload routes (see chunked_uploads.py for the protocol)
+def upload_status(upload):
+    return {
+        'upload_id': upload.id,
+        'card_id': upload.card_id,
+        'filename': upload.original_filename,
+        'size': upload.total_size,
+        'offset': upload.received,
+        'chunk_size': UPLOAD_CHUNK_SIZE,
+        'upload_url': f"/api/uploads/{upload.id}"
+    }
+
+
+def get_own_upload_or_404(upload_id):
+    """Upload sessions are private to the user who started them"""
+    upload = UploadSession.query.get_or_404(upload_id)
+    if upload.uploaded_by != current_user.id:
+        abort(404)
+    return upload
+
+
+def release_upload_claim(upload_id, claim, **values):
+    """Give up a chunk write claim, applying ``values``; False if the claim was no longer ours"""
+    return db.session.execute(
+        db.update(UploadSession).where(
+            UploadSession.id == upload_id, UploadSession.writing_since == claim
+        ).values(writing_since=None, **values),
+        execution_options={'synchronize_session': False}
+    ).rowcount > 0
+
+
+def expire_upload_sessions():
+    """Drop uploads nobody has touched for UPLOAD_SESSION_TTL, with their partial files"""
+    cutoff = datetime.utcnow() - UPLOAD_SESSION_TTL
+    for upload in UploadSession.query.filter(UploadSession.updated_at < cutoff).all():
+        db.session.delete(upload)
+
+
+@app.route('/api/cards/<int:card_id>/uploads', methods=['POST'])
+@login_required
+def start_upload(card_id):
+    try:
+        card, board_id = get_with_board_or_404(Card, card_id)
+        if not has_board_access(board_id, current_user.id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        data = request.get_json() or {}
+        filename = secure_filename(data.get('filename') or '')
+        size = data.get('size')
+        expected_sha256 = data.get('sha256')
+
+        if not filename or not allowed_file(filename):
+            return jsonify({'error': 'File type not allowed'}), 400
+        if not isinstance(size, int) or isinstance(size, bool) or size < 0:
+            return jsonify({'error': 'size must be the file size in bytes'}), 400
+        if size > MAX_FILE_SIZE:
+            return jsonify({'error': f'File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB'}), 400
+        if expected_sha256 is not None and (
+            not isinstance(expected_sha256, str) or len(expected_sha256) != 64
+            or any(c not in '0123456789abcdef' for c in expected_sha256)
+        ):
+            return jsonify({'error': 'sha256 must be a lowercase hex digest'}), 400
+
+        expire_upload_sessions()
+
+        mime_type = data.get('mime_type') or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        # The bytes are always sent, even for content already stored: a hash
+        # alone proves nothing about having the file. add_file deduplicates.
+        upload_id = uuid.uuid4().hex
+        file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{upload_id}_{filename}")
+        chunked_uploads.create_file(file_path)
+        upload = UploadSession(
+            id=upload_id,
+            original_filename=filename,
+            file_path=file_path,
+            mime_type=mime_type,
+            total_size=size,
+            expected_sha256=expected_sha256,
+            card_id=card_id,
+            uploaded_by=current_user.id
+        )
+        db.session.add(upload)
+        db.session.commit()
+
+        return jsonify(upload_status(upload)), 201
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error starting upload')
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+@login_required
+def get_upload(upload_id):
+    """Where to resume: ``offset`` is the number of bytes the server holds (also sent as Upload-Offset)"""
+    upload = get_own_upload_or_404(upload_id)
+    response = jsonify(upload_status(upload))
+    response.headers['Upload-Offset'] = str(upload.received)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+@login_required
+def upload_chunk(upload_id):
+    """Append the raw request body to the upload, starting at ``?offset=``"""
+    upload = get_own_upload_or_404(upload_id)
+    try:
+        offset = request.args.get('offset', type=int)
+        if offset is None:
+            return jsonify({'error': 'offset is required'}), 400
+        if offset != upload.received:
+            return jsonify({'error': 'offset does not match the bytes received', 'offset': upload.received}), 409
+
+        limit = upload.total_size - offset
+        if request.content_length is not None and request.content_length > limit:
+            return jsonify({'error': 'Chunk runs past the declared file size', 'offset': offset}), 413
+
+        # Claim the upload at this offset so no other request writes it meanwhile
+        claim = datetime.utcnow()
+        claimed = db.session.execute(
+            db.update(UploadSession).where(
+                UploadSession.id == upload_id, UploadSession.received == offset,
+                db.or_(
+                    UploadSession.writing_since.is_(None),
+                    UploadSession.writing_since < claim - UPLOAD_CLAIM_TIMEOUT
+                )
+            ).values(writing_since=claim),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        file_path = upload.file_path
+        # Release the database connection while the chunk streams in
+        db.session.commit()
+        if not claimed:
+            return jsonify({'error': 'Upload was changed by another request'}), 409
+
+        try:
+            written, disconnected = chunked_uploads.write_chunk(file_path, offset, request.stream, limit)
+        except Exception as e:
+            release_upload_claim(upload_id, claim)
+            db.session.commit()
+            if isinstance(e, chunked_uploads.UploadTooLarge):
+                return jsonify({'error': 'Chunk runs past the declared file size', 'offset': offset}), 413
+            raise
+
+        # Fails if the claim went stale and another request took the upload over
+        updated = release_upload_claim(
+            upload_id, claim, received=offset + written, updated_at=datetime.utcnow()
+        )
+        db.session.commit()
+
+        if not updated:
+            return jsonify({'error': 'Upload was changed by another request'}), 409
+        if disconnected:
+            return jsonify({'error': 'Connection lost', 'offset': offset + written}), 400
+
+        upload = UploadSession.query.get(upload_id)
+        response = jsonify(upload_status(upload))
+        response.headers['Upload-Offset'] = str(upload.received)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error receiving upload chunk')
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_upload(upload_id):
+    upload = get_own_upload_or_404(upload_id)
+    try:
+        card, board_id = get_with_board_or_404(Card, upload.card_id)
+        if not has_board_access(board_id, current_user.id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        writing = upload.writing_since is not None and upload.writing_since > datetime.utcnow() - UPLOAD_CLAIM_TIMEOUT
+        if upload.received != upload.total_size or writing:
+            return jsonify({'error': 'Upload is incomplete', 'offset': upload.received}), 409
+
+        digest = chunked_uploads.checksum(upload.file_path)
+        if upload.expected_sha256 and digest != upload.expected_sha256:
+            db.session.delete(upload)
+            db.session.commit()
+            return jsonify({'error': 'Checksum mismatch, upload discarded', 'sha256': digest}), 422
+
+        # Moves the upload into the blob store, or drops it if the content is already there
+        file_path = blob_store.add_file(upload.file_path, digest, upload.total_size)
+        attachment = FileAttachment(
+            filename=digest,
+            original_filename=upload.original_filename,
+            file_path=file_path,
+            file_size=upload.total_size,
+            mime_type=upload.mime_type,
+            sha256=digest,
+            card_id=upload.card_id,
+            uploaded_by=upload.uploaded_by
+        )
+        db.session.add(attachment)
+        db.session.delete(upload)
+        record_change(board_id, 'card', attachment.card_id, 'updated')
+        db.session.commit()
+        thumbnails.schedule(attachment)
+
+        return jsonify(attachment_payload(attachment))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error completing upload')
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+@login_required
+def cancel_upload(upload_id):
+    upload = get_own_upload_or_404(upload_id)
+    try:
+        db.session.delete(upload)
+        db.session.commit()
+        return jsonify({'message': 'Upload cancelled'})
+
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error uploading file: {str(e)}")
+        logger.exception('Error cancelling upload')
         return jsonify({'error': str(e)}), 500
 
 
@@ -731,13 +2023,14 @@ def upload_file(card_id):
 def get_card_attachments(card_id):
     try:
         # Check if card exists and user has access
-        card = Card.query.get_or_404(card_id)
-        if not has_board_access(card.list.board_id, current_user.id):
+        card, board_id = get_with_board_or_404(Card, card_id)
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
         attachments = FileAttachment.query.filter_by(card_id=card_id).order_by(
             FileAttachment.uploaded_at.desc()
         ).all()
+        thumbnailed = thumbnails.thumbnailed_ids(attachments)
 
         attachments_data = []
         for attachment in attachments:
@@ -747,45 +2040,163 @@ def get_card_attachments(card_id):
                 'filename': attachment.original_filename,
                 'file_size': attachment.file_size,
                 'mime_type': attachment.mime_type,
-                'uploaded_at': attachment.uploaded_at.isoformat(),
+                'uploaded_at': attachment.uploaded_at,
                 'uploaded_by': {
                     'id': uploader.id,
                     'username': uploader.username
                 },
                 'icon': get_file_icon(attachment.mime_type, attachment.original_filename),
-                'download_url': f"/api/attachments/{attachment.id}/download"
+                'download_url': f"/api/attachments/{attachment.id}/download",
+                'thumbnail_url': thumbnail_url(attachment.id, thumbnailed, CARD_THUMBNAIL_SIZE)
             })
 
         return jsonify(attachments_data)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error getting attachments: {str(e)}")
+        logger.exception('Error getting attachments')
         return jsonify({'error': str(e)}), 500
 
 
+def offloaded_download(file_path, mime_type, download_name, inline, etag, last_modified):
+    """Header-only response that has the front proxy send the file, or None to send it ourselves.
+
+    The proxy serves the body (and Range requests) from its own file
+    handling, so the worker is free as soon as the access check is done.
+    Conditional requests are still answered here, without a redirect header,
+    so a 304 never turns into a full transfer.
+    """
+    mode = app.config['ATTACHMENT_OFFLOAD']
+    if mode == 'none':
+        return None
+
+    if mode == 'x-accel-redirect':
+        upload_root = os.path.abspath(app.config['UPLOAD_FOLDER'])
+        relative = os.path.relpath(file_path, upload_root)
+        if relative.startswith(os.pardir):
+            # Not under the internal location; stream it from here instead
+            return None
+        header = 'X-Accel-Redirect'
+        target = app.config['ATTACHMENT_OFFLOAD_PREFIX'].rstrip('/') + '/' + quote(relative.replace(os.sep, '/'))
+    else:
+        header = 'X-Sendfile'
+        target = file_path
+
+    response = Response(mimetype=mime_type)
+    response.headers.set('Content-Disposition', 'inline' if inline else 'attachment', filename=download_name)
+    if etag:
+        response.set_etag(etag)
+    response.last_modified = last_modified
+    response.make_conditional(request)
+    if response.status_code == 200:
+        response.headers[header] = target
+    return response
+
+
 @app.route('/api/attachments/<int:attachment_id>/download')
 @login_required
 def download_file(attachment_id):
     try:
-        attachment = FileAttachment.query.get_or_404(attachment_id)
+        attachment, board_id = get_with_board_or_404(FileAttachment, attachment_id)
 
         # Check if user has access to the card
-        if not has_board_access(attachment.card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
+        # Resolve against the working directory, where uploads are written
+        file_path = os.path.abspath(attachment.file_path)
+
         # Check if file exists
-        if not os.path.exists(attachment.file_path):
+        if not os.path.exists(file_path):
             return jsonify({'error': 'File not found'}), 404
 
-        return send_file(
-            attachment.file_path,
-            as_attachment=True,
-            download_name=attachment.original_filename,
-            mimetype=attachment.mime_type
+        inline = (
+            request.args.get('inline') == '1'
+            and attachment.mime_type.startswith(INLINE_MIME_PREFIXES)
+            and attachment.mime_type != 'image/svg+xml'  # SVG can carry script
+        )
+        response = offloaded_download(
+            file_path, attachment.mime_type, attachment.original_filename,
+            inline, attachment.sha256, attachment.uploaded_at
         )
+        if response is None:
+            # Handing send_file a path lets the server stream it with
+            # sendfile(); conditional=True answers Range, If-Range,
+            # If-None-Match and If-Modified-Since
+            response = send_file(
+                file_path,
+                as_attachment=not inline,
+                download_name=attachment.original_filename,
+                mimetype=attachment.mime_type,
+                conditional=True,
+                etag=attachment.sha256 or True,
+                last_modified=attachment.uploaded_at
+            )
+        # Blob-backed files get their content hash as a strong ETag, and since
+        # an attachment's content never changes they may be cached for good
+        if attachment.sha256:
+            response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'private, no-cache'
+        response.headers['Accept-Ranges'] = 'bytes'
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        return response
 
+    except RequestedRangeNotSatisfiable as e:
+        return e.get_response()
+
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error downloading file: {str(e)}")
+        logger.exception('Error downloading file')
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/attachments/<int:attachment_id>/thumbnail/<int:size>')
+@login_required
+def download_thumbnail(attachment_id, size):
+    try:
+        attachment, board_id = get_with_board_or_404(FileAttachment, attachment_id)
+        if not has_board_access(board_id, current_user.id):
+            return jsonify({'error': 'Access denied'}), 403
+
+        thumbnail = thumbnails.best_thumbnail(attachment, size)
+        if thumbnail is None:
+            return jsonify({'error': 'Thumbnail not found'}), 404
+        file_path = os.path.abspath(thumbnail.file_path)
+        if not os.path.exists(file_path):
+            return jsonify({'error': 'File not found'}), 404
+
+        download_name = f"{os.path.splitext(attachment.original_filename)[0]}-{thumbnail.size}{os.path.splitext(file_path)[1]}"
+        etag = f"{attachment.sha256 or attachment.id}-{thumbnail.size}"
+        response = offloaded_download(
+            file_path, thumbnail.mime_type, download_name, True, etag, thumbnail.created_at
+        )
+        if response is None:
+            response = send_file(
+                file_path,
+                download_name=download_name,
+                mimetype=thumbnail.mime_type,
+                conditional=True,
+                etag=etag,
+                last_modified=thumbnail.created_at
+            )
+        # Thumbnails are rendered once, from content that never changes
+        if attachment.sha256:
+            response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'private, no-cache'
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        return response
+
+    except RequestedRangeNotSatisfiable as e:
+        return e.get_response()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error downloading thumbnail')
         return jsonify({'error': str(e)}), 500
 
 
@@ -793,27 +2204,31 @@ def download_file(attachment_id):
 @login_required
 def delete_attachment(attachment_id):
     try:
-        attachment = FileAttachment.query.get_or_404(attachment_id)
+        attachment, board_id = get_with_board_or_404(FileAttachment, attachment_id)
 
         # Check if user has access to the card or is the uploader
-        if not has_board_access(attachment.card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
-        # Get file path before deleting the record
-        file_path = attachment.file_path
+        # Files in the blob store are shared and released with the record;
+        # only files stored before it belong to this attachment alone
+        own_file_path = attachment.file_path if not attachment.sha256 else None
 
         # Delete the database record
         db.session.delete(attachment)
+        record_change(board_id, 'card', attachment.card_id, 'updated')
         db.session.commit()
 
         # Delete the physical file
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        if own_file_path and os.path.exists(own_file_path):
+            os.remove(own_file_path)
 
         return jsonify({'message': 'File deleted successfully'})
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error deleting attachment: {str(e)}")
+        logger.exception('Error deleting attachment')
         return jsonify({'error': str(e)}), 500
 
 
@@ -845,8 +2260,8 @@ def search_users():
 def create_checklist(card_id):
     try:
         # Check if card exists and user has access
-        card = Card.query.get_or_404(card_id)
-        if not has_board_access(card.list.board_id, current_user.id):
+        card, board_id = get_with_board_or_404(Card, card_id)
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
         data = request.get_json()
@@ -857,7 +2272,9 @@ def create_checklist(card_id):
             card_id=card_id
         )
         db.session.add(checklist)
-        db.session.commit()
+        db.session.flush()
+        record_change(board_id, 'checklist', checklist.id, 'created')
+        commit_request()
 
         return jsonify({
             'id': checklist.id,
@@ -867,8 +2284,10 @@ def create_checklist(card_id):
             'progress': 0
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error creating checklist: {str(e)}")
+        logger.exception('Error creating checklist')
         return jsonify({'error': str(e)}), 500
 
 
@@ -876,10 +2295,10 @@ def create_checklist(card_id):
 @login_required
 def update_checklist(checklist_id):
     try:
-        checklist = Checklist.query.get_or_404(checklist_id)
+        checklist, board_id = get_with_board_or_404(Checklist, checklist_id)
 
         # Check if user has access to the card
-        if not has_board_access(checklist.card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
         data = request.get_json()
@@ -887,7 +2306,8 @@ def update_checklist(checklist_id):
         if 'title' in data:
             checklist.title = data['title']
 
-        db.session.commit()
+        record_change(board_id, 'checklist', checklist_id, 'updated')
+        commit_request()
 
         return jsonify({
             'id': checklist.id,
@@ -895,8 +2315,10 @@ def update_checklist(checklist_id):
             'position': checklist.position
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error updating checklist: {str(e)}")
+        logger.exception('Error updating checklist')
         return jsonify({'error': str(e)}), 500
 
 
@@ -904,19 +2326,22 @@ def update_checklist(checklist_id):
 @login_required
 def delete_checklist(checklist_id):
     try:
-        checklist = Checklist.query.get_or_404(checklist_id)
+        checklist, board_id = get_with_board_or_404(Checklist, checklist_id)
 
         # Check if user has access to the card
-        if not has_board_access(checklist.card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
         db.session.delete(checklist)
-        db.session.commit()
+        record_change(board_id, 'checklist', checklist_id, 'deleted')
+        commit_request()
 
         return jsonify({'message': 'Checklist deleted successfully'})
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error deleting checklist: {str(e)}")
+        logger.exception('Error deleting checklist')
         return jsonify({'error': str(e)}), 500
 
 
@@ -924,10 +2349,10 @@ def delete_checklist(checklist_id):
 @login_required
 def create_checklist_item(checklist_id):
     try:
-        checklist = Checklist.query.get_or_404(checklist_id)
+        checklist, board_id = get_with_board_or_404(Checklist, checklist_id)
 
         # Check if user has access to the card
-        if not has_board_access(checklist.card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
         data = request.get_json()
@@ -936,30 +2361,29 @@ def create_checklist_item(checklist_id):
         if not text:
             return jsonify({'error': 'Item text is required'}), 400
 
-        # Get the next position
-        last_item = ChecklistItem.query.filter_by(checklist_id=checklist_id).order_by(
-            ChecklistItem.position.desc()
-        ).first()
-        next_position = last_item.position + 1 if last_item else 0
-
+        position = resolve_position(board_id, ChecklistItem, checklist_id, {})
         item = ChecklistItem(
             text=text,
             checklist_id=checklist_id,
-            position=next_position
+            position=position
         )
         db.session.add(item)
-        db.session.commit()
+        record_change(board_id, 'checklist', checklist_id, 'updated')
+        commit_request()
+        after_commit(rebalance_if_needed, ChecklistItem, checklist_id, position)
 
         return jsonify({
             'id': item.id,
             'text': item.text,
             'is_completed': item.is_completed,
             'position': item.position,
-            'created_at': item.created_at.isoformat()
+            'created_at': item.created_at
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error creating checklist item: {str(e)}")
+        logger.exception('Error creating checklist item')
         return jsonify({'error': str(e)}), 500
 
 
@@ -967,10 +2391,10 @@ def create_checklist_item(checklist_id):
 @login_required
 def update_checklist_item(item_id):
     try:
-        item = ChecklistItem.query.get_or_404(item_id)
+        item, board_id = get_with_board_or_404(ChecklistItem, item_id)
 
         # Check if user has access to the card
-        if not has_board_access(item.checklist.card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
         data = request.get_json()
@@ -984,21 +2408,31 @@ def update_checklist_item(item_id):
             item.is_completed = data['is_completed']
             item.completed_at = datetime.utcnow() if data['is_completed'] else None
 
-        if 'position' in data:
-            item.position = data['position']
+        position = None
+        if any(data.get(field) is not None for field in ('position', 'after_id', 'before_id')):
+            try:
+                position = resolve_position(board_id, ChecklistItem, item.checklist_id, data, item.id)
+            except ranking.RankError as e:
+                return jsonify({'error': str(e)}), 400
+            item.position = position
 
-        db.session.commit()
+        checklist_id = item.checklist_id
+        record_change(board_id, 'checklist', checklist_id, 'updated')
+        commit_request()
+        after_commit(rebalance_if_needed, ChecklistItem, checklist_id, position)
 
         return jsonify({
             'id': item.id,
             'text': item.text,
             'is_completed': item.is_completed,
             'position': item.position,
-            'completed_at': item.completed_at.isoformat() if item.completed_at else None
+            'completed_at': item.completed_at
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error updating checklist item: {str(e)}")
+        logger.exception('Error updating checklist item')
         return jsonify({'error': str(e)}), 500
 
 
@@ -1006,19 +2440,22 @@ def update_checklist_item(item_id):
 @login_required
 def delete_checklist_item(item_id):
     try:
-        item = ChecklistItem.query.get_or_404(item_id)
+        item, board_id = get_with_board_or_404(ChecklistItem, item_id)
 
         # Check if user has access to the card
-        if not has_board_access(item.checklist.card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
         db.session.delete(item)
-        db.session.commit()
+        record_change(board_id, 'checklist', item.checklist_id, 'updated')
+        commit_request()
 
         return jsonify({'message': 'Checklist item deleted successfully'})
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error deleting checklist item: {str(e)}")
+        logger.exception('Error deleting checklist item')
         return jsonify({'error': str(e)}), 500
 
 
@@ -1039,8 +2476,7 @@ def create_label(board_id):
             return jsonify({'error': 'Label name is required'}), 400
 
         # Validate color format
-        import re
-        if not re.match(r'^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$', color):
+        if not is_label_color(color):
             return jsonify({'error': 'Invalid color format'}), 400
 
         label = Label(
@@ -1049,18 +2485,22 @@ def create_label(board_id):
             board_id=board_id
         )
         db.session.add(label)
-        db.session.commit()
+        db.session.flush()
+        record_change(board_id, 'label', label.id, 'created')
+        commit_request()
 
         return jsonify({
             'id': label.id,
             'name': label.name,
             'color': label.color,
             'board_id': label.board_id,
-            'created_at': label.created_at.isoformat()
+            'created_at': label.created_at
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error creating label: {str(e)}")
+        logger.exception('Error creating label')
         return jsonify({'error': str(e)}), 500
 
 
@@ -1081,14 +2521,16 @@ def get_board_labels(board_id):
                 'name': label.name,
                 'color': label.color,
                 'board_id': label.board_id,
-                'created_at': label.created_at.isoformat(),
+                'created_at': label.created_at,
                 'card_count': len(label.cards)  # Count of cards with this label
             })
 
         return jsonify(labels_data)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error getting board labels: {str(e)}")
+        logger.exception('Error getting board labels')
         return jsonify({'error': str(e)}), 500
 
 
@@ -1112,12 +2554,12 @@ def update_label(label_id):
 
         if 'color' in data:
             color = data['color']
-            import re
-            if not re.match(r'^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$', color):
+            if not is_label_color(color):
                 return jsonify({'error': 'Invalid color format'}), 400
             label.color = color
 
-        db.session.commit()
+        record_change(label.board_id, 'label', label_id, 'updated')
+        commit_request()
 
         return jsonify({
             'id': label.id,
@@ -1126,8 +2568,10 @@ def update_label(label_id):
             'board_id': label.board_id
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error updating label: {str(e)}")
+        logger.exception('Error updating label')
         return jsonify({'error': str(e)}), 500
 
 
@@ -1141,13 +2585,17 @@ def delete_label(label_id):
         if not has_board_access(label.board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
+        board_id = label.board_id
         db.session.delete(label)
-        db.session.commit()
+        record_change(board_id, 'label', label_id, 'deleted')
+        commit_request()
 
         return jsonify({'message': 'Label deleted successfully'})
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error deleting label: {str(e)}")
+        logger.exception('Error deleting label')
         return jsonify({'error': str(e)}), 500
 
 
@@ -1155,11 +2603,11 @@ def delete_label(label_id):
 @login_required
 def add_label_to_card(card_id, label_id):
     try:
-        card = Card.query.get_or_404(card_id)
+        card, board_id = get_with_board_or_404(Card, card_id)
         label = Label.query.get_or_404(label_id)
 
         # Check if user has access to both card and label boards
-        if (not has_board_access(card.list.board_id, current_user.id) or
+        if (not has_board_access(board_id, current_user.id) or
                 not has_board_access(label.board_id, current_user.id)):
             return jsonify({'error': 'Access denied'}), 403
 
@@ -1168,7 +2616,8 @@ def add_label_to_card(card_id, label_id):
             return jsonify({'error': 'Label already added to card'}), 400
 
         card.labels.append(label)
-        db.session.commit()
+        record_change(board_id, 'card', card_id, 'updated')
+        commit_request()
 
         return jsonify({
             'message': 'Label added to card',
@@ -1179,8 +2628,10 @@ def add_label_to_card(card_id, label_id):
             }
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error adding label to card: {str(e)}")
+        logger.exception('Error adding label to card')
         return jsonify({'error': str(e)}), 500
 
 
@@ -1188,11 +2639,11 @@ def add_label_to_card(card_id, label_id):
 @login_required
 def remove_label_from_card(card_id, label_id):
     try:
-        card = Card.query.get_or_404(card_id)
+        card, board_id = get_with_board_or_404(Card, card_id)
         label = Label.query.get_or_404(label_id)
 
         # Check if user has access to both card and label boards
-        if (not has_board_access(card.list.board_id, current_user.id) or
+        if (not has_board_access(board_id, current_user.id) or
                 not has_board_access(label.board_id, current_user.id)):
             return jsonify({'error': 'Access denied'}), 403
 
@@ -1201,12 +2652,15 @@ def remove_label_from_card(card_id, label_id):
             return jsonify({'error': 'Label not found on card'}), 404
 
         card.labels.remove(label)
-        db.session.commit()
+        record_change(board_id, 'card', card_id, 'updated')
+        commit_request()
 
         return jsonify({'message': 'Label removed from card'})
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error removing label from card: {str(e)}")
+        logger.exception('Error removing label from card')
         return jsonify({'error': str(e)}), 500
 
 
@@ -1214,10 +2668,10 @@ def remove_label_from_card(card_id, label_id):
 @login_required
 def get_card_labels(card_id):
     try:
-        card = Card.query.get_or_404(card_id)
+        card, board_id = get_with_board_or_404(Card, card_id)
 
         # Check if user has access to the card
-        if not has_board_access(card.list.board_id, current_user.id):
+        if not has_board_access(board_id, current_user.id):
             return jsonify({'error': 'Access denied'}), 403
 
         labels_data = []
@@ -1231,27 +2685,238 @@ def get_card_labels(card_id):
 
         return jsonify(labels_data)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error getting card labels: {str(e)}")
+        logger.exception('Error getting card labels')
         return jsonify({'error': str(e)}), 500
 
 
 # Search helpers and routes
-def get_highlighted_fields(item, query):
-    """Determine which fields contain the search query"""
-    highlighted = {}
-    query_lower = query.lower()
+SEARCH_PAGE_SIZE = 50
+SEARCH_MAX_PAGE_SIZE = 200
 
-    if hasattr(item, 'title') and item.title and query_lower in item.title.lower():
-        highlighted['title'] = True
 
-    if hasattr(item, 'description') and item.description and query_lower in item.description.lower():
-        highlighted['description'] = True
+def encode_search_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
 
-    if hasattr(item, 'name') and item.name and query_lower in item.name.lower():
-        highlighted['name'] = True
 
-    return highlighted
+def decode_search_cursor(cursor):
+    """Decode a search cursor into ``{stream: [score, id] | False}``.
+
+    A missing stream starts from the top; ``False`` marks a stream that has
+    no more results. Raises ValueError for malformed cursors.
+    """
+    if not cursor:
+        return {}
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(state, dict):
+        raise ValueError('Invalid cursor')
+    for position in state.values():
+        if position is not False and not (
+            isinstance(position, list) and len(position) == 2
+            and isinstance(position[0], (int, float)) and isinstance(position[1], int)
+        ):
+            raise ValueError('Invalid cursor')
+    return state
+
+
+# Card fields of search results clients can pick with ?fields=; the match
+# details (score, highlights, snippet, ...) are always included
+SEARCH_CARD_FIELDS = frozenset({'id', 'title', 'description', 'due_date', 'created_by', 'labels', 'list', 'board'})
+SEARCH_CARD_SUMMARY_FIELDS = frozenset({'id', 'title', 'due_date', 'labels', 'list', 'board'})
+
+
+def hydrate_search_cards(query, hits, include_board, fields=SEARCH_CARD_FIELDS):
+    """Turn ranked card hits into search results with a fixed number of batched queries"""
+    card_ids = [hit['id'] for hit in hits]
+    if not card_ids:
+        return []
+
+    terms = search_index.query_terms(query)
+    documents = search_index.load_documents(search_index.CARD, card_ids)
+    matches = {card_id: search_index.describe_match(document, terms) for card_id, document in documents.items()}
+
+    cards = {card.id: card for card in Card.query.filter(Card.id.in_(card_ids)).all()}
+    lists = {list_item.id: list_item for list_item in List.query.filter(
+        List.id.in_({card.list_id for card in cards.values()})
+    ).all()}
+    users = {}
+    if 'created_by' in fields:
+        users = {user.id: user for user in User.query.filter(
+            User.id.in_({card.created_by for card in cards.values()})
+        ).all()}
+    boards = {}
+    if include_board and 'board' in fields:
+        boards = {board.id: board for board in Board.query.filter(
+            Board.id.in_({hit['board_id'] for hit in hits})
+        ).all()}
+
+    labels_by_card = defaultdict(list)
+    if 'labels' in fields:
+        label_rows = db.session.query(card_labels.c.card_id, Label).join(
+            Label, Label.id == card_labels.c.label_id
+        ).filter(card_labels.c.card_id.in_(card_ids)).order_by(Label.id).all()
+        for card_id, label in label_rows:
+            labels_by_card[card_id].append({
+                'id': label.id,
+                'name': label.name,
+                'color': label.color
+            })
+
+    # Checklist items whose text matched, for every card at once
+    items_by_card = defaultdict(list)
+    matched_texts = {text for match in matches.values() for text in match['checklist_items']}
+    if matched_texts:
+        item_rows = db.session.query(Checklist.card_id, Checklist.title, ChecklistItem).join(
+            ChecklistItem, ChecklistItem.checklist_id == Checklist.id
+        ).filter(
+            Checklist.card_id.in_(card_ids),
+            ChecklistItem.text.in_(matched_texts)
+        ).order_by(Checklist.position, ChecklistItem.position).all()
+        for card_id, checklist_title, item in item_rows:
+            if item.text in matches[card_id]['checklist_items']:
+                items_by_card[card_id].append({
+                    'checklist_title': checklist_title,
+                    'item_text': item.text,
+                    'is_completed': item.is_completed
+                })
+
+    results = []
+    for hit in hits:
+        card = cards.get(hit['id'])
+        match = matches.get(hit['id'])
+        if not card or not match:
+            continue
+
+        list_item = lists[card.list_id]
+        matching_checklist_items = items_by_card[card.id]
+
+        highlighted_fields = {field: True for field in match['highlights']}
+        if match['labels']:
+            highlighted_fields['labels'] = match['labels']
+
+        card_data = {
+            'id': card.id,
+            'type': 'card',
+            'matching_checklist_items': matching_checklist_items,
+            'score': hit['score'],
+            'highlights': match['highlights'],
+            'snippet': match['snippet'],
+            'highlighted_fields': highlighted_fields
+        }
+        if 'title' in fields:
+            card_data['title'] = card.title
+        if 'description' in fields:
+            card_data['description'] = card.description
+        if 'due_date' in fields:
+            card_data['due_date'] = card.due_date
+        if 'list' in fields:
+            card_data['list'] = {
+                'id': list_item.id,
+                'title': list_item.title
+            }
+        if 'created_by' in fields:
+            card_creator = users[card.created_by]
+            card_data['created_by'] = {
+                'id': card_creator.id,
+                'username': card_creator.username
+            }
+        if 'labels' in fields:
+            card_data['labels'] = labels_by_card[card.id]
+        if include_board and 'board' in fields:
+            board = boards[hit['board_id']]
+            card_data['board'] = {
+                'id': board.id,
+                'title': board.title
+            }
+        if match['labels'] and not match['highlights'] and not matching_checklist_items:
+            card_data['matched_via_label'] = True
+
+        results.append(card_data)
+
+    return results
+
+
+def hydrate_search_boards(query, hits):
+    """Turn ranked board hits into search results with batched queries"""
+    board_ids = [hit['id'] for hit in hits]
+    if not board_ids:
+        return []
+
+    terms = search_index.query_terms(query)
+    documents = search_index.load_documents(search_index.BOARD, board_ids)
+    boards = {board.id: board for board in Board.query.filter(Board.id.in_(board_ids)).all()}
+    owners = {user.id: user for user in User.query.filter(
+        User.id.in_({board.user_id for board in boards.values()})
+    ).all()}
+
+    results = []
+    for hit in hits:
+        board = boards.get(hit['id'])
+        if not board or hit['id'] not in documents:
+            continue
+        owner = owners[board.user_id]
+        match = search_index.describe_match(documents[hit['id']], terms)
+        results.append({
+            'id': board.id,
+            'title': board.title,
+            'description': board.description,
+            'type': 'board',
+            'owner': {
+                'id': owner.id,
+                'username': owner.username
+            },
+            'score': hit['score'],
+            'highlights': match['highlights'],
+            'snippet': match['snippet'],
+            'highlighted_fields': {field: True for field in match['highlights']}
+        })
+
+    return results
+
+
+def run_paginated_search(query, board_ids, include_boards):
+    """Run one page of a search over cards (and boards) for the current request.
+
+    Reads ``limit``, ``cursor`` and ``fields`` (of card results) from the
+    query string. Each result type is paged independently by keyset on
+    (score, id), so no request ever loads more than ``limit`` hits of each type.
+    """
+    fields = requested_fields(SEARCH_CARD_FIELDS, SEARCH_CARD_SUMMARY_FIELDS, SEARCH_CARD_FIELDS)
+    limit = request.args.get('limit', SEARCH_PAGE_SIZE, type=int)
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    limit = min(limit, SEARCH_MAX_PAGE_SIZE)
+    cursor = decode_search_cursor(request.args.get('cursor'))
+
+    streams = [('cards', search_index.CARD)]
+    if include_boards:
+        streams.append(('boards', search_index.BOARD))
+
+    search_results = {}
+    next_state = {}
+    for stream, doc_type in streams:
+        position = cursor.get(stream)
+        if position is False:
+            hits, has_more = [], False
+        else:
+            hits, has_more = search_index.search(query, board_ids, doc_type, limit, position)
+
+        if doc_type == search_index.CARD:
+            search_results[stream] = hydrate_search_cards(query, hits, include_board=include_boards, fields=fields)
+        else:
+            search_results[stream] = hydrate_search_boards(query, hits)
+        next_state[stream] = [hits[-1]['score'], hits[-1]['id']] if has_more else False
+
+    search_results['total_results'] = sum(len(search_results[stream]) for stream, _ in streams)
+    has_more = any(position is not False for position in next_state.values())
+    search_results['has_more'] = has_more
+    search_results['next_cursor'] = encode_search_cursor(next_state) if has_more else None
+    return search_results
 
 
 @app.route('/api/search')
@@ -1263,166 +2928,22 @@ def search():
             return jsonify({'results': []})
 
         # Get all boards the user has access to
-        owned_boards = Board.query.filter_by(user_id=current_user.id).all()
-        member_boards = Board.query.join(BoardMember).filter(
-            BoardMember.user_id == current_user.id
-        ).all()
-        all_boards = owned_boards + member_boards
-        board_ids = [board.id for board in all_boards]
+        board_ids = sorted(accessible_board_ids(current_user.id))
 
         if not board_ids:
             return jsonify({'results': []})
 
-        search_results = {
-            'cards': [],
-            'boards': [],
-            'total_results': 0
-        }
-
-        # Search in cards (title, description)
-        card_results = Card.query.join(List).filter(
-            List.board_id.in_(board_ids),
-            db.or_(
-                Card.title.ilike(f'%{query}%'),
-                Card.description.ilike(f'%{query}%')
-            )
-        ).all()
-
-        for card in card_results:
-            card_creator = User.query.get(card.created_by)
-            list_item = List.query.get(card.list_id)
-            board = Board.query.get(list_item.board_id)
-
-            # Get labels for this card
-            labels_data = []
-            for label in card.labels:
-                labels_data.append({
-                    'id': label.id,
-                    'name': label.name,
-                    'color': label.color
-                })
-
-            # Search in checklist items
-            matching_checklist_items = []
-            checklists = Checklist.query.filter_by(card_id=card.id).all()
-            for checklist in checklists:
-                items = ChecklistItem.query.filter_by(checklist_id=checklist.id).filter(
-                    ChecklistItem.text.ilike(f'%{query}%')
-                ).all()
-                for item in items:
-                    matching_checklist_items.append({
-                        'checklist_title': checklist.title,
-                        'item_text': item.text,
-                        'is_completed': item.is_completed
-                    })
-
-            search_results['cards'].append({
-                'id': card.id,
-                'title': card.title,
-                'description': card.description,
-                'type': 'card',
-                'board': {
-                    'id': board.id,
-                    'title': board.title
-                },
-                'list': {
-                    'id': list_item.id,
-                    'title': list_item.title
-                },
-                'created_by': {
-                    'id': card_creator.id,
-                    'username': card_creator.username
-                },
-                'labels': labels_data,
-                'matching_checklist_items': matching_checklist_items,
-                'due_date': card.due_date.isoformat() if card.due_date else None,
-                'highlighted_fields': get_highlighted_fields(card, query)
-            })
-
-        # Search in boards (title, description)
-        board_results = Board.query.filter(
-            Board.id.in_(board_ids),
-            db.or_(
-                Board.title.ilike(f'%{query}%'),
-                Board.description.ilike(f'%{query}%')
-            )
-        ).all()
-
-        for board in board_results:
-            owner = User.query.get(board.user_id)
-            search_results['boards'].append({
-                'id': board.id,
-                'title': board.title,
-                'description': board.description,
-                'type': 'board',
-                'owner': {
-                    'id': owner.id,
-                    'username': owner.username
-                },
-                'highlighted_fields': get_highlighted_fields(board, query)
-            })
-
-        # Search in labels
-        label_results = Label.query.filter(
-            Label.board_id.in_(board_ids),
-            Label.name.ilike(f'%{query}%')
-        ).all()
-
-        for label in label_results:
-            board = Board.query.get(label.board_id)
-            # Find cards with this label that match the search
-            matching_cards = Card.query.join(card_labels).join(List).filter(
-                card_labels.c.label_id == label.id,
-                List.board_id.in_(board_ids)
-            ).all()
-
-            for card in matching_cards:
-                card_creator = User.query.get(card.created_by)
-                search_results['cards'].append({
-                    'id': card.id,
-                    'title': card.title,
-                    'description': card.description,
-                    'type': 'card',
-                    'board': {
-                        'id': board.id,
-                        'title': board.title
-                    },
-                    'list': {
-                        'id': card.list.id,
-                        'title': card.list.title
-                    },
-                    'created_by': {
-                        'id': card_creator.id,
-                        'username': card_creator.username
-                    },
-                    'labels': [{
-                        'id': label.id,
-                        'name': label.name,
-                        'color': label.color
-                    }],
-                    'matching_checklist_items': [],
-                    'due_date': card.due_date.isoformat() if card.due_date else None,
-                    'highlighted_fields': {
-                        'labels': [label.name]
-                    },
-                    'matched_via_label': True
-                })
-
-        # Remove duplicate cards
-        seen_card_ids = set()
-        unique_cards = []
-        for card in search_results['cards']:
-            if card['id'] not in seen_card_ids:
-                seen_card_ids.add(card['id'])
-                unique_cards.append(card)
-
-        search_results['cards'] = unique_cards
-        search_results['total_results'] = len(unique_cards) + len(search_results['boards'])
+        try:
+            search_results = run_paginated_search(query, board_ids, include_boards=True)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         return jsonify(search_results)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"DEBUG: Error in search: {str(e)}")
+        logger.exception('Error in search')
         return jsonify({'error': str(e)}), 500
 
 
@@ -1438,125 +2959,127 @@ def search_in_board(board_id):
         if not query:
             return jsonify({'results': []})
 
-        search_results = {
-            'cards': [],
-            'total_results': 0
-        }
+        try:
+            search_results = run_paginated_search(query, [board_id], include_boards=False)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        # Search in cards within this board
-        card_results = Card.query.join(List).filter(
-            List.board_id == board_id,
-            db.or_(
-                Card.title.ilike(f'%{query}%'),
-                Card.description.ilike(f'%{query}%')
-            )
-        ).all()
+        return jsonify(search_results)
 
-        for card in card_results:
-            card_creator = User.query.get(card.created_by)
-            list_item = List.query.get(card.list_id)
-
-            # Get labels for this card
-            labels_data = []
-            for label in card.labels:
-                labels_data.append({
-                    'id': label.id,
-                    'name': label.name,
-                    'color': label.color
-                })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception('Error in board search')
+        return jsonify({'error': str(e)}), 500
 
-            # Search in checklist items
-            matching_checklist_items = []
-            checklists = Checklist.query.filter_by(card_id=card.id).all()
-            for checklist in checklists:
-                items = ChecklistItem.query.filter_by(checklist_id=checklist.id).filter(
-                    ChecklistItem.text.ilike(f'%{query}%')
-                ).all()
-                for item in items:
-                    matching_checklist_items.append({
-                        'checklist_title': checklist.title,
-                        'item_text': item.text,
-                        'is_completed': item.is_completed
-                    })
-
-            search_results['cards'].append({
-                'id': card.id,
-                'title': card.title,
-                'description': card.description,
-                'type': 'card',
-                'list': {
-                    'id': list_item.id,
-                    'title': list_item.title
-                },
-                'created_by': {
-                    'id': card_creator.id,
-                    'username': card_creator.username
-                },
-                'labels': labels_data,
-                'matching_checklist_items': matching_checklist_items,
-                'due_date': card.due_date.isoformat() if card.due_date else None,
-                'highlighted_fields': get_highlighted_fields(card, query)
-            })
 
-        # Search in labels within this board
-        label_results = Label.query.filter(
-            Label.board_id == board_id,
-            Label.name.ilike(f'%{query}%')
-        ).all()
+# Batch API: many operations, one authorization pass and one commit
+BATCH_MAX_OPERATIONS = 100
+BATCH_ENDPOINTS = frozenset({
+    'create_board', 'delete_board', 'add_board_member', 'remove_board_member', 'create_list', 'delete_list',
+    'update_board_order', 'create_card', 'update_card', 'delete_card', 'create_checklist', 'update_checklist',
+    'delete_checklist', 'create_checklist_item', 'update_checklist_item', 'delete_checklist_item',
+    'create_label', 'update_label', 'delete_label', 'add_label_to_card', 'remove_label_from_card'
+})
+# "$2.id" or "$0.member.id": a value from the response of an earlier operation
+BATCH_REFERENCE = re.compile(r'\$(\d+)\.([A-Za-z_]\w*(?:\.\w+)*)')
+
+
+def resolve_batch_reference(match, results):
+    index = int(match.group(1))
+    if index >= len(results):
+        raise ValueError(f'{match.group(0)} refers to an operation that has not run yet')
+    value = results[index]
+    for key in match.group(2).split('.'):
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            raise ValueError(f'{match.group(0)} is not in the response of operation {index}')
+    return value
 
-        for label in label_results:
-            # Find cards with this label
-            matching_cards = Card.query.join(card_labels).join(List).filter(
-                card_labels.c.label_id == label.id,
-                List.board_id == board_id
-            ).all()
-
-            for card in matching_cards:
-                card_creator = User.query.get(card.created_by)
-                list_item = List.query.get(card.list_id)
-
-                search_results['cards'].append({
-                    'id': card.id,
-                    'title': card.title,
-                    'description': card.description,
-                    'type': 'card',
-                    'list': {
-                        'id': list_item.id,
-                        'title': list_item.title
-                    },
-                    'created_by': {
-                        'id': card_creator.id,
-                        'username': card_creator.username
-                    },
-                    'labels': [{
-                        'id': label.id,
-                        'name': label.name,
-                        'color': label.color
-                    }],
-                    'matching_checklist_items': [],
-                    'due_date': card.due_date.isoformat() if card.due_date else None,
-                    'highlighted_fields': {
-                        'labels': [label.name]
-                    },
-                    'matched_via_label': True
-                })
 
-        # Remove duplicate cards
-        seen_card_ids = set()
-        unique_cards = []
-        for card in search_results['cards']:
-            if card['id'] not in seen_card_ids:
-                seen_card_ids.add(card['id'])
-                unique_cards.append(card)
+def resolve_batch_references(value, results):
+    """``value`` with every string that is exactly a reference replaced by what it refers to"""
+    if isinstance(value, str):
+        match = BATCH_REFERENCE.fullmatch(value)
+        return resolve_batch_reference(match, results) if match else value
+    if isinstance(value, list):
+        return [resolve_batch_references(item, results) for item in value]
+    if isinstance(value, dict):
+        return {key: resolve_batch_references(item, results) for key, item in value.items()}
+    return value
 
-        search_results['cards'] = unique_cards
-        search_results['total_results'] = len(unique_cards)
 
-        return jsonify(search_results)
+def batch_error(message, index, status=400):
+    return jsonify({'error': message, 'index': index}), status
 
+
+@app.route('/api/batch', methods=['POST'])
+@login_required
+def run_batch():
+    """Run ``operations`` in order through their usual routes, committing all or none of them"""
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify({'error': f'At most {BATCH_MAX_OPERATIONS} operations per batch'}), 400
+
+    adapter = app.url_map.bind_to_environ(request.environ)
+    results = []
+    statuses = []
+    committed = False
+    g.batch_after_commit = []
+    try:
+        for index, operation in enumerate(operations):
+            if (not isinstance(operation, dict) or not isinstance(operation.get('method'), str)
+                    or not isinstance(operation.get('path'), str)):
+                return batch_error('Each operation needs a method and a path', index)
+            method = operation['method'].upper()
+            try:
+                path = BATCH_REFERENCE.sub(lambda match: str(resolve_batch_reference(match, results)), operation['path'])
+                body = resolve_batch_references(operation.get('body'), results)
+                endpoint, view_args = adapter.match(path.split('?', 1)[0], method)
+            except ValueError as e:
+                return batch_error(str(e), index)
+            except HTTPException:
+                return batch_error(f'No route for {method} {path}', index)
+            if endpoint not in BATCH_ENDPOINTS:
+                return batch_error(f'{method} {path} cannot be batched', index)
+
+            options = {} if body is None else {'json': body}
+            # Same user, g and session; only the request (path, body) is the operation's own
+            with app.test_request_context(path, method=method, **options):
+                try:
+                    response = app.make_response(app.view_functions[endpoint](**view_args))
+                except HTTPException as e:
+                    response = app.make_response((jsonify({'error': e.description}), e.code))
+            payload = response.get_json(silent=True)
+            if response.status_code >= 400:
+                message = payload.get('error') if isinstance(payload, dict) else None
+                return batch_error(message or response.status, index, response.status_code)
+            results.append(payload)
+            statuses.append(response.status_code)
+
+        db.session.commit()
+        committed = True
     except Exception as e:
-        print(f"DEBUG: Error in board search: {str(e)}")
+        logger.exception('Error running batch')
         return jsonify({'error': str(e)}), 500
+    finally:
+        deferred = g.pop('batch_after_commit')
+        if not committed:
+            db.session.rollback()
+            # Access read from the rolled back changes must not outlive them
+            invalidate_board_access([current_user.id])
+
+    for function, args in deferred:
+        function(*args)
+    return jsonify({'results': [
+        {'status': status, 'body': payload} for status, payload in zip(statuses, results)
+    ]})
 
 
 # Final app entrypoint (moved to bottom)
@@ -0,0 +1,410 @@
+"""Benchmark the main routes against the configured database.
+
+Requests go through Flask's test client, so they run the real view code,
+queries and serialization without a network in the way. For each endpoint
+the harness reports latency percentiles, throughput and the number of SQL
+statements per request, and can save everything as JSON to compare runs:
+
+    python seed_data.py --preset medium --reset
+    python benchmark.py run --requests 200 --output bench-$(git rev-parse --short HEAD).json
+    python benchmark.py compare bench-abc1234.json bench-def5678.json
+
+``payload`` needs no database: it generates a board payload (5k cards by
+default), then times encoding it with each available JSON encoder and
+compressing it with each response encoding, and reports the sizes.
+
+``update_card`` and ``upload_file`` write to the database (and uploads), so
+point the benchmark at a seeded database you do not mind changing.
+"""
+import argparse
+import gzip
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+import compression
+import json_provider
+import ranking
+from app import app, db
+from models import Board, BoardMember, Card, List, User
+from seed_data import WORDS
+
+ENDPOINTS = ('get_board', 'get_board_window', 'get_card', 'search', 'update_card', 'upload_file', 'dashboard')
+UPLOAD_SIZE = 16 * 1024
+BOARD_CARDS_WINDOW = 50  # As the board page requests
+
+_sql = threading.local()
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    _sql.count = getattr(_sql, 'count', 0) + 1
+
+
+def build_request(endpoint, target, rng, sequence):
+    """``(method, url, options)`` for one request to ``endpoint``"""
+    if endpoint == 'get_board':
+        return 'GET', f"/api/boards/{target['board_id']}", {}
+    if endpoint == 'get_board_window':
+        return 'GET', f"/api/boards/{target['board_id']}?cards_limit={BOARD_CARDS_WINDOW}&fields=summary", {}
+    if endpoint == 'get_card':
+        return 'GET', f"/api/cards/{rng.choice(target['card_ids'])}", {}
+    if endpoint == 'search':
+        return 'GET', f"/api/search?q={rng.choice(WORDS)}", {}
+    if endpoint == 'update_card':
+        return 'PUT', f"/api/cards/{rng.choice(target['card_ids'])}", {
+            'json': {'description': f'Benchmark edit {sequence} {rng.choice(WORDS)}'}
+        }
+    if endpoint == 'upload_file':
+        return 'POST', f"/api/cards/{rng.choice(target['card_ids'])}/attachments", {
+            'data': {'file': (io.BytesIO(rng.randbytes(UPLOAD_SIZE)), 'benchmark.txt', 'text/plain')},
+            'content_type': 'multipart/form-data'
+        }
+    if endpoint == 'dashboard':
+        return 'GET', '/dashboard', {}
+    raise ValueError(f'Unknown endpoint {endpoint!r}')
+
+
+def load_targets(sample_size, rng):
+    """Boards to exercise, each with its owner's username and some of its card ids"""
+    board_ids = [board_id for (board_id,) in db.session.query(Board.id).join(List).join(Card).distinct()]
+    targets = []
+    for board_id in rng.sample(board_ids, min(sample_size, len(board_ids))):
+        username = db.session.query(User.username).join(Board, Board.user_id == User.id).filter(
+            Board.id == board_id
+        ).scalar()
+        card_ids = [card_id for (card_id,) in db.session.query(Card.id).join(List).filter(
+            List.board_id == board_id
+        ).limit(200)]
+        targets.append({'board_id': board_id, 'username': username, 'card_ids': card_ids})
+    return targets
+
+
+def dataset_size():
+    return {
+        'users': db.session.query(db.func.count(User.id)).scalar(),
+        'boards': db.session.query(db.func.count(Board.id)).scalar(),
+        'board_members': db.session.query(db.func.count(BoardMember.id)).scalar(),
+        'cards': db.session.query(db.func.count(Card.id)).scalar(),
+    }
+
+
+class Worker:
+    """One simulated browser: a logged-in test client per user it acts as"""
+
+    def __init__(self, password):
+        self.password = password
+        self.clients = {}
+
+    def client(self, username):
+        if username not in self.clients:
+            client = app.test_client()
+            response = client.post('/login', data={'username': username, 'password': self.password})
+            if response.status_code != 302:
+                raise RuntimeError(f'Could not log in as {username}; was the database seeded with this password?')
+            self.clients[username] = client
+        return self.clients[username]
+
+    def request(self, username, method, url, options):
+        client = self.client(username)
+        _sql.count = 0
+        started = time.perf_counter()
+        response = client.open(url, method=method, **options)
+        body = response.get_data()
+        elapsed = time.perf_counter() - started
+        return elapsed, _sql.count, response.status_code, len(body)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, wall_time):
+    latencies = sorted(elapsed * 1000 for elapsed, _, _, _ in samples)
+    queries = sorted(count for _, count, _, _ in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, status, _ in samples if status >= 400),
+        'throughput_rps': round(len(samples) / wall_time, 1) if wall_time else None,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 2),
+            'p50': round(percentile(latencies, 0.50), 2),
+            'p95': round(percentile(latencies, 0.95), 2),
+            'p99': round(percentile(latencies, 0.99), 2),
+            'max': round(latencies[-1], 2),
+        },
+        'sql_queries': {
+            'mean': round(sum(queries) / len(queries), 1),
+            'p95': percentile(queries, 0.95),
+            'max': queries[-1],
+        },
+        'response_bytes_mean': round(sum(size for _, _, _, size in samples) / len(samples)),
+    }
+
+
+def run_endpoint(endpoint, targets, workers, args, rng):
+    plan = []
+    for sequence in range(args.warmup + args.requests):
+        target = rng.choice(targets)
+        plan.append((target['username'],) + build_request(endpoint, target, rng, sequence))
+
+    for username, method, url, options in plan[:args.warmup]:
+        workers[0].request(username, method, url, options)
+
+    measured = plan[args.warmup:]
+    started = time.perf_counter()
+    if args.concurrency == 1:
+        samples = [workers[0].request(*request) for request in measured]
+    else:
+        def run_share(index):
+            return [workers[index].request(*request) for request in measured[index::args.concurrency]]
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            samples = [sample for share in pool.map(run_share, range(args.concurrency)) for sample in share]
+    return summarize(samples, time.perf_counter() - started)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(f"{'endpoint':<18}{'req':>6}{'err':>5}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'sql/req':>9}")
+    for endpoint, stats in results['endpoints'].items():
+        latency = stats['latency_ms']
+        print(f"{endpoint:<18}{stats['requests']:>6}{stats['errors']:>5}{stats['throughput_rps']:>9}"
+              f"{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}{stats['sql_queries']['mean']:>9}")
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', _count_statement)
+        targets = load_targets(args.boards, rng)
+        if not targets:
+            sys.exit('No boards with cards to benchmark; run seed_data.py first')
+        size = dataset_size()
+        backend = db.engine.dialect.name
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'started_at': datetime.utcnow().isoformat(),
+            'database': backend,
+            'dataset': size,
+            'python': platform.python_version(),
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+        },
+        'endpoints': {}
+    }
+    # Logging in hashes the password; do it for every client before timing anything
+    workers = [Worker(args.password) for _ in range(args.concurrency)]
+    for worker in workers:
+        for username in {target['username'] for target in targets}:
+            worker.client(username)
+
+    for endpoint in args.endpoints:
+        stats = run_endpoint(endpoint, targets, workers, args, rng)
+        results['endpoints'][endpoint] = stats
+        print(f"{endpoint}: p50 {stats['latency_ms']['p50']} ms, {stats['sql_queries']['mean']} queries",
+              file=sys.stderr)
+
+    event.remove(engine, 'before_cursor_execute', _count_statement)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved to {args.output}")
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    print(f"{baseline['meta'].get('commit')} -> {candidate['meta'].get('commit')}")
+    print(f"{'endpoint':<18}{'p50 ms':>18}{'p95 ms':>18}{'sql/req':>16}")
+    for endpoint, stats in candidate['endpoints'].items():
+        before = baseline['endpoints'].get(endpoint)
+        if before is None:
+            continue
+
+        def change(old, new):
+            delta = f"{(new - old) / old * 100:+.0f}%" if old else 'n/a'
+            return f"{old}->{new} {delta}"
+
+        print(f"{endpoint:<18}"
+              f"{change(before['latency_ms']['p50'], stats['latency_ms']['p50']):>18}"
+              f"{change(before['latency_ms']['p95'], stats['latency_ms']['p95']):>18}"
+              f"{change(before['sql_queries']['mean'], stats['sql_queries']['mean']):>16}")
+
+
+def generated_board(card_count, list_count, rng):
+    """A board payload shaped like ``GET /api/boards/<id>`` returns, with made-up content"""
+    now = datetime.utcnow()
+    users = [{'id': i, 'username': f'user{i}'} for i in range(1, 21)]
+    labels = [{'id': i, 'name': rng.choice(WORDS), 'color': f'#{rng.randrange(0x1000000):06x}'} for i in range(1, 9)]
+    lists = [{'id': i, 'title': ' '.join(rng.choices(WORDS, k=2)), 'position': key, 'cards': []}
+             for i, key in enumerate(ranking.evenly_spaced_keys(list_count), start=1)]
+    keys = ranking.evenly_spaced_keys(card_count)
+    attachment_id = 0
+    for card_id in range(1, card_count + 1):
+        attachments = []
+        for _ in range(rng.choice((0, 0, 0, 1, 2))):
+            attachment_id += 1
+            attachments.append({
+                'id': attachment_id,
+                'filename': f'{rng.choice(WORDS)}.png',
+                'file_size': rng.randrange(10000, 5000000),
+                'mime_type': 'image/png',
+                'uploaded_at': now - timedelta(minutes=rng.randrange(100000)),
+                'uploaded_by': rng.choice(users),
+                'icon': '🖼️',
+                'download_url': f'/api/attachments/{attachment_id}/download',
+                'thumbnail_url': f'/api/attachments/{attachment_id}/thumbnail/320'
+            })
+        lists[card_id % list_count]['cards'].append({
+            'id': card_id,
+            'title': ' '.join(rng.choices(WORDS, k=rng.randint(2, 8))).capitalize(),
+            'description': ' '.join(rng.choices(WORDS, k=rng.choice((0, 0, 20, 60, 150)))),
+            'position': keys[card_id - 1],
+            'due_date': now + timedelta(days=rng.randrange(-30, 60)) if rng.random() < 0.3 else None,
+            'created_by': rng.choice(users),
+            'labels': rng.sample(labels, rng.choice((0, 1, 1, 2, 3))),
+            'attachments': attachments
+        })
+    return {
+        'id': 1, 'title': 'Generated board', 'description': '', 'owner': users[0], 'is_owner': True,
+        'version': 1, 'members': [], 'lists': lists
+    }
+
+
+def summary_board(board):
+    """``board`` as the board view loads it, with ``?fields=summary``"""
+    labels = {label['id']: label for card in (card for list_data in board['lists'] for card in list_data['cards'])
+              for label in card['labels']}
+    return {**board, 'labels': sorted(labels.values(), key=lambda label: label['id']), 'lists': [{
+        **list_data,
+        'cards': [{
+            'id': card['id'],
+            'title': card['title'],
+            'position': card['position'],
+            'due_date': card['due_date'],
+            'has_description': bool(card['description']),
+            'label_ids': [label['id'] for label in card['labels']],
+            'attachment_count': len(card['attachments']),
+            'cover_url': next((a['thumbnail_url'] for a in card['attachments'] if a['thumbnail_url']), None),
+            'checklist_progress': None
+        } for card in list_data['cards']]
+    } for list_data in board['lists']]}
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 2)
+
+
+def payload(args):
+    rng = random.Random(args.seed)
+    board = generated_board(args.cards, args.lists, rng)
+    variants = {'full': board, 'summary': summary_board(board)}
+
+    # What Flask's stock provider does, with the datetimes it cannot encode as ISO strings
+    encoders = {'json': lambda obj: json.dumps(
+        obj, default=json_provider.default, sort_keys=True, separators=(',', ':')
+    ).encode()}
+    if json_provider.orjson is not None:
+        encoders['orjson'] = lambda obj: json_provider.dumps_bytes(obj, sort_keys=True)
+    encoded = {}
+
+    results = {'meta': {'commit': git_commit(), 'cards': args.cards, 'lists': args.lists,
+                        'repeat': args.repeat, 'python': platform.python_version()},
+               'encoders': {}, 'compression': {}}
+    print(f"{'payload':<10}{'encoder':<10}{'bytes':>12}{'encode ms':>12}")
+    for variant, obj in variants.items():
+        for name, encoder in encoders.items():
+            body = encoded[variant] = encoder(obj)
+            stats = {'bytes': len(body), 'encode_ms': median_ms(lambda: encoder(obj), args.repeat)}
+            results['encoders'][f'{variant}/{name}'] = stats
+            print(f"{variant:<10}{name:<10}{stats['bytes']:>12}{stats['encode_ms']:>12}")
+
+    codecs = {f'gzip-{level}': lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)
+              for level in (1, 6)}
+    if compression.brotli is not None:
+        codecs[f'br-{compression.DEFAULT_BROTLI_QUALITY}'] = lambda data: compression.brotli.compress(
+            data, quality=compression.DEFAULT_BROTLI_QUALITY)
+    print(f"\n{'payload':<10}{'encoding':<10}{'bytes':>12}{'ratio':>8}{'ms':>10}")
+    for variant, body in encoded.items():
+        for name, codec in codecs.items():
+            stats = {'bytes': len(codec(body)), 'compress_ms': median_ms(lambda: codec(body), args.repeat)}
+            stats['ratio'] = round(len(body) / stats['bytes'], 1)
+            results['compression'][f'{variant}/{name}'] = stats
+            print(f"{variant:<10}{name:<10}{stats['bytes']:>12}{stats['ratio']:>8}{stats['compress_ms']:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved to {args.output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark TaskHive routes.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the benchmark')
+    run_parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+    run_parser.add_argument('--requests', type=int, default=100, help='Measured requests per endpoint')
+    run_parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per endpoint first')
+    run_parser.add_argument('--concurrency', type=int, default=1, help='Clients issuing requests in parallel')
+    run_parser.add_argument('--boards', type=int, default=20, help='Boards sampled as request targets')
+    run_parser.add_argument('--password', default='password', help='Password the users were seeded with')
+    run_parser.add_argument('--seed', type=int, default=1)
+    run_parser.add_argument('--output', help='Write the results to this JSON file')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help='Compare two saved runs')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.set_defaults(handler=compare)
+
+    payload_parser = commands.add_parser('payload', help='Time JSON encoding and compression of a generated board')
+    payload_parser.add_argument('--cards', type=int, default=5000)
+    payload_parser.add_argument('--lists', type=int, default=10)
+    payload_parser.add_argument('--repeat', type=int, default=10, help='Timed runs of each step (the median is shown)')
+    payload_parser.add_argument('--seed', type=int, default=1)
+    payload_parser.add_argument('--output', help='Write the results to this JSON file')
+    payload_parser.set_defaults(handler=payload)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    args.handler(args)
@@ -0,0 +1,141 @@
+"""Content-addressed, reference-counted storage for attachment files.
+
+Each distinct file is stored once, under ``<UPLOAD_FOLDER>/blobs/`` at a
+path derived from its SHA-256, and described by a ``Blob`` row holding the
+number of ``FileAttachment`` rows that point at it.
+
+* New attachments take their reference explicitly, through ``add_file``
+  (content already on disk, moved into the store or dropped if the blob
+  exists) or ``add_stream``. Either way the content itself was received:
+  knowing a hash never grants a reference to a stored file.
+* References are released automatically: any flush that deletes
+  attachments, directly or through a card, list or board cascade,
+  decrements their blobs. A blob whose count reaches zero is removed in
+  the same transaction, with its thumbnails; its file is moved aside at
+  once and unlinked after the commit, or put back if the transaction rolls
+  back.
+
+Taking a reference updates the blob row first, so it waits for (or wins
+against) a concurrent removal of the same blob rather than racing it.
+"""
+import hashlib
+import os
+import uuid
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import thumbnails
+from models import db, Blob, FileAttachment
+
+READ_SIZE = 64 * 1024
+
+
+def blob_root():
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], 'blobs')
+
+
+def blob_path(sha256):
+    return os.path.join(blob_root(), sha256[:2], sha256[2:4], sha256)
+
+
+def _take_reference(sha256):
+    return db.session.execute(
+        db.update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count + 1),
+        execution_options={'synchronize_session': False}
+    ).rowcount == 1
+
+
+def add_file(source_path, sha256, size):
+    """Take a reference on the blob for a file already on disk at ``source_path``.
+
+    The file is moved into the store (a rename, no copy) unless the blob is
+    already there, in which case it is deleted. Returns the blob's path.
+    """
+    path = blob_path(sha256)
+    if not _take_reference(sha256):
+        try:
+            with db.session.begin_nested():
+                db.session.add(Blob(sha256=sha256, size=size, path=path, ref_count=1))
+        except IntegrityError:
+            # Another request stored the same content first
+            _take_reference(sha256)
+
+    if os.path.exists(path):
+        os.remove(source_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+    return path
+
+
+def add_stream(stream):
+    """Hash and store a readable binary stream; returns ``(path, sha256, size)``.
+
+    When the content is already stored nothing is kept on disk: the stream
+    goes to a scratch file inside the store only until its hash is known.
+    """
+    os.makedirs(blob_root(), exist_ok=True)
+    scratch_path = os.path.join(blob_root(), f'.incoming-{uuid.uuid4().hex}')
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with open(scratch_path, 'wb') as f:
+            for block in iter(lambda: stream.read(READ_SIZE), b''):
+                hasher.update(block)
+                f.write(block)
+                size += len(block)
+        sha256 = hasher.hexdigest()
+        return add_file(scratch_path, sha256, size), sha256, size
+    finally:
+        if os.path.exists(scratch_path):
+            os.remove(scratch_path)
+
+
+@event.listens_for(Session, 'after_flush')
+def _release_deleted_attachments(session, flush_context):
+    released = Counter(
+        obj.sha256 for obj in session.deleted
+        if isinstance(obj, FileAttachment) and obj.sha256
+    )
+    if not released:
+        return
+
+    connection = session.connection()
+    for sha256, count in released.items():
+        connection.execute(
+            db.update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count - count)
+        )
+    unreferenced = connection.execute(
+        db.select(Blob.sha256, Blob.path).where(Blob.sha256.in_(list(released)), Blob.ref_count <= 0)
+    ).all()
+    if not unreferenced:
+        return
+
+    collected = [sha256 for sha256, _ in unreferenced]
+    thumbnails.delete_for_blobs(session, collected)
+    connection.execute(db.delete(Blob).where(Blob.sha256.in_(collected)))
+    trash = session.info.setdefault('blob_trash', [])
+    for _, path in unreferenced:
+        if os.path.exists(path):
+            trash_path = f'{path}.deleted-{uuid.uuid4().hex}'
+            os.replace(path, trash_path)
+            trash.append((path, trash_path))
+
+
+@event.listens_for(Session, 'after_commit')
+def _unlink_released_blobs(session):
+    for _, trash_path in session.info.pop('blob_trash', []):
+        if os.path.exists(trash_path):
+            os.remove(trash_path)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _restore_released_blobs(session, previous_transaction):
+    if not previous_transaction.nested:
+        for path, trash_path in session.info.pop('blob_trash', []):
+            if os.path.exists(trash_path) and not os.path.exists(path):
+                os.replace(trash_path, path)
@@ -0,0 +1,305 @@
+"""Board export and import as JSON Lines.
+
+An export is one JSON object per line, each with a ``type``: first the
+``board``, then its ``label``, ``list``, ``card``, ``card_label``,
+``checklist``, ``checklist_item`` and ``attachment`` records, grouped by
+type. Records carry the ids they have on this server so later records can
+refer to earlier ones (a card's ``list_id``, a checklist's ``card_id``).
+Every group is read with ``yield_per``, which uses a server-side cursor
+where the database has one, so an export of any size runs in constant
+memory. Attachments are exported as metadata only.
+
+An import reads the same format line by line and inserts each type in
+executemany batches, mapping the ids in the file to the new rows' ids, all
+in the caller's transaction. Records may refer only to records earlier in
+the file. Everything is created by the importing user; ``position`` may be
+left out to keep the file's order, and attachment records are skipped
+since their files are not part of the export.
+"""
+from datetime import datetime, timezone
+
+import json_provider
+import ranking
+import search_index
+from models import db, Board, Card, Checklist, ChecklistItem, FileAttachment, Label, List, User, card_labels, is_label_color
+
+FORMAT_VERSION = 1
+BATCH_SIZE = 1000
+
+
+class TransferError(ValueError):
+    """A line of an import that cannot be used; ``line`` is its 1-based number"""
+
+    def __init__(self, line, message):
+        super().__init__(f'Line {line}: {message}')
+        self.line = line
+
+
+def _records(statement, record_type):
+    result = db.session.execute(statement.execution_options(yield_per=BATCH_SIZE))
+    for rows in result.mappings().partitions():
+        yield ''.join(json_provider.dumps({'type': record_type, **row}) + '\n' for row in rows)
+
+
+def export_lines(board):
+    """Yield the board's JSON Lines export, a batch of lines at a time"""
+    yield json_provider.dumps({
+        'type': 'board',
+        'format': FORMAT_VERSION,
+        'title': board.title,
+        'description': board.description,
+        'created_at': board.created_at
+    }) + '\n'
+
+    list_ids = db.select(List.id).where(List.board_id == board.id)
+    card_ids = db.select(Card.id).where(Card.list_id.in_(list_ids))
+    checklist_ids = db.select(Checklist.id).where(Checklist.card_id.in_(card_ids))
+
+    yield from _records(db.select(
+        Label.id, Label.name, Label.color, Label.created_at
+    ).where(Label.board_id == board.id).order_by(Label.id), 'label')
+    yield from _records(db.select(
+        List.id, List.title, List.position, List.created_at
+    ).where(List.board_id == board.id).order_by(List.position, List.id), 'list')
+    yield from _records(db.select(
+        Card.id, Card.list_id, Card.title, Card.description, Card.position, Card.due_date,
+        Card.created_at, User.username.label('created_by')
+    ).join(User, User.id == Card.created_by).where(Card.list_id.in_(list_ids)).order_by(
+        Card.list_id, Card.position, Card.id
+    ), 'card')
+    yield from _records(db.select(
+        card_labels.c.card_id, card_labels.c.label_id
+    ).where(card_labels.c.card_id.in_(card_ids)).order_by(card_labels.c.card_id, card_labels.c.label_id), 'card_label')
+    yield from _records(db.select(
+        Checklist.id, Checklist.card_id, Checklist.title, Checklist.position, Checklist.created_at
+    ).where(Checklist.card_id.in_(card_ids)).order_by(Checklist.card_id, Checklist.position, Checklist.id), 'checklist')
+    yield from _records(db.select(
+        ChecklistItem.id, ChecklistItem.checklist_id, ChecklistItem.text, ChecklistItem.is_completed,
+        ChecklistItem.position, ChecklistItem.created_at, ChecklistItem.completed_at
+    ).where(ChecklistItem.checklist_id.in_(checklist_ids)).order_by(
+        ChecklistItem.checklist_id, ChecklistItem.position, ChecklistItem.id
+    ), 'checklist_item')
+    yield from _records(db.select(
+        FileAttachment.id, FileAttachment.card_id, FileAttachment.original_filename.label('filename'),
+        FileAttachment.file_size, FileAttachment.mime_type, FileAttachment.sha256, FileAttachment.uploaded_at,
+        User.username.label('uploaded_by')
+    ).join(User, User.id == FileAttachment.uploaded_by).where(FileAttachment.card_id.in_(card_ids)).order_by(
+        FileAttachment.card_id, FileAttachment.id
+    ), 'attachment')
+
+
+class _Importer:
+    """Turns records into rows and inserts them a batch at a time"""
+
+    # type: (model, whether later records refer to its ids)
+    TABLES = {
+        'label': (Label, True),
+        'list': (List, True),
+        'card': (Card, True),
+        'card_label': (card_labels, False),
+        'checklist': (Checklist, True),
+        'checklist_item': (ChecklistItem, False),
+    }
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.now = datetime.utcnow()
+        self.board_id = None
+        self.ids = {record_type: {} for record_type, (_, keeps_ids) in self.TABLES.items() if keeps_ids}
+        self.last_positions = {}
+        self.counts = {record_type: 0 for record_type in self.TABLES}
+        self.skipped = {'attachment': 0}
+        self.pending_type = None
+        self.pending_rows = []
+        self.pending_ids = []
+
+    # Field helpers
+
+    def required(self, line, record, key):
+        value = record.get(key)
+        if not isinstance(value, str) or not value.strip():
+            raise TransferError(line, f'{key} is required')
+        return value
+
+    def reference(self, line, record, key, record_type):
+        new_id = self.ids[record_type].get(record.get(key))
+        if new_id is None:
+            raise TransferError(line, f'{key} {record.get(key)!r} does not match an earlier {record_type}')
+        return new_id
+
+    def timestamp(self, line, record, key, default=None):
+        value = record.get(key)
+        if value is None:
+            return default
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise TransferError(line, f'{key} is not an ISO 8601 date')
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+    def position(self, line, record, scope):
+        """The record's rank key, or the next one in its scope when it has none"""
+        position = record.get('position')
+        if position is None:
+            position = ranking.key_between(self.last_positions.get(scope), None)
+        else:
+            try:
+                ranking.validate_key(position)
+            except ranking.RankError as e:
+                raise TransferError(line, str(e))
+        if scope not in self.last_positions or position > self.last_positions[scope]:
+            self.last_positions[scope] = position
+        return position
+
+    # Records
+
+    def add_board(self, line, record):
+        if record.get('format', FORMAT_VERSION) != FORMAT_VERSION:
+            raise TransferError(line, f'unsupported format {record.get("format")!r}')
+        self.board_id = db.session.execute(db.insert(Board).returning(Board.id), {
+            'title': self.required(line, record, 'title'),
+            'description': record.get('description'),
+            'created_at': self.now,
+            'user_id': self.user_id,
+            'version': 0
+        }).scalar_one()
+
+    def row(self, line, record_type, record):
+        if record_type == 'label':
+            if not is_label_color(record.get('color')):
+                raise TransferError(line, 'color must be a hex color such as #0079bf')
+            return {
+                'board_id': self.board_id,
+                'name': self.required(line, record, 'name'),
+                'color': record['color'],
+                'created_at': self.timestamp(line, record, 'created_at', self.now)
+            }
+        if record_type == 'list':
+            return {
+                'board_id': self.board_id,
+                'title': self.required(line, record, 'title'),
+                'position': self.position(line, record, ('list',)),
+                'created_at': self.timestamp(line, record, 'created_at', self.now)
+            }
+        if record_type == 'card':
+            list_id = self.reference(line, record, 'list_id', 'list')
+            return {
+                'list_id': list_id,
+                'title': self.required(line, record, 'title'),
+                'description': record.get('description') or '',
+                'position': self.position(line, record, ('card', list_id)),
+                'due_date': self.timestamp(line, record, 'due_date'),
+                'created_at': self.timestamp(line, record, 'created_at', self.now),
+                'created_by': self.user_id
+            }
+        if record_type == 'card_label':
+            return {
+                'card_id': self.reference(line, record, 'card_id', 'card'),
+                'label_id': self.reference(line, record, 'label_id', 'label'),
+                'added_at': self.now
+            }
+        if record_type == 'checklist':
+            card_id = self.reference(line, record, 'card_id', 'card')
+            # Checklist positions are plain integers, in order within a card
+            position = record.get('position')
+            if not isinstance(position, int):
+                position = self.last_positions.get(('checklist', card_id), -1) + 1
+            self.last_positions[('checklist', card_id)] = max(position, self.last_positions.get(('checklist', card_id), -1))
+            return {
+                'card_id': card_id,
+                'title': record.get('title') or 'Checklist',
+                'position': position,
+                'created_at': self.timestamp(line, record, 'created_at', self.now)
+            }
+        checklist_id = self.reference(line, record, 'checklist_id', 'checklist')
+        completed = bool(record.get('is_completed'))
+        return {
+            'checklist_id': checklist_id,
+            'text': self.required(line, record, 'text'),
+            'is_completed': completed,
+            'position': self.position(line, record, ('checklist_item', checklist_id)),
+            'created_at': self.timestamp(line, record, 'created_at', self.now),
+            'completed_at': self.timestamp(line, record, 'completed_at', self.now if completed else None)
+        }
+
+    def add(self, line, record):
+        record_type = record.get('type')
+        if self.board_id is None:
+            if record_type != 'board':
+                raise TransferError(line, 'the first record must be the board')
+            self.add_board(line, record)
+            return
+        if record_type == 'attachment':
+            self.skipped['attachment'] += 1
+            return
+        if record_type not in self.TABLES:
+            raise TransferError(line, f'unknown record type {record_type!r}')
+
+        # Rows are inserted before any record of another type can refer to them
+        if record_type != self.pending_type or len(self.pending_rows) >= BATCH_SIZE:
+            self.flush()
+            self.pending_type = record_type
+        self.pending_rows.append(self.row(line, record_type, record))
+        self.pending_ids.append(record.get('id'))
+
+    def flush(self):
+        if not self.pending_rows:
+            return
+        table, keeps_ids = self.TABLES[self.pending_type]
+        if keeps_ids and db.session.get_bind().dialect.name == 'sqlite':
+            # SQLite cannot order RETURNING rows of a batched insert, so
+            # SQLAlchemy would insert one row at a time. The board insert
+            # already took the database's only write lock, so the ids after
+            # the current maximum are ours to hand out.
+            start = (db.session.execute(db.select(db.func.max(table.id))).scalar() or 0) + 1
+            new_ids = range(start, start + len(self.pending_rows))
+            for row, new_id in zip(self.pending_rows, new_ids):
+                row['id'] = new_id
+            db.session.execute(db.insert(table), self.pending_rows)
+        elif keeps_ids:
+            new_ids = db.session.execute(
+                db.insert(table).returning(table.id, sort_by_parameter_order=True), self.pending_rows
+            ).scalars().all()
+        else:
+            db.session.execute(db.insert(table), self.pending_rows)
+        if keeps_ids:
+            self.ids[self.pending_type].update(
+                (old_id, new_id) for old_id, new_id in zip(self.pending_ids, new_ids) if old_id is not None
+            )
+        self.counts[self.pending_type] += len(self.pending_rows)
+        self.pending_rows = []
+        self.pending_ids = []
+
+
+def import_lines(lines, user_id):
+    """Create a board for ``user_id`` from JSON Lines, without committing.
+
+    ``lines`` may be any iterable of ``bytes`` or ``str`` lines, such as a
+    request stream. Returns ``(board_id, counts, skipped)``; raises
+    ``TransferError`` for the first line that cannot be imported.
+    """
+    importer = _Importer(user_id)
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json_provider.loads(line)
+        except ValueError:
+            raise TransferError(number, 'not valid JSON')
+        if not isinstance(record, dict):
+            raise TransferError(number, 'not a JSON object')
+        importer.add(number, record)
+    importer.flush()
+    if importer.board_id is None:
+        raise TransferError(1, 'the file has no board record')
+
+    # Bulk inserts bypass the ORM flush hook that normally keeps the index current
+    if search_index.is_enabled() and db.session.get_bind().dialect.name == 'sqlite':
+        conn = db.session.connection()
+        card_ids = list(importer.ids['card'].values())
+        search_index.reindex(conn, board_ids=[importer.board_id])
+        for start in range(0, len(card_ids), BATCH_SIZE):
+            search_index.reindex(conn, card_ids=card_ids[start:start + BATCH_SIZE])
+    return importer.board_id, importer.counts, importer.skipped
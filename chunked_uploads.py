@@ -0,0 +1,104 @@
+"""Streaming, resumable attachment uploads.
+
+An upload is started with the file's name and total size, then sent as raw
+chunks (``PUT /api/uploads/<id>?offset=N``) that are written straight into
+the file's final location as they arrive, without spooling. The server
+only ever accepts the chunk that starts at the number of bytes it already
+holds, so a client whose connection dropped asks for that offset and
+carries on from there.
+
+Only one request writes an upload at a time: the route claims the upload
+at its current offset before writing and releases the claim with the new
+offset afterwards. The SHA-256 is computed from the file on disk when the
+upload completes, so it always describes the bytes actually stored,
+whichever workers wrote the chunks.
+
+Deleting an ``UploadSession``, directly or through a card, list or board
+cascade, removes its partial file after the commit.
+"""
+import hashlib
+import os
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.exceptions import ClientDisconnected
+
+from models import UploadSession
+
+READ_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def create_file(file_path):
+    with open(file_path, 'wb'):
+        pass
+
+
+def write_chunk(file_path, offset, stream, limit):
+    """Copy ``stream`` into the file at ``offset``, writing at most ``limit`` bytes.
+
+    Returns ``(bytes_written, disconnected)``. Whatever arrived before a
+    dropped connection is kept so the client can resume after it. Raises
+    ``UploadTooLarge`` (after keeping the bytes that fit) if the stream
+    holds more than ``limit`` bytes.
+    """
+    written = 0
+    disconnected = False
+    too_large = False
+    with open(file_path, 'r+b') as f:
+        f.seek(offset)
+        # Drop anything past offset left by an earlier, interrupted chunk
+        f.truncate()
+        while True:
+            try:
+                block = stream.read(READ_SIZE)
+            except ClientDisconnected:
+                disconnected = True
+                break
+            if not block:
+                break
+            if written + len(block) > limit:
+                block = block[:limit - written]
+                too_large = True
+            f.write(block)
+            written += len(block)
+            if too_large:
+                break
+        f.flush()
+        os.fsync(f.fileno())
+
+    if too_large:
+        raise UploadTooLarge(offset + written)
+    return written, disconnected
+
+
+def checksum(file_path):
+    """Hex SHA-256 of the file as it is on disk"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_SIZE), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_deleted_uploads(session, flush_context):
+    paths = [obj.file_path for obj in session.deleted if isinstance(obj, UploadSession)]
+    if paths:
+        session.info.setdefault('upload_trash', []).extend(paths)
+
+
+@event.listens_for(Session, 'after_commit')
+def _unlink_deleted_uploads(session):
+    for path in session.info.pop('upload_trash', []):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _keep_uploads_after_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('upload_trash', None)
@@ -0,0 +1,89 @@
+"""Response compression negotiated from ``Accept-Encoding``.
+
+JSON, HTML, CSS, JavaScript and other text responses of at least
+``COMPRESS_MIN_SIZE`` bytes (default 1 KB) are compressed with brotli when
+the client accepts it and the ``brotli`` package is installed, otherwise
+with gzip. Smaller bodies go out as they are, since compressing them saves
+less than it costs. Streamed responses (Server-Sent Events) and files sent
+with ``send_file`` (which may be answered with byte ranges) are left alone,
+as is anything a view already encoded.
+
+A compressed response's ``ETag`` becomes weak, as its bytes differ from the
+uncompressed representation; ``If-None-Match`` compares weakly, so
+revalidation with it still answers 304.
+"""
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+# Level 1 compresses a multi-megabyte board about 5x in a third of the time
+# level 6 takes for a further quarter off (python benchmark.py payload)
+DEFAULT_GZIP_LEVEL = 1
+DEFAULT_BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript', 'image/svg+xml',
+    'text/css', 'text/csv', 'text/html', 'text/javascript', 'text/plain', 'text/xml'
+}
+
+
+def available_encodings():
+    """Encodings this server can produce, preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings):
+    """The best encoding the client accepts, or None for identity"""
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY'])
+    # A fixed mtime keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=config['COMPRESS_GZIP_LEVEL'], mtime=0)
+
+
+def init_app(app):
+    app.config.setdefault('COMPRESS_MIN_SIZE', int(os.environ.get('COMPRESS_MIN_SIZE', DEFAULT_MIN_SIZE)))
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', DEFAULT_GZIP_LEVEL)
+    app.config.setdefault('COMPRESS_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY)
+
+    # Registered after the metrics and logging hooks, so it runs before them
+    # and the metrics see the size that goes over the wire
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if (response.content_length or 0) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        compressed = compress(data, encoding, app.config)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
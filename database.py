@@ -0,0 +1,111 @@
+"""Database URL and engine configuration.
+
+The database is chosen with ``DATABASE_URL`` and defaults to the SQLite file
+``instance/taskhive.db``. Anything SQLAlchemy understands works; the
+application is exercised on SQLite and PostgreSQL (install
+``psycopg2-binary``), and ``postgres://`` URLs as handed out by Heroku and
+Render are accepted.
+
+SQLite connections are tuned for several worker processes sharing one file:
+write-ahead logging lets readers carry on while one writer commits,
+``synchronous=NORMAL`` drops the per-commit fsync that WAL makes
+unnecessary, and a busy timeout makes a writer wait for the lock instead
+of failing with "database is locked". PostgreSQL gets a bounded, pre-pinged
+connection pool.
+"""
+import os
+import sqlite3
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine, make_url
+
+from models import db
+
+DEFAULT_DATABASE_URL = 'sqlite:///taskhive.db'
+
+DEFAULT_SQLITE_BUSY_TIMEOUT = 5000  # Milliseconds a writer waits for the lock
+DEFAULT_SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # Bytes of the file read through mmap
+DEFAULT_SQLITE_CACHE_SIZE = -32000  # Negative means KiB: 32MB page cache per connection
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_TIMEOUT = 30  # Seconds to wait for a pooled connection
+DEFAULT_POOL_RECYCLE = 1800  # Seconds before a connection is replaced
+CREATE_TABLES_LOCK_KEY = 7391460021  # Arbitrary PostgreSQL advisory lock id
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return default if value in (None, '') else int(value)
+
+
+def database_url():
+    """The configured database URL, with ``postgres://`` spelled the way SQLAlchemy expects"""
+    url = os.environ.get('DATABASE_URL') or DEFAULT_DATABASE_URL
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` suited to the backend of ``url``"""
+    options = {
+        'pool_size': _env_int('DB_POOL_SIZE', DEFAULT_POOL_SIZE),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT),
+    }
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            # Each connection would be a separate empty database; keep the default pool
+            return {}
+        # sqlite3's own timeout is the busy timeout in seconds; the pragmas below do the rest
+        options['connect_args'] = {'timeout': _env_int('SQLITE_BUSY_TIMEOUT', DEFAULT_SQLITE_BUSY_TIMEOUT) / 1000}
+        return options
+
+    options.update({
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', DEFAULT_POOL_RECYCLE),
+        # Drop connections the server closed (restarts, idle timeouts) instead of failing a request
+        'pool_pre_ping': True,
+    })
+    return options
+
+
+def init_app(app):
+    """Set the database URL and engine options; call before ``db.init_app(app)``"""
+    url = database_url()
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(url)
+    app.config.setdefault('SQLITE_BUSY_TIMEOUT', _env_int('SQLITE_BUSY_TIMEOUT', DEFAULT_SQLITE_BUSY_TIMEOUT))
+    app.config.setdefault('SQLITE_MMAP_SIZE', _env_int('SQLITE_MMAP_SIZE', DEFAULT_SQLITE_MMAP_SIZE))
+    app.config.setdefault('SQLITE_CACHE_SIZE', _env_int('SQLITE_CACHE_SIZE', DEFAULT_SQLITE_CACHE_SIZE))
+
+    @event.listens_for(Engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            # In-memory databases have no WAL; the pragma just reports "memory"
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute(f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT'])}")
+            cursor.execute(f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}")
+            cursor.execute(f"PRAGMA cache_size={int(app.config['SQLITE_CACHE_SIZE'])}")
+            cursor.execute('PRAGMA temp_store=MEMORY')
+        finally:
+            cursor.close()
+
+
+def create_tables():
+    """``db.create_all()``, serialized across processes.
+
+    Every worker runs this as it starts; without a lock, two workers can
+    both see a table missing and the second CREATE TABLE fails.
+    """
+    with db.engine.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+        elif connection.dialect.name == 'postgresql':
+            connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': CREATE_TABLES_LOCK_KEY})
+        db.metadata.create_all(connection)
+        connection.commit()
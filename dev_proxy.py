@@ -0,0 +1,87 @@
+"""Local stand-in for the front proxy's attachment offload.
+
+With ``ATTACHMENT_OFFLOAD`` set, downloads come back from the app without a
+body, carrying an ``X-Accel-Redirect`` or ``X-Sendfile`` header for nginx or
+Apache to act on. This wraps the app the way such a proxy sits in front of
+it: responses carrying one of those headers are replaced with the named file
+(with Range and conditional request support), everything else passes
+through. Run it to try the offload mode end to end without installing a
+proxy:
+
+    python dev_proxy.py            # x-accel-redirect unless ATTACHMENT_OFFLOAD is set
+
+or wrap the app in-process, e.g. for ``app.test_client()``:
+
+    app.wsgi_app = OffloadProxy(app.wsgi_app, prefix, app.config['UPLOAD_FOLDER'])
+"""
+import os
+from urllib.parse import unquote
+
+from werkzeug.datastructures import Headers
+from werkzeug.exceptions import NotFound
+from werkzeug.utils import send_file
+
+# Headers nginx keeps from the app's response when it follows X-Accel-Redirect
+PASSED_HEADERS = ('Content-Type', 'Content-Disposition', 'Cache-Control', 'Expires', 'Set-Cookie')
+
+
+class OffloadProxy:
+    def __init__(self, app, internal_prefix, root):
+        self.app = app
+        self.internal_prefix = internal_prefix.rstrip('/') + '/'
+        self.root = os.path.abspath(root)
+
+    def __call__(self, environ, start_response):
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured['status'] = status
+            captured['headers'] = Headers(headers)
+            return lambda data: None
+
+        body = self.app(environ, capture)
+        headers = captured['headers']
+        path = self._resolve(headers)
+        if path is None:
+            start_response(captured['status'], headers.to_wsgi_list())
+            return body
+        if hasattr(body, 'close'):
+            body.close()
+
+        if not os.path.isfile(path):
+            return NotFound()(environ, start_response)
+        response = send_file(path, environ, conditional=True, use_x_sendfile=False)
+        for name in PASSED_HEADERS:
+            if name in headers:
+                response.headers[name] = headers[name]
+        return response(environ, start_response)
+
+    def _resolve(self, headers):
+        """Filesystem path named by an offload header, or None to pass the response through"""
+        if 'X-Sendfile' in headers:
+            return headers['X-Sendfile']
+        location = headers.get('X-Accel-Redirect')
+        if location is None:
+            return None
+        if not location.startswith(self.internal_prefix):
+            # nginx would look for another location; there is none here
+            return ''
+        relative = unquote(location[len(self.internal_prefix):])
+        path = os.path.normpath(os.path.join(self.root, relative))
+        if not path.startswith(self.root + os.sep):
+            return ''
+        return path
+
+
+if __name__ == '__main__':
+    from werkzeug.serving import run_simple
+
+    os.environ.setdefault('ATTACHMENT_OFFLOAD', 'x-accel-redirect')
+    from app import app
+
+    app.wsgi_app = OffloadProxy(
+        app.wsgi_app, app.config['ATTACHMENT_OFFLOAD_PREFIX'], app.config['UPLOAD_FOLDER']
+    )
+    port = int(os.environ.get('PORT', 5000))
+    print(f"Serving with {app.config['ATTACHMENT_OFFLOAD']} offload on http://127.0.0.1:{port}")
+    run_simple('127.0.0.1', port, app, threaded=True, use_reloader=False)
@@ -0,0 +1,35 @@
+"""Gunicorn settings, picked up automatically by ``gunicorn app:app``.
+
+gthread workers serve each request on an OS thread. The database drivers
+block, and a request waiting on a lock (SQLite's busy timeout, a PostgreSQL
+row lock) then holds only its own thread. Under gevent, a blocked driver
+call would freeze every greenlet in its worker.
+
+Live update streams (``/api/boards/<id>/events``) each hold a thread here.
+For many viewers, run the gevent pool in gunicorn_events.conf.py next to
+this one and route that path to it.
+"""
+import glob
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+timeout = 30
+keepalive = 5
+# Attachment downloads go out through wsgi.file_wrapper, i.e. os.sendfile()
+sendfile = True
+
+# Each worker writes its request metrics here and /metrics sums them all
+# (see metrics.py); set in the master so forked workers inherit it
+if 'METRICS_DIR' not in os.environ:
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='taskhive-metrics-')
+metrics_dir = os.environ['METRICS_DIR']
+
+
+def on_starting(server):
+    """Counters start from zero with the server, even in a METRICS_DIR kept from a previous run"""
+    for path in glob.glob(os.path.join(metrics_dir, '*.json')):
+        os.remove(path)
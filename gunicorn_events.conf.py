@@ -0,0 +1,30 @@
+"""Gunicorn settings for a pool serving only live update streams:
+
+    gunicorn -c gunicorn_events.conf.py app:app
+
+gevent workers hold each open ``/api/boards/<id>/events`` stream on a
+greenlet, so thousands of idle viewers cost a socket each. The front proxy
+sends only that path here and everything else to the gthread pool of
+gunicorn.conf.py. A stream only touches the database for short reads (the
+access check and the change poller), which SQLite in WAL mode never makes
+wait. psycopg2 is made cooperative with psycogreen when that is installed.
+
+Set the same ``METRICS_DIR`` for both pools so /metrics adds them up.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('EVENTS_PORT', '8001')}"
+worker_class = 'gevent'
+workers = int(os.environ.get('EVENTS_CONCURRENCY', '1'))
+# Simultaneous connections per worker, idle event streams included
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', '2000'))
+timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        return
+    patch_psycopg()
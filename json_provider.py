@@ -0,0 +1,84 @@
+"""JSON encoding for responses and event streams.
+
+Payload builders hand over ``datetime`` and ``date`` values as they are and
+they are written as ISO 8601 strings here, in one place. ``orjson`` is
+used when it is installed: it encodes those types natively and is several
+times faster than the standard library on large board payloads, and it
+writes straight to UTF-8 bytes. Without it the standard ``json`` module is
+used with the same output format.
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def default(o):
+    """Encode the types ``json`` cannot (``orjson`` handles dates itself)"""
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+def dumps_bytes(obj, sort_keys=False, indent=False):
+    """``obj`` as UTF-8 encoded JSON, compact unless ``indent``"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj, default=default, sort_keys=sort_keys, ensure_ascii=False,
+        indent=2 if indent else None, separators=None if indent else (',', ':')
+    ).encode()
+
+
+def dumps(obj, sort_keys=False):
+    return dumps_bytes(obj, sort_keys=sort_keys).decode()
+
+
+def loads(s):
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider on top of ``dumps_bytes``; ``jsonify`` goes through it"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {'indent', 'separators'}:
+            # Options only the json module knows about
+            kwargs.setdefault('default', default)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=self.sort_keys, indent=bool(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app):
+    app.json = FastJSONProvider(app)
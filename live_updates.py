@@ -0,0 +1,188 @@
+"""Live board updates over Server-Sent Events.
+
+Every committed change is already in the BoardChange log (see
+``record_changes`` in app.py), so the log doubles as the message bus: each
+worker process runs one background poller that watches the versions of the
+boards with open streams and fans new changes out to them. Commits made by
+this process wake the poller at once; changes committed by other workers
+show up within ``LIVE_UPDATES_POLL_INTERVAL`` seconds.
+
+Streams only wait on in-memory queues and never hold a database connection,
+so in the gevent pool of gunicorn_events.conf.py an idle viewer
+costs one greenlet and one socket.
+"""
+import logging
+import queue
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import json_provider
+from models import db, Board
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_HEARTBEAT_INTERVAL = 15.0
+RETRY_MILLISECONDS = 3000
+QUEUE_SIZE = 100
+
+
+def format_event(event_type, data, event_id=None):
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines.append(f'event: {event_type}')
+    lines.append('data: ' + json_provider.dumps(data))
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """One open stream: the version it has seen and its pending messages"""
+
+    def __init__(self, board_id, user_id, since):
+        self.board_id = board_id
+        self.user_id = user_id
+        self.since = since
+        self.messages = queue.Queue(maxsize=QUEUE_SIZE)
+        self.final_message = None
+
+    def send(self, message, version):
+        try:
+            self.messages.put_nowait(message)
+            self.since = version
+        except queue.Full:
+            # The client stopped reading; make it reload instead of replaying
+            self.close('reset', {'board_id': self.board_id})
+
+    def close(self, event_type, data):
+        if self.final_message is None:
+            self.final_message = format_event(event_type, data)
+        try:
+            self.messages.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class Broker:
+    def __init__(self):
+        self.app = None
+        self.load_changes = None
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._poller = None
+
+    def init_app(self, app, load_changes):
+        """``load_changes(board_id, since, until)`` builds the payload of a ``changes`` event,
+        or returns None when those changes are no longer known"""
+        self.app = app
+        self.load_changes = load_changes
+        app.config.setdefault('LIVE_UPDATES_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)
+        app.config.setdefault('LIVE_UPDATES_HEARTBEAT_INTERVAL', DEFAULT_HEARTBEAT_INTERVAL)
+
+    def subscribe(self, board_id, user_id, since):
+        subscription = Subscription(board_id, user_id, since)
+        with self._lock:
+            self._subscribers.setdefault(board_id, set()).add(subscription)
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name='live-updates', daemon=True)
+                self._poller.start()
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.board_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.board_id]
+
+    def publish(self, board_ids):
+        """Called after a commit that changed ``board_ids``: deliver now rather than at the next poll"""
+        with self._lock:
+            watched = any(board_id in self._subscribers for board_id in board_ids)
+        if watched:
+            self._wake.set()
+
+    def stream(self, subscription):
+        """Yield SSE text for one subscription until it is closed or the client goes away"""
+        heartbeat = self.app.config['LIVE_UPDATES_HEARTBEAT_INTERVAL']
+        try:
+            yield f'retry: {RETRY_MILLISECONDS}\n\n'
+            while True:
+                if subscription.final_message is not None:
+                    yield subscription.final_message
+                    return
+                try:
+                    message = subscription.messages.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                if message is not None:
+                    yield message
+        finally:
+            self.unsubscribe(subscription)
+
+    def _poll(self):
+        while True:
+            self._wake.wait(self.app.config['LIVE_UPDATES_POLL_INTERVAL'])
+            self._wake.clear()
+            with self._lock:
+                boards = {board_id: list(subscribers) for board_id, subscribers in self._subscribers.items()}
+            if not boards:
+                continue
+            try:
+                with self.app.app_context():
+                    self._dispatch(boards)
+            except Exception:
+                logger.exception('Error dispatching live board updates')
+
+    def _dispatch(self, boards):
+        versions = dict(db.session.query(Board.id, Board.version).filter(Board.id.in_(list(boards))).all())
+        for board_id, subscribers in boards.items():
+            version = versions.get(board_id)
+            if version is None:
+                for subscription in subscribers:
+                    subscription.close('deleted', {'board_id': board_id})
+                continue
+
+            # Subscribers at the same version share one payload
+            payloads = {}
+            for subscription in subscribers:
+                since = subscription.since
+                if since == version:
+                    continue
+                if since not in payloads:
+                    changes = self.load_changes(board_id, since, version) if since < version else None
+                    if changes is not None:
+                        changes.update({'board_id': board_id, 'since': since, 'version': version})
+                        payloads[since] = (changes, format_event('changes', changes, version))
+                    else:
+                        payloads[since] = None
+                if payloads[since] is None:
+                    # Ahead of the board (e.g. a reset database) or behind the change log
+                    subscription.close('reset', {'board_id': board_id, 'version': version})
+                    continue
+                changes, message = payloads[since]
+
+                if subscription.user_id in changes['members']['deleted']:
+                    subscription.close('revoked', {'board_id': board_id})
+                else:
+                    subscription.send(message, version)
+
+
+broker = Broker()
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_after_commit(session):
+    board_ids = session.info.pop('changed_boards', None)
+    if board_ids:
+        broker.publish(board_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_after_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('changed_boards', None)
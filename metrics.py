@@ -0,0 +1,290 @@
+"""Per-endpoint request and SQL metrics in Prometheus text format.
+
+For every request this records, labelled by Flask endpoint:
+
+* request count by method and status, and a latency histogram;
+* a response size histogram (streamed responses of unknown length are not sized);
+* 5xx responses and unhandled exceptions;
+* the number of SQL statements and the time spent in them, as totals and as
+  a per-request histogram, so N+1 query patterns stand out.
+
+Statements run outside a request (background threads) count against the
+``background`` endpoint.
+
+Each process keeps its numbers in memory. Under gunicorn every worker would
+only see its own share, so when ``METRICS_DIR`` is set (gunicorn.conf.py
+sets it) each process also writes a snapshot file there every few seconds
+and ``/metrics`` adds up all of them, including files of workers that have
+since exited so that counters never go backwards. Without it, ``/metrics``
+reports the current process only, which is right for a single process.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# name: (type, help, buckets)
+METRICS = {
+    'taskhive_http_requests_total': ('counter', 'HTTP requests by endpoint, method and status', None),
+    'taskhive_http_request_duration_seconds': ('histogram', 'Time spent handling requests', LATENCY_BUCKETS),
+    'taskhive_http_response_size_bytes': ('histogram', 'Size of response bodies', SIZE_BUCKETS),
+    'taskhive_http_request_errors_total': ('counter', 'Requests that ended in a 5xx response or an unhandled exception', None),
+    'taskhive_db_queries_total': ('counter', 'SQL statements executed', None),
+    'taskhive_db_query_duration_seconds_total': ('counter', 'Time spent executing SQL statements', None),
+    'taskhive_db_queries_per_request': ('histogram', 'SQL statements executed per request', QUERY_COUNT_BUCKETS),
+}
+
+
+class Registry:
+    """Counters and histograms of one process, keyed by metric name and label values"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = {}
+        self.dirty = False
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            self._counters[(name, labels)] += amount
+            self.dirty = True
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        with self._lock:
+            state = self._histograms.get((name, labels))
+            if state is None:
+                # One count per bucket (non-cumulative), then sum and count
+                state = self._histograms[(name, labels)] = [0] * len(buckets) + [0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+            self.dirty = True
+
+    def snapshot(self):
+        with self._lock:
+            self.dirty = False
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(labels), list(state)] for (name, labels), state in self._histograms.items()],
+            }
+
+
+def merge(snapshots):
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, state in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            if key in histograms:
+                histograms[key] = [a + b for a, b in zip(histograms[key], state)]
+            else:
+                histograms[key] = list(state)
+    return counters, histograms
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(counters, histograms):
+    lines = []
+    for name, (metric_type, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        if metric_type == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_number(value)}')
+            continue
+        for (metric, labels), state in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, state):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", _format_number(bound))])} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {state[-1]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(state[-2])}')
+            lines.append(f'{name}_count{_format_labels(labels)} {state[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+class Metrics:
+    def __init__(self):
+        self.app = None
+        self.registry = Registry()
+        self._flusher_pid = None
+        self._file_path = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('METRICS_DIR', os.environ.get('METRICS_DIR'))
+        app.config.setdefault('METRICS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        # Optional bearer token required to read /metrics
+        app.config.setdefault('METRICS_TOKEN', os.environ.get('METRICS_TOKEN'))
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    # Request hooks
+
+    def _start_request(self):
+        self._ensure_flusher()
+        g._metrics = {
+            'started': time.perf_counter(), 'queries': 0, 'query_time': 0.0, 'recorded': False,
+            'environ': request.environ
+        }
+
+    def _request_state(self):
+        """This request's metrics; None inside a request context nested in it (/api/batch
+        operations), whose SQL counts towards the enclosing request"""
+        state = g.get('_metrics')
+        return state if state is not None and state['environ'] is request.environ else None
+
+    def _finish_request(self, response):
+        state = self._request_state()
+        if state is None:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method
+        self.registry.inc('taskhive_http_requests_total',
+                          (('endpoint', endpoint), ('method', method), ('status', str(response.status_code))))
+        self.registry.observe('taskhive_http_request_duration_seconds',
+                              (('endpoint', endpoint), ('method', method)), time.perf_counter() - state['started'])
+        if response.content_length is not None:
+            self.registry.observe('taskhive_http_response_size_bytes', (('endpoint', endpoint),), response.content_length)
+        if response.status_code >= 500:
+            self.registry.inc('taskhive_http_request_errors_total', (('endpoint', endpoint), ('method', method)))
+        self.registry.observe('taskhive_db_queries_per_request', (('endpoint', endpoint),), state['queries'])
+        state['recorded'] = True
+        return response
+
+    def _teardown_request(self, error):
+        state = self._request_state()
+        if state is None:
+            return
+        endpoint = request.endpoint or 'unmatched'
+        if state['queries']:
+            self.registry.inc('taskhive_db_queries_total', (('endpoint', endpoint),), state['queries'])
+            self.registry.inc('taskhive_db_query_duration_seconds_total', (('endpoint', endpoint),), state['query_time'])
+        if error is not None and not state['recorded']:
+            self.registry.inc('taskhive_http_request_errors_total', (('endpoint', endpoint), ('method', request.method)))
+        g._metrics = None
+
+    # SQL hooks
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['_metrics_started'].pop()
+        elapsed = time.perf_counter() - started
+        state = g.get('_metrics') if has_request_context() else None
+        if state is not None:
+            state['queries'] += 1
+            state['query_time'] += elapsed
+        else:
+            self.registry.inc('taskhive_db_queries_total', (('endpoint', 'background'),))
+            self.registry.inc('taskhive_db_query_duration_seconds_total', (('endpoint', 'background'),), elapsed)
+
+    # Sharing between worker processes
+
+    def _ensure_flusher(self):
+        """Start this process's snapshot writer; after a fork the child needs its own"""
+        if not self.app.config['METRICS_DIR'] or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            if self._flusher_pid is not None:
+                # Forked from a process that already counted requests; start from zero
+                self.registry = Registry()
+            self._flusher_pid = os.getpid()
+            os.makedirs(self.app.config['METRICS_DIR'], exist_ok=True)
+            # A fresh name per process, so a reused pid never overwrites a dead worker's totals
+            self._file_path = os.path.join(self.app.config['METRICS_DIR'], f'{os.getpid()}-{uuid.uuid4().hex[:8]}.json')
+            threading.Thread(target=self._flush_periodically, name='metrics-flush', daemon=True).start()
+            atexit.register(self.flush)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.app.config['METRICS_FLUSH_INTERVAL'])
+            if self.registry.dirty:
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception('Error writing metrics snapshot')
+
+    def flush(self):
+        if self._file_path is None or self._flusher_pid != os.getpid():
+            return
+        scratch_path = f'{self._file_path}.tmp'
+        with open(scratch_path, 'w') as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(scratch_path, self._file_path)
+
+    def collect(self):
+        """Merged counters and histograms of every process sharing METRICS_DIR"""
+        metrics_dir = self.app.config['METRICS_DIR']
+        snapshots = [self.registry.snapshot()]
+        if metrics_dir and os.path.isdir(metrics_dir):
+            for name in os.listdir(metrics_dir):
+                path = os.path.join(metrics_dir, name)
+                if not name.endswith('.json') or path == self._file_path:
+                    continue
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    # Vanished or being replaced; its numbers show up next scrape
+                    continue
+            self.registry.dirty = True
+        return merge(snapshots)
+
+    def metrics_view(self):
+        token = self.app.config['METRICS_TOKEN']
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(render(*self.collect()), content_type=CONTENT_TYPE)
+
+
+metrics = Metrics()
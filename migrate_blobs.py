@@ -0,0 +1,41 @@
+"""Move attachment files stored before the blob store into it.
+
+Each old ``uploads/<uuid>_<name>`` file is hashed and handed to the blob
+store, so identical files collapse into one blob and the attachment rows
+are pointed at it, their thumbnails moving to the blob. Attachments whose
+file is missing are reported and left alone. Already converted attachments are skipped, so the script can be run
+any number of times.
+"""
+import hashlib
+import os
+
+from app import app, db
+from models import FileAttachment
+import blob_store
+import thumbnails
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(blob_store.READ_SIZE), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+with app.app_context():
+    converted = missing = 0
+    for attachment in FileAttachment.query.filter(FileAttachment.sha256.is_(None)).all():
+        if not os.path.exists(attachment.file_path):
+            print(f"Attachment {attachment.id}: file {attachment.file_path} is missing")
+            missing += 1
+            continue
+        sha256 = file_sha256(attachment.file_path)
+        attachment.file_path = blob_store.add_file(attachment.file_path, sha256, os.path.getsize(attachment.file_path))
+        attachment.filename = sha256
+        attachment.sha256 = sha256
+        thumbnails.move_to_blob(attachment)
+        # Commit as we go: each file has already been moved into the store
+        db.session.commit()
+        converted += 1
+    print(f"Converted {converted} attachments, {missing} missing files")
@@ -0,0 +1,76 @@
+"""Convert integer list, card and checklist item positions to rank keys.
+
+Databases created before positions became rank keys (see ranking.py) hold
+integers. This keeps each scope's existing order (position, then id) and
+gives it evenly spaced keys. Scopes whose keys are already valid and
+distinct are left alone, so the script can be run any number of times.
+migrations.py runs the same conversion as part of an upgrade.
+"""
+from collections import defaultdict
+
+from app import app, db, RANKED_SCOPES
+from models import List, Card, ChecklistItem
+import ranking
+
+
+def widen_position_columns():
+    """On PostgreSQL, turn the integer position columns into rank key columns"""
+    if db.engine.dialect.name != 'postgresql':
+        # SQLite stores text in the old INTEGER columns as is; keys never look numeric
+        return
+    inspector = db.inspect(db.engine)
+    for model in RANKED_SCOPES:
+        table = model.__tablename__
+        column = next(c for c in inspector.get_columns(table) if c['name'] == 'position')
+        if isinstance(column['type'], db.Integer):
+            db.session.execute(db.text(
+                f'ALTER TABLE "{table}" ALTER COLUMN position '
+                f'TYPE VARCHAR({ranking.KEY_COLUMN_LENGTH}) COLLATE "C" USING position::text'
+            ))
+
+
+def legacy_order(position):
+    try:
+        return (0, int(position), '')
+    except (TypeError, ValueError):
+        return (1, 0, str(position))
+
+
+def convert_positions(model):
+    scope = RANKED_SCOPES[model]
+    rows = defaultdict(list)
+    for item_id, scope_id, position in db.session.query(model.id, scope, model.position):
+        rows[scope_id].append((legacy_order(position), item_id, position))
+
+    updates = []
+    for items in rows.values():
+        keys = [position for _, _, position in items]
+        try:
+            for key in keys:
+                ranking.validate_key(key)
+            if len(set(keys)) == len(keys):
+                continue
+        except ranking.RankError:
+            pass
+        items.sort()
+        updates.extend(
+            {'id': item_id, 'position': key}
+            for (_, item_id, _), key in zip(items, ranking.evenly_spaced_keys(len(items)))
+        )
+
+    if updates:
+        db.session.execute(db.update(model), updates)
+    return len(updates)
+
+
+def convert_all():
+    """Widen the columns and convert every ranked table; returns ``{model name: rows converted}``"""
+    widen_position_columns()
+    return {model.__name__: convert_positions(model) for model in (List, Card, ChecklistItem)}
+
+
+if __name__ == '__main__':
+    with app.app_context():
+        for name, converted in convert_all().items():
+            print(f"{name}: converted {converted} positions")
+        db.session.commit()
@@ -0,0 +1,257 @@
+"""Versioned schema migrations for existing databases.
+
+``db.create_all()`` (run when app.py is imported) creates missing tables
+but never changes one that already exists, so a database created by an
+older release lacks newer columns and indexes. This upgrades it in place:
+
+    python migrations.py            # apply pending migrations (same as "upgrade")
+    python migrations.py status     # list migrations and whether they are applied
+    python migrations.py check-plans  # verify the hot queries use their indexes (SQLite)
+
+Applied versions are recorded in a ``schema_version`` table. Every
+migration checks the live schema before changing it, so it is safe on a
+database that already has some or all of its changes (for instance one just
+created by ``create_all``). Each one commits together with its version row.
+"""
+import sys
+from datetime import datetime
+
+from app import app, db
+from models import (
+    AttachmentThumbnail,
+    Blob,
+    Board,
+    BoardChange,
+    BoardMember,
+    Card,
+    Checklist,
+    ChecklistItem,
+    FileAttachment,
+    Label,
+    List,
+    UploadSession,
+    card_labels,
+)
+import migrate_ranks
+import thumbnails
+
+schema_version = db.Table(
+    'schema_version', db.MetaData(),
+    db.Column('version', db.Integer, primary_key=True),
+    db.Column('description', db.String(200), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False)
+)
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        return func
+    return register
+
+
+def has_column(table, column):
+    return column in {c['name'] for c in db.inspect(db.session.connection()).get_columns(table)}
+
+
+def add_column(table, column):
+    """Add a model column to an existing table unless it is already there"""
+    if has_column(table.name, column.name):
+        return
+    connection = db.session.connection()
+    column_type = column.type.compile(dialect=connection.dialect)
+    ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+    if column.default is not None and column.default.is_scalar:
+        ddl += f' NOT NULL DEFAULT {column.default.arg!r}' if not column.nullable else f' DEFAULT {column.default.arg!r}'
+    for foreign_key in column.foreign_keys:
+        ddl += f' REFERENCES "{foreign_key.column.table.name}" ("{foreign_key.column.name}")'
+    connection.execute(db.text(ddl))
+
+
+def create_tables(*tables):
+    for table in tables:
+        table.create(db.session.connection(), checkfirst=True)
+
+
+def create_indexes(*tables):
+    connection = db.session.connection()
+    for table in tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+@migration(1, 'Board version counter and change log')
+def board_versions():
+    add_column(Board.__table__, Board.__table__.c.version)
+    create_tables(BoardChange.__table__)
+
+
+@migration(2, 'Rank key positions for lists, cards and checklist items')
+def rank_keys():
+    migrate_ranks.convert_all()
+
+
+@migration(3, 'Content-addressed attachment blobs and chunked upload sessions')
+def blob_store_tables():
+    create_tables(Blob.__table__, UploadSession.__table__)
+    add_column(FileAttachment.__table__, FileAttachment.__table__.c.sha256)
+
+
+@migration(4, 'Attachment thumbnails')
+def thumbnail_table():
+    create_tables(AttachmentThumbnail.__table__)
+
+
+@migration(5, 'Foreign key and ordering indexes')
+def foreign_key_indexes():
+    create_indexes(
+        Board.__table__, BoardMember.__table__, List.__table__, Card.__table__, card_labels,
+        FileAttachment.__table__, UploadSession.__table__, Checklist.__table__,
+        ChecklistItem.__table__, Label.__table__, BoardChange.__table__
+    )
+
+
+@migration(6, 'Chunk write claims for upload sessions')
+def upload_claims():
+    add_column(UploadSession.__table__, UploadSession.__table__.c.writing_since)
+
+
+@migration(7, 'Thumbnails shared by every attachment of a blob')
+def blob_thumbnails():
+    if has_column(AttachmentThumbnail.__tablename__, 'sha256'):
+        return
+    # attachment_id loses NOT NULL, which SQLite cannot alter: rebuild the table
+    connection = db.session.connection()
+    rows = connection.execute(db.text(
+        'SELECT t.attachment_id, t.size, t.width, t.height, t.file_path, t.mime_type, t.created_at, a.sha256 '
+        'FROM attachment_thumbnail t JOIN file_attachment a ON a.id = t.attachment_id ORDER BY t.id'
+    )).all()
+    AttachmentThumbnail.__table__.drop(connection)
+    create_tables(AttachmentThumbnail.__table__)
+    kept = set()
+    duplicates = []
+    for row in rows:
+        key = (row.sha256 or row.attachment_id, row.size)
+        if key in kept:
+            # The same content was rendered for several attachments
+            duplicates.append(row.file_path)
+            continue
+        kept.add(key)
+        connection.execute(AttachmentThumbnail.__table__.insert().values(
+            sha256=row.sha256, attachment_id=None if row.sha256 else row.attachment_id, size=row.size,
+            width=row.width, height=row.height, file_path=row.file_path,
+            mime_type=row.mime_type, created_at=row.created_at
+        ))
+    thumbnails.remove_after_commit(db.session, duplicates)
+
+
+def applied_versions():
+    schema_version.create(db.session.connection(), checkfirst=True)
+    return set(db.session.execute(db.select(schema_version.c.version)).scalars())
+
+
+def upgrade():
+    applied = applied_versions()
+    db.session.commit()
+    for version, description, func in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        try:
+            func()
+            db.session.execute(schema_version.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            print(f"Migration {version} ({description}) failed")
+            raise
+        print(f"Applied migration {version}: {description}")
+
+
+def status():
+    applied = applied_versions()
+    db.session.commit()
+    for version, description, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+        print(f"{version:>4}  {'applied' if version in applied else 'pending':<8} {description}")
+
+
+# Queries on the board load, access check and sync paths, each with the
+# clauses it must not need a sort for
+def hot_queries():
+    ids = [1, 2, 3]
+    return [
+        ('boards owned by a user', db.select(Board.id).where(Board.user_id == 1), ()),
+        ('board memberships of a user', db.select(BoardMember.board_id).where(BoardMember.user_id == 1), ()),
+        ('lists of a board in order',
+         db.select(List).where(List.board_id == 1).order_by(List.position, List.id), ('ORDER BY',)),
+        ('cards of a list in order',
+         db.select(Card).where(Card.list_id == 1).order_by(Card.position, Card.id), ('ORDER BY',)),
+        ('cards of a board',
+         db.select(Card).join(List, List.id == Card.list_id).where(List.board_id == 1), ()),
+        ('cards created by a user', db.select(Card.id).where(Card.created_by == 1), ()),
+        ('labels of cards',
+         db.select(card_labels.c.card_id, Label).join(Label, Label.id == card_labels.c.label_id)
+         .where(card_labels.c.card_id.in_(ids)), ()),
+        ('cards with a label', db.select(card_labels.c.card_id).where(card_labels.c.label_id == 1), ()),
+        ('attachments of cards', db.select(FileAttachment).where(FileAttachment.card_id.in_(ids)), ()),
+        ('thumbnails of blobs',
+         db.select(AttachmentThumbnail.sha256).where(AttachmentThumbnail.sha256.in_(['a' * 64, 'b' * 64])), ()),
+        ('thumbnails of attachments from before the blob store',
+         db.select(AttachmentThumbnail.attachment_id).where(AttachmentThumbnail.attachment_id.in_(ids)), ()),
+        ('checklists of a card in order',
+         db.select(Checklist).where(Checklist.card_id == 1).order_by(Checklist.position, Checklist.id), ('ORDER BY',)),
+        ('items of a checklist in order',
+         db.select(ChecklistItem).where(ChecklistItem.checklist_id == 1)
+         .order_by(ChecklistItem.position, ChecklistItem.id), ('ORDER BY',)),
+        ('labels of a board', db.select(Label).where(Label.board_id == 1), ()),
+        ('latest change of a board',
+         db.select(BoardChange.created_at).where(BoardChange.board_id == 1)
+         .order_by(BoardChange.version.desc()).limit(1), ('ORDER BY',)),
+        ('board changes since a version',
+         db.select(BoardChange).where(BoardChange.board_id == 1, BoardChange.version > 5), ()),
+        ('expired upload sessions', db.select(UploadSession.id).where(UploadSession.updated_at < datetime.utcnow()), ()),
+    ]
+
+
+def check_plans():
+    """Print the plan of each hot query; returns the names of those that scan a table or sort"""
+    connection = db.session.connection()
+    if connection.dialect.name != 'sqlite':
+        print("Plan checks are only implemented for SQLite")
+        return []
+
+    failures = []
+    for name, statement, forbidden in hot_queries():
+        sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+        try:
+            details = [row[-1] for row in connection.execute(db.text(f'EXPLAIN QUERY PLAN {sql}'))]
+        except db.exc.OperationalError as e:
+            # Typically a column added by a migration that has not run yet
+            print(f"FAIL {name}: {e.orig}")
+            failures.append(name)
+            continue
+        # Any SCAN walks a whole table or index; a forbidden TEMP B-TREE sorts every row
+        problems = [
+            detail for detail in details
+            if detail.startswith('SCAN ') or any(f'TEMP B-TREE FOR {clause}' in detail for clause in forbidden)
+        ]
+        print(f"{'FAIL' if problems else 'ok':<5}{name}: {'; '.join(details)}")
+        if problems:
+            failures.append(name)
+    return failures
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'upgrade'
+    with app.app_context():
+        if command == 'upgrade':
+            upgrade()
+        elif command == 'status':
+            status()
+        elif command == 'check-plans':
+            sys.exit(1 if check_plans() else 0)
+        else:
+            sys.exit(f"Unknown command {command!r}; use upgrade, status or check-plans")
@@ -3,9 +3,17 @@ from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import os
+import re
+
+from ranking import FIRST_KEY, KEY_COLUMN_LENGTH
 
 db = SQLAlchemy()
 
+# Fractional rank keys (see ranking.py) must compare byte-wise on every backend
+RankKey = db.String(KEY_COLUMN_LENGTH).with_variant(
+    db.String(KEY_COLUMN_LENGTH, collation='C'), 'postgresql'
+)
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -28,11 +36,15 @@ class Board(db.Model):
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Incremented on every change to the board's contents (see bump_board_version)
+    version = db.Column(db.Integer, nullable=False, default=0)
     
     lists = db.relationship('List', backref='board', lazy=True, cascade='all, delete-orphan')
     members = db.relationship('BoardMember', backref='board', lazy=True, cascade='all, delete-orphan')
     labels = db.relationship('Label', backref='board', lazy=True, cascade='all, delete-orphan')
 
+    __table_args__ = (db.Index('ix_board_user_id', 'user_id'),)
+
 class BoardMember(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     board_id = db.Column(db.Integer, db.ForeignKey('board.id'), nullable=False)
@@ -40,39 +52,60 @@ class BoardMember(db.Model):
     role = db.Column(db.String(20), default='member')  # 'owner', 'admin', 'member'
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    __table_args__ = (db.UniqueConstraint('board_id', 'user_id', name='unique_board_member'),)
+    # The unique constraint also indexes lookups by board; this one serves lookups by user
+    __table_args__ = (
+        db.UniqueConstraint('board_id', 'user_id', name='unique_board_member'),
+        db.Index('ix_board_member_user_id', 'user_id'),
+    )
 
 class List(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
-    position = db.Column(db.Integer, default=0)
+    position = db.Column(RankKey, nullable=False, default=FIRST_KEY)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     board_id = db.Column(db.Integer, db.ForeignKey('board.id'), nullable=False)
     
     cards = db.relationship('Card', backref='list', lazy=True, cascade='all, delete-orphan')
 
+    __table_args__ = (db.Index('ix_list_board_position', 'board_id', 'position'),)
+
 # Association table for many-to-many relationship between cards and labels
 # Must be defined before Card class since Card references it
 card_labels = db.Table('card_labels',
     db.Column('card_id', db.Integer, db.ForeignKey('card.id'), primary_key=True),
     db.Column('label_id', db.Integer, db.ForeignKey('label.id'), primary_key=True),
-    db.Column('added_at', db.DateTime, default=datetime.utcnow)
+    db.Column('added_at', db.DateTime, default=datetime.utcnow),
+    db.Index('ix_card_labels_label_id', 'label_id')
 )
 
 class Card(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    position = db.Column(db.Integer, default=0)
+    position = db.Column(RankKey, nullable=False, default=FIRST_KEY)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     due_date = db.Column(db.DateTime)
     list_id = db.Column(db.Integer, db.ForeignKey('list.id'), nullable=False)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
     attachments = db.relationship('FileAttachment', backref='card', lazy=True, cascade='all, delete-orphan')
+    upload_sessions = db.relationship('UploadSession', backref='card', lazy=True, cascade='all, delete-orphan')
     checklists = db.relationship('Checklist', backref='card', lazy=True, cascade='all, delete-orphan')
     labels = db.relationship('Label', secondary=card_labels, backref='cards', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_card_list_position', 'list_id', 'position'),
+        db.Index('ix_card_created_by', 'created_by'),
+    )
+
+class Blob(db.Model):
+    """One stored file, shared by every attachment with the same content (see blob_store.py)"""
+    sha256 = db.Column(db.String(64), primary_key=True)  # Hex digest of the content
+    size = db.Column(db.Integer, nullable=False)  # Size in bytes
+    path = db.Column(db.String(500), nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # FileAttachment rows using it
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class FileAttachment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
@@ -80,12 +113,55 @@ class FileAttachment(db.Model):
     file_path = db.Column(db.String(500), nullable=False)
     file_size = db.Column(db.Integer, nullable=False)  # Size in bytes
     mime_type = db.Column(db.String(100), nullable=False)
+    # Content hash of the shared Blob; unset for files stored before the blob store
+    sha256 = db.Column(db.String(64), db.ForeignKey('blob.sha256'))
     card_id = db.Column(db.Integer, db.ForeignKey('card.id'), nullable=False)
     uploaded_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # User who uploaded the file
     uploader = db.relationship('User', backref='uploads')
+    thumbnails = db.relationship('AttachmentThumbnail', backref='attachment', lazy=True, cascade='all, delete-orphan')
+
+    __table_args__ = (db.Index('ix_file_attachment_card_id', 'card_id'),)
+
+class AttachmentThumbnail(db.Model):
+    """A downscaled rendering of an image attachment (see thumbnails.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    # Shared by every attachment of the blob; attachment_id only for files from before the blob store
+    sha256 = db.Column(db.String(64), db.ForeignKey('blob.sha256'))
+    attachment_id = db.Column(db.Integer, db.ForeignKey('file_attachment.id'))
+    size = db.Column(db.Integer, nullable=False)  # Bounding box edge it was rendered for
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    mime_type = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('sha256', 'size', name='unique_blob_thumbnail'),
+        db.UniqueConstraint('attachment_id', 'size', name='unique_attachment_thumbnail'),
+    )
+
+class UploadSession(db.Model):
+    """A chunked upload in progress; becomes a FileAttachment once complete"""
+    id = db.Column(db.String(32), primary_key=True)  # Random hex token, used in upload URLs
+    original_filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)  # Final location, written in place
+    mime_type = db.Column(db.String(100), nullable=False)
+    total_size = db.Column(db.Integer, nullable=False)  # Declared size in bytes
+    received = db.Column(db.Integer, nullable=False, default=0)  # Bytes written so far
+    expected_sha256 = db.Column(db.String(64))  # Optional digest the client wants verified
+    writing_since = db.Column(db.DateTime)  # Set while a request holds the claim to write a chunk
+    card_id = db.Column(db.Integer, db.ForeignKey('card.id'), nullable=False)
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_upload_session_card_id', 'card_id'),
+        db.Index('ix_upload_session_updated_at', 'updated_at'),
+    )
 
 class Checklist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -96,18 +172,44 @@ class Checklist(db.Model):
     
     items = db.relationship('ChecklistItem', backref='checklist', lazy=True, cascade='all, delete-orphan')
 
+    __table_args__ = (db.Index('ix_checklist_card_position', 'card_id', 'position'),)
+
 class ChecklistItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     text = db.Column(db.String(500), nullable=False)
     is_completed = db.Column(db.Boolean, default=False)
     checklist_id = db.Column(db.Integer, db.ForeignKey('checklist.id'), nullable=False)
-    position = db.Column(db.Integer, default=0)
+    position = db.Column(RankKey, nullable=False, default=FIRST_KEY)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
 
+    __table_args__ = (db.Index('ix_checklist_item_checklist_position', 'checklist_id', 'position'),)
+
+# "#rgb" or "#rrggbb"; label colors are written into style attributes as they are
+LABEL_COLOR = re.compile(r'#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})')
+
+
+def is_label_color(value):
+    return isinstance(value, str) and LABEL_COLOR.fullmatch(value) is not None
+
+
 class Label(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     color = db.Column(db.String(7), nullable=False)  # Hex color code
     board_id = db.Column(db.Integer, db.ForeignKey('board.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_label_board_id', 'board_id'),)
+
+class BoardChange(db.Model):
+    """Per-board change log, written in the same transaction as each change"""
+    id = db.Column(db.Integer, primary_key=True)
+    board_id = db.Column(db.Integer, db.ForeignKey('board.id'), nullable=False)
+    version = db.Column(db.Integer, nullable=False)  # Board version after the change
+    entity_type = db.Column(db.String(20), nullable=False)  # 'list', 'card', 'label', 'checklist', 'member'
+    entity_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(10), nullable=False)  # 'created', 'updated', 'deleted'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_board_change_board_version', 'board_id', 'version'),)
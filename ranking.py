@@ -0,0 +1,252 @@
+"""Fractional ordering keys for lists, cards and checklist items.
+
+Positions are short strings that sort in the desired order under plain
+byte-wise comparison. A key can always be generated strictly between any
+two existing keys, so inserting or moving an item only ever rewrites that
+one item's row.
+
+Keys follow the "fractional indexing" layout: a head letter that encodes the
+length of an integer part (``a``-``z`` for increasing lengths, ``A``-``Z``
+for the negative range used when prepending), the base-62 integer digits,
+and an optional base-62 fraction that never ends in ``0``. Appending bumps
+the integer part, so append-only lists grow keys logarithmically; repeated
+inserts at the same spot grow the fraction by about one character per six
+inserts, and ``needs_rebalance`` tells callers when to spread a scope's keys
+out again.
+
+Every key starts with a letter, so SQLite never coerces one to a number and
+byte order is the collation on both SQLite and (with ``COLLATE "C"``)
+PostgreSQL.
+"""
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+ZERO = DIGITS[0]
+SMALLEST_INTEGER = 'A' + ZERO * 26
+FIRST_KEY = 'a' + ZERO
+
+KEY_COLUMN_LENGTH = 64
+REBALANCE_LENGTH = 32
+
+
+class RankError(ValueError):
+    pass
+
+
+def _midpoint(lower, upper):
+    """Fraction strictly between ``lower`` and ``upper`` (``None`` = 1)"""
+    if upper is not None:
+        n = 0
+        while (lower[n] if n < len(lower) else ZERO) == upper[n]:
+            n += 1
+        if n > 0:
+            return upper[:n] + _midpoint(lower[n:], upper[n:])
+
+    digit_lower = DIGITS.index(lower[0]) if lower else 0
+    digit_upper = DIGITS.index(upper[0]) if upper is not None else len(DIGITS)
+    if digit_upper - digit_lower > 1:
+        return DIGITS[(digit_lower + digit_upper + 1) // 2]
+    if upper is not None and len(upper) > 1:
+        return upper[:1]
+    return DIGITS[digit_lower] + _midpoint(lower[1:], None)
+
+
+def _integer_length(head):
+    if 'a' <= head <= 'z':
+        return ord(head) - ord('a') + 2
+    if 'A' <= head <= 'Z':
+        return ord('Z') - ord(head) + 2
+    raise RankError(f'Invalid rank key head: {head!r}')
+
+
+def _split(key):
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise RankError(f'Invalid rank key: {key!r}')
+    return key[:length], key[length:]
+
+
+def validate_key(key):
+    """Raise ``RankError`` unless ``key`` is a well-formed rank key"""
+    if not isinstance(key, str) or not key or len(key) > KEY_COLUMN_LENGTH:
+        raise RankError(f'Invalid rank key: {key!r}')
+    if key == SMALLEST_INTEGER:
+        raise RankError(f'Invalid rank key: {key!r}')
+    integer, fraction = _split(key)
+    if any(char not in DIGITS for char in key[1:]) or fraction.endswith(ZERO):
+        raise RankError(f'Invalid rank key: {key!r}')
+
+
+def _increment_integer(integer):
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) + 1
+        if value < len(DIGITS):
+            digits[i] = DIGITS[value]
+            return head + ''.join(digits)
+        digits[i] = ZERO
+
+    if head == 'Z':
+        return 'a' + ZERO
+    if head == 'z':
+        return None
+    head = chr(ord(head) + 1)
+    if head > 'a':
+        digits.append(ZERO)
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+
+def _decrement_integer(integer):
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) - 1
+        if value >= 0:
+            digits[i] = DIGITS[value]
+            return head + ''.join(digits)
+        digits[i] = DIGITS[-1]
+
+    if head == 'a':
+        return 'Z' + DIGITS[-1]
+    if head == 'A':
+        return None
+    head = chr(ord(head) - 1)
+    if head < 'Z':
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+
+def key_between(before, after):
+    """Return a key that sorts strictly between ``before`` and ``after``.
+
+    Either bound may be ``None`` for "start" / "end" of the sequence.
+    """
+    if before is not None:
+        validate_key(before)
+    if after is not None:
+        validate_key(after)
+    if before is not None and after is not None and before >= after:
+        raise RankError(f'{before!r} does not sort before {after!r}')
+
+    if before is None:
+        if after is None:
+            return FIRST_KEY
+        integer, fraction = _split(after)
+        if integer == SMALLEST_INTEGER:
+            return integer + _midpoint('', fraction)
+        if integer < after:
+            return integer
+        key = _decrement_integer(integer)
+        if key is None:
+            raise RankError('Cannot generate a key before the smallest key')
+        return key
+
+    integer, fraction = _split(before)
+    if after is None:
+        key = _increment_integer(integer)
+        return integer + _midpoint(fraction, None) if key is None else key
+
+    after_integer, after_fraction = _split(after)
+    if integer == after_integer:
+        return integer + _midpoint(fraction, after_fraction)
+    key = _increment_integer(integer)
+    if key is None:
+        raise RankError('Cannot generate a key after the largest key')
+    return key if key < after else integer + _midpoint(fraction, None)
+
+
+def keys_between(before, after, count):
+    """Return ``count`` ascending keys strictly between ``before`` and ``after``"""
+    if count <= 0:
+        return []
+    if count == 1:
+        return [key_between(before, after)]
+    if after is None:
+        keys = []
+        key = before
+        for _ in range(count):
+            key = key_between(key, None)
+            keys.append(key)
+        return keys
+    if before is None:
+        keys = []
+        key = after
+        for _ in range(count):
+            key = key_between(None, key)
+            keys.append(key)
+        return keys[::-1]
+
+    middle = count // 2
+    key = key_between(before, after)
+    return keys_between(before, key, middle) + [key] + keys_between(key, after, count - middle - 1)
+
+
+def evenly_spaced_keys(count):
+    """Fresh, short keys for ``count`` items, used by migrations and rebalancing"""
+    return keys_between(None, None, count)
+
+
+def needs_rebalance(key):
+    return key is not None and len(key) > REBALANCE_LENGTH
+
+
+def _increasing_subsequence(keys):
+    """Indices of a longest strictly increasing run of ``keys`` (``None`` never qualifies)"""
+    tails = []  # tails[k] = index of the smallest tail of an increasing run of length k + 1
+    previous = [None] * len(keys)
+    for index, key in enumerate(keys):
+        if key is None:
+            continue
+        low, high = 0, len(tails)
+        while low < high:
+            mid = (low + high) // 2
+            if keys[tails[mid]] < key:
+                low = mid + 1
+            else:
+                high = mid
+        previous[index] = tails[low - 1] if low else None
+        if low == len(tails):
+            tails.append(index)
+        else:
+            tails[low] = index
+
+    result = []
+    index = tails[-1] if tails else None
+    while index is not None:
+        result.append(index)
+        index = previous[index]
+    return set(result)
+
+
+def rekey(keys):
+    """Plan the fewest key changes that make ``keys`` ascending in list order.
+
+    ``keys`` holds the current key of each item in its new order (``None`` or
+    malformed for items without a usable key). The longest increasing run of
+    valid keys is kept; every other item gets a new key between its kept
+    neighbours. Returns ``{index: new_key}`` for the items that must change.
+    """
+    usable = []
+    for key in keys:
+        try:
+            validate_key(key)
+            usable.append(key)
+        except RankError:
+            usable.append(None)
+
+    kept = _increasing_subsequence(usable)
+    changes = {}
+    run = []
+    lower = None
+    for index, key in enumerate(usable + [None]):
+        if index < len(usable) and index not in kept:
+            run.append(index)
+            continue
+        upper = key if index < len(usable) else None
+        if run:
+            for run_index, new_key in zip(run, keys_between(lower, upper, len(run))):
+                changes[run_index] = new_key
+            run = []
+        lower = upper
+    return changes
@@ -1,4 +1,5 @@
 from app import app, db
+import search_index
 from models import User, Board, List, Card, BoardMember
 
 with app.app_context():
@@ -7,5 +8,8 @@ with app.app_context():
     
     # Create all tables
     db.create_all()
+
+    # Empty the full-text index to match the fresh tables
+    search_index.rebuild()
     
     print("Database reset successfully!")
\ No newline at end of file
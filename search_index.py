@@ -0,0 +1,321 @@
+"""Full-text search over cards and boards.
+
+On SQLite builds with FTS5 the searchable text lives in a ``search_index``
+virtual table ranked by BM25. One row is kept per card (title, description,
+checklist item texts and label names) and one per board (title, description);
+the rowid encodes both the document type and its id so rows can be replaced
+without a scan. The index is updated from a session ``after_flush`` hook, so
+every ORM write keeps it in sync inside the same transaction.
+
+Other backends (or SQLite without FTS5) fall back to ``ILIKE`` scans that
+return the same hit structure, so callers never need to know which is active.
+"""
+import logging
+import re
+
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from models import db, Board, Card, Checklist, ChecklistItem, Label, List, card_labels
+
+logger = logging.getLogger(__name__)
+
+CARD = 0
+BOARD = 1
+
+COLUMNS = ('title', 'description', 'checklist', 'labels')
+# BM25 weights in column order; board_id is unindexed and only used for filtering
+BM25_WEIGHTS = '0.0, 10.0, 4.0, 2.0, 3.0'
+
+SNIPPET_CONTEXT = 40
+
+_fts_enabled = False
+
+# Checklist item texts and label names are stored one per line so a hit can
+# be traced back to the item or label that matched.
+_CARD_DOCUMENTS = """
+    SELECT card.id * 2 AS rowid, list.board_id AS board_id, card.title AS title,
+           coalesce(card.description, '') AS description,
+           coalesce((SELECT {join_lines}
+                     FROM checklist_item JOIN checklist ON checklist.id = checklist_item.checklist_id
+                     WHERE checklist.card_id = card.id), '') AS checklist,
+           coalesce((SELECT {join_labels}
+                     FROM card_labels JOIN label ON label.id = card_labels.label_id
+                     WHERE card_labels.card_id = card.id), '') AS labels
+    FROM card JOIN list ON list.id = card.list_id
+"""
+
+_BOARD_DOCUMENTS = """
+    SELECT board.id * 2 + 1 AS rowid, board.id AS board_id, board.title AS title,
+           coalesce(board.description, '') AS description, '' AS checklist, '' AS labels
+    FROM board
+"""
+
+
+def is_enabled():
+    return _fts_enabled
+
+
+def _documents_sql(doc_type, dialect_name):
+    if doc_type == BOARD:
+        return _BOARD_DOCUMENTS
+    if dialect_name == 'sqlite':
+        join = "group_concat({}, char(10))"
+    else:
+        join = "string_agg({}, chr(10))"
+    return _CARD_DOCUMENTS.format(join_lines=join.format('checklist_item.text'),
+                                  join_labels=join.format('label.name'))
+
+
+def init_app(app):
+    """Create the FTS5 table if the backend supports it and hook index maintenance"""
+    global _fts_enabled
+
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(text(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+                        "board_id UNINDEXED, title, description, checklist, labels, "
+                        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                    ))
+                _fts_enabled = True
+            except OperationalError as e:
+                logger.warning('FTS5 unavailable, falling back to ILIKE search: %s', e)
+                _fts_enabled = False
+
+        if _fts_enabled:
+            indexed = db.session.execute(text("SELECT count(*) FROM search_index")).scalar()
+            if not indexed and (db.session.query(Card.id).first() or db.session.query(Board.id).first()):
+                rebuild()
+
+    if _fts_enabled and not event.contains(Session, 'after_flush', _sync_after_flush):
+        event.listen(Session, 'after_flush', _sync_after_flush)
+
+
+def rebuild():
+    """Drop and regenerate every document from the source tables"""
+    if not _fts_enabled:
+        return
+    conn = db.session.connection()
+    conn.execute(text("DELETE FROM search_index"))
+    for doc_type in (CARD, BOARD):
+        conn.execute(text(f"INSERT INTO search_index(rowid, board_id, {', '.join(COLUMNS)}) "
+                          f"{_documents_sql(doc_type, 'sqlite')}"))
+    db.session.commit()
+
+
+def reindex(conn, card_ids=(), board_ids=()):
+    """Replace the documents of the given cards and boards.
+
+    Ids that no longer exist simply end up without a document.
+    """
+    rowids = [card_id * 2 for card_id in card_ids] + [board_id * 2 + 1 for board_id in board_ids]
+    if not rowids:
+        return
+    conn.execute(
+        text("DELETE FROM search_index WHERE rowid IN :rowids").bindparams(bindparam('rowids', expanding=True)),
+        {'rowids': rowids}
+    )
+    for doc_type, id_column, ids in ((CARD, 'card.id', card_ids), (BOARD, 'board.id', board_ids)):
+        if ids:
+            conn.execute(
+                text(f"INSERT INTO search_index(rowid, board_id, {', '.join(COLUMNS)}) "
+                     f"{_documents_sql(doc_type, 'sqlite')} WHERE {id_column} IN :ids"
+                     ).bindparams(bindparam('ids', expanding=True)),
+                {'ids': list(ids)}
+            )
+
+
+def _changed(obj, *attrs):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _sync_after_flush(session, flush_context):
+    """Re-index cards and boards whose searchable text was touched by this flush"""
+    if not _fts_enabled or session.get_bind().dialect.name != 'sqlite':
+        return
+
+    card_ids, board_ids, checklist_ids, label_ids = set(), set(), set(), set()
+
+    for obj in session.new:
+        if isinstance(obj, Card):
+            card_ids.add(obj.id)
+        elif isinstance(obj, Board):
+            board_ids.add(obj.id)
+        elif isinstance(obj, ChecklistItem):
+            checklist_ids.add(obj.checklist_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Card) and _changed(obj, 'title', 'description', 'list_id', 'labels'):
+            card_ids.add(obj.id)
+        elif isinstance(obj, Board) and _changed(obj, 'title', 'description'):
+            board_ids.add(obj.id)
+        elif isinstance(obj, ChecklistItem) and _changed(obj, 'text', 'checklist_id'):
+            checklist_ids.add(obj.checklist_id)
+            checklist_ids.update(inspect(obj).attrs.checklist_id.history.deleted)
+        elif isinstance(obj, Label) and _changed(obj, 'name'):
+            label_ids.add(obj.id)
+
+    for obj in session.deleted:
+        if isinstance(obj, Card):
+            card_ids.add(obj.id)
+        elif isinstance(obj, Board):
+            board_ids.add(obj.id)
+        elif isinstance(obj, ChecklistItem):
+            checklist_ids.add(obj.checklist_id)
+        elif isinstance(obj, Checklist):
+            card_ids.add(obj.card_id)
+        elif isinstance(obj, Label):
+            # The association rows are already gone; the flush loaded the collection
+            card_ids.update(card.id for card in (inspect(obj).attrs.cards.loaded_value or ())
+                            if isinstance(card, Card))
+
+    conn = session.connection()
+    if checklist_ids:
+        card_ids.update(conn.execute(
+            text("SELECT card_id FROM checklist WHERE id IN :ids").bindparams(bindparam('ids', expanding=True)),
+            {'ids': list(checklist_ids)}
+        ).scalars())
+    if label_ids:
+        card_ids.update(conn.execute(
+            text("SELECT card_id FROM card_labels WHERE label_id IN :ids").bindparams(bindparam('ids', expanding=True)),
+            {'ids': list(label_ids)}
+        ).scalars())
+
+    card_ids.discard(None)
+    board_ids.discard(None)
+    reindex(conn, card_ids, board_ids)
+
+
+def query_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def _match_expression(terms):
+    # Every term must match, each as a prefix; quoting neutralises FTS5 syntax
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search(query, board_ids, doc_type, limit, after=None):
+    """Return up to ``limit`` ranked hits for ``query`` among documents of the given boards.
+
+    Each hit is a dict with the document ``id``, its ``board_id`` and the
+    BM25 ``score`` (lower is better; 0 for the fallback), best match first.
+    ``after`` is the ``(score, id)`` of the last hit of the previous page.
+    Returns ``(hits, has_more)``.
+    """
+    terms = query_terms(query)
+    if not terms or not board_ids:
+        return [], False
+    if _fts_enabled:
+        hits = _search_fts(terms, board_ids, doc_type, limit + 1, after)
+    else:
+        hits = _search_like(query, board_ids, doc_type, limit + 1, after)
+    return hits[:limit], len(hits) > limit
+
+
+def _search_fts(terms, board_ids, doc_type, limit, after):
+    params = {'match': _match_expression(terms), 'doc_type': doc_type,
+              'board_ids': list(board_ids), 'limit': limit}
+    keyset = ''
+    if after:
+        keyset = 'WHERE score > :after_score OR (score = :after_score AND rowid > :after_rowid)'
+        params.update(after_score=after[0], after_rowid=after[1] * 2 + doc_type)
+    rows = db.session.execute(
+        text(f"SELECT rowid, board_id, score FROM ("
+             f"SELECT rowid, board_id, bm25(search_index, {BM25_WEIGHTS}) AS score "
+             "FROM search_index WHERE search_index MATCH :match "
+             "AND rowid % 2 = :doc_type AND board_id IN :board_ids"
+             f") {keyset} ORDER BY score, rowid LIMIT :limit").bindparams(bindparam('board_ids', expanding=True)),
+        params
+    ).all()
+    return [{'id': rowid // 2, 'board_id': board_id, 'score': score} for rowid, board_id, score in rows]
+
+
+def _search_like(query, board_ids, doc_type, limit, after):
+    pattern = f'%{query}%'
+    after_id = after[1] if after else 0
+    if doc_type == BOARD:
+        rows = db.session.query(Board.id, Board.id).filter(
+            Board.id.in_(board_ids),
+            Board.id > after_id,
+            db.or_(Board.title.ilike(pattern), Board.description.ilike(pattern))
+        ).order_by(Board.id).limit(limit).all()
+    else:
+        checklist_match = db.session.query(ChecklistItem.id).join(Checklist).filter(
+            Checklist.card_id == Card.id, ChecklistItem.text.ilike(pattern)
+        ).exists()
+        label_match = db.session.query(Label.id).join(card_labels).filter(
+            card_labels.c.card_id == Card.id, Label.name.ilike(pattern)
+        ).exists()
+        rows = db.session.query(Card.id, List.board_id).join(List).filter(
+            List.board_id.in_(board_ids),
+            Card.id > after_id,
+            db.or_(Card.title.ilike(pattern), Card.description.ilike(pattern), checklist_match, label_match)
+        ).order_by(Card.id).limit(limit).all()
+    return [{'id': doc_id, 'board_id': board_id, 'score': 0.0} for doc_id, board_id in rows]
+
+
+def load_documents(doc_type, doc_ids):
+    """Return ``{id: {column: text}}`` for the given documents"""
+    if not doc_ids:
+        return {}
+    source = _documents_sql(doc_type, db.engine.dialect.name)
+    id_column = 'board.id' if doc_type == BOARD else 'card.id'
+    rows = db.session.execute(
+        text(f"{source} WHERE {id_column} IN :ids").bindparams(bindparam('ids', expanding=True)),
+        {'ids': list(doc_ids)}
+    ).mappings().all()
+    return {row['rowid'] // 2: {column: row[column] for column in COLUMNS} for row in rows}
+
+
+def highlight_offsets(value, terms):
+    """Return ``[start, end]`` character ranges of words in ``value`` starting with any term"""
+    if not value or not terms:
+        return []
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\w*', re.IGNORECASE)
+    return [[match.start(), match.end()] for match in pattern.finditer(value)]
+
+
+def matched_lines(value, terms):
+    """Return the lines of a newline-joined column that contain a highlighted word"""
+    return [line for line in (value or '').split('\n') if highlight_offsets(line, terms)]
+
+
+def build_snippet(value, offsets):
+    """Cut a short excerpt around the first highlight, with offsets relative to it"""
+    if not offsets:
+        return None
+    start = max(0, offsets[0][0] - SNIPPET_CONTEXT)
+    end = min(len(value), offsets[0][1] + SNIPPET_CONTEXT)
+    return {
+        'text': ('…' if start > 0 else '') + value[start:end] + ('…' if end < len(value) else ''),
+        'highlights': [[s - start + (1 if start > 0 else 0), e - start + (1 if start > 0 else 0)]
+                       for s, e in offsets if s >= start and e <= end]
+    }
+
+
+def describe_match(document, terms):
+    """Summarise where ``terms`` matched a document.
+
+    Returns ``highlights`` (offsets per column), ``snippet`` (from the
+    description, else the title), ``labels`` and ``checklist_items`` (the
+    label names and checklist item texts that matched).
+    """
+    highlights = {}
+    for column in ('title', 'description'):
+        offsets = highlight_offsets(document[column], terms)
+        if offsets:
+            highlights[column] = offsets
+
+    snippet_column = 'description' if 'description' in highlights else 'title'
+    return {
+        'highlights': highlights,
+        'snippet': build_snippet(document[snippet_column], highlights.get(snippet_column)),
+        'labels': matched_lines(document['labels'], terms),
+        'checklist_items': matched_lines(document['checklist'], terms)
+    }
@@ -0,0 +1,283 @@
+"""Generate a synthetic dataset for development and benchmarking.
+
+    python seed_data.py                      # the "small" preset
+    python seed_data.py --preset large       # 1k users, 500 boards, 200k cards
+    python seed_data.py --users 50 --boards 20 --cards 5000 --seed 7 --reset
+
+Every generated user has the password ``password`` (``--password`` changes
+it). Board sizes are skewed the way real ones are: a few large boards hold
+most of the cards. Rows are written with bulk INSERTs in chunks and explicit
+ids, so even the large preset takes under a minute, and the full-text index
+is rebuilt once at the end. Attachments share a small pool of stored files,
+as duplicates do in the blob store.
+"""
+import argparse
+import io
+import random
+import time
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from app import app, db
+from models import (
+    Blob,
+    Board,
+    BoardMember,
+    Card,
+    Checklist,
+    ChecklistItem,
+    FileAttachment,
+    Label,
+    List,
+    User,
+    card_labels,
+)
+import blob_store
+import database
+import ranking
+import search_index
+
+PRESETS = {
+    'small': {'users': 100, 'boards': 50, 'cards': 10000},
+    'medium': {'users': 300, 'boards': 150, 'cards': 50000},
+    'large': {'users': 1000, 'boards': 500, 'cards': 200000},
+}
+CHUNK_SIZE = 5000
+
+WORDS = (
+    'api auth backend billing bug cache checkout client config dashboard database deploy design docs '
+    'email export feature frontend import invoice login metrics migration mobile notification onboarding '
+    'payment performance pipeline release report review search security settings signup staging '
+    'support sync test upload user webhook'
+).split()
+VERBS = 'add fix update remove refactor investigate document review migrate optimize'.split()
+LIST_TITLES = ['Backlog', 'To Do', 'In Progress', 'Review', 'Blocked', 'Done', 'Icebox', 'Ideas']
+LABELS = [
+    ('bug', '#e74c3c'), ('feature', '#3498db'), ('urgent', '#e67e22'), ('design', '#9b59b6'),
+    ('backend', '#2ecc71'), ('frontend', '#1abc9c'), ('chore', '#95a5a6'), ('research', '#f1c40f'),
+]
+ATTACHMENT_TYPES = [
+    ('notes.txt', 'text/plain'), ('spec.pdf', 'application/pdf'), ('export.zip', 'application/zip'),
+    ('budget.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate a synthetic TaskHive dataset.')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small')
+    parser.add_argument('--users', type=int, help='Number of users')
+    parser.add_argument('--boards', type=int, help='Number of boards')
+    parser.add_argument('--cards', type=int, help='Total number of cards')
+    parser.add_argument('--lists-per-board', type=int, default=5)
+    parser.add_argument('--members-per-board', type=int, default=4, help='Members besides the owner')
+    parser.add_argument('--labels-per-board', type=int, default=6)
+    parser.add_argument('--checklist-ratio', type=float, default=0.2, help='Share of cards with a checklist')
+    parser.add_argument('--attachment-ratio', type=float, default=0.1, help='Share of cards with attachments')
+    parser.add_argument('--distinct-files', type=int, default=50, help='Distinct attachment contents')
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed, for repeatable datasets')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    args = parser.parse_args()
+    for key, value in PRESETS[args.preset].items():
+        if getattr(args, key) is None:
+            setattr(args, key, value)
+    return args
+
+
+def next_id(model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+
+def insert(table, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(db.insert(table), rows[start:start + CHUNK_SIZE])
+
+
+def sync_sequences(*models):
+    """Explicit ids leave PostgreSQL's sequences behind; move them past the new rows"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM \"{table}\"))"
+        ))
+
+
+def sentence(rng, words=6):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def split_skewed(rng, total, parts):
+    """Split ``total`` into ``parts`` counts with a long tail, as real board sizes are"""
+    weights = [rng.paretovariate(1.2) for _ in range(parts)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for i in rng.sample(range(parts), total - sum(counts)):
+        counts[i] += 1
+    return counts
+
+
+def seed(args):
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    counts = {}
+
+    # Users share one password hash; hashing each would dominate the run
+    password_hash = generate_password_hash(args.password)
+    user_start = next_id(User)
+    user_ids = list(range(user_start, user_start + args.users))
+    insert(User, [{
+        'id': user_id,
+        'username': f'user{user_id:05d}',
+        'email': f'user{user_id:05d}@example.com',
+        'password_hash': password_hash,
+        'created_at': now - timedelta(days=rng.randint(0, 720))
+    } for user_id in user_ids])
+    counts['users'] = len(user_ids)
+
+    board_start = next_id(Board)
+    board_ids = list(range(board_start, board_start + args.boards))
+    owners = {board_id: rng.choice(user_ids) for board_id in board_ids}
+    insert(Board, [{
+        'id': board_id,
+        'title': f'{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} board',
+        'description': sentence(rng, 10),
+        'user_id': owners[board_id],
+        'version': 0,
+        'created_at': now - timedelta(days=rng.randint(0, 365))
+    } for board_id in board_ids])
+    counts['boards'] = len(board_ids)
+
+    members = []
+    for board_id in board_ids:
+        others = [user_id for user_id in rng.sample(user_ids, min(len(user_ids), args.members_per_board + 1))
+                  if user_id != owners[board_id]][:args.members_per_board]
+        members.extend({'board_id': board_id, 'user_id': user_id, 'role': 'member', 'joined_at': now}
+                       for user_id in others)
+    insert(BoardMember, members)
+    counts['board_members'] = len(members)
+
+    label_id = next_id(Label)
+    labels_by_board = {}
+    label_rows = []
+    for board_id in board_ids:
+        labels_by_board[board_id] = []
+        for name, color in rng.sample(LABELS, min(len(LABELS), args.labels_per_board)):
+            label_rows.append({'id': label_id, 'name': name, 'color': color, 'board_id': board_id, 'created_at': now})
+            labels_by_board[board_id].append(label_id)
+            label_id += 1
+    insert(Label, label_rows)
+    counts['labels'] = len(label_rows)
+
+    list_id = next_id(List)
+    list_rows = []
+    lists_by_board = {}
+    list_keys = ranking.evenly_spaced_keys(args.lists_per_board)
+    for board_id in board_ids:
+        lists_by_board[board_id] = []
+        for position, title in zip(list_keys, (LIST_TITLES * args.lists_per_board)[:args.lists_per_board]):
+            list_rows.append({'id': list_id, 'title': title, 'position': position, 'board_id': board_id, 'created_at': now})
+            lists_by_board[board_id].append(list_id)
+            list_id += 1
+    insert(List, list_rows)
+    counts['lists'] = len(list_rows)
+
+    card_id = next_id(Card)
+    card_rows = []
+    card_label_rows = []
+    card_boards = []
+    for board_id, board_cards in zip(board_ids, split_skewed(rng, args.cards, len(board_ids))):
+        board_users = [owners[board_id]] + [m['user_id'] for m in members if m['board_id'] == board_id]
+        per_list = split_skewed(rng, board_cards, len(lists_by_board[board_id]))
+        for card_list_id, list_cards in zip(lists_by_board[board_id], per_list):
+            for position in ranking.evenly_spaced_keys(list_cards):
+                card_rows.append({
+                    'id': card_id,
+                    'title': f'{rng.choice(VERBS).capitalize()} {rng.choice(WORDS)} {rng.choice(WORDS)}',
+                    'description': sentence(rng, rng.randint(8, 40)) if rng.random() < 0.5 else None,
+                    'position': position,
+                    'list_id': card_list_id,
+                    'created_by': rng.choice(board_users),
+                    'created_at': now - timedelta(days=rng.randint(0, 365)),
+                    'due_date': now + timedelta(days=rng.randint(-30, 90)) if rng.random() < 0.3 else None
+                })
+                for label in rng.sample(labels_by_board[board_id], min(rng.randint(0, 3), len(labels_by_board[board_id]))):
+                    card_label_rows.append({'card_id': card_id, 'label_id': label, 'added_at': now})
+                card_boards.append((card_id, board_users))
+                card_id += 1
+    insert(Card, card_rows)
+    insert(card_labels, card_label_rows)
+    counts['cards'] = len(card_rows)
+    counts['card_labels'] = len(card_label_rows)
+
+    checklist_id = next_id(Checklist)
+    item_id = next_id(ChecklistItem)
+    checklist_rows = []
+    item_rows = []
+    for card in card_rows:
+        if rng.random() >= args.checklist_ratio:
+            continue
+        checklist_rows.append({'id': checklist_id, 'title': 'Checklist', 'card_id': card['id'], 'position': 0, 'created_at': now})
+        for position in ranking.evenly_spaced_keys(rng.randint(2, 8)):
+            completed = rng.random() < 0.4
+            item_rows.append({
+                'id': item_id, 'text': sentence(rng, 4), 'is_completed': completed,
+                'checklist_id': checklist_id, 'position': position, 'created_at': now,
+                'completed_at': now if completed else None
+            })
+            item_id += 1
+        checklist_id += 1
+    insert(Checklist, checklist_rows)
+    insert(ChecklistItem, item_rows)
+    counts['checklists'] = len(checklist_rows)
+    counts['checklist_items'] = len(item_rows)
+
+    # Attachments draw from a pool of contents, the way duplicates share a blob
+    picks = []
+    for card_id, board_users in card_boards:
+        if rng.random() < args.attachment_ratio:
+            for _ in range(rng.randint(1, 2)):
+                picks.append((card_id, rng.choice(board_users), rng.randrange(args.distinct_files)))
+    pool = [(rng.choice(ATTACHMENT_TYPES), rng.randint(1024, 64 * 1024)) for _ in range(args.distinct_files)]
+    files = {}
+    for index in sorted({index for _, _, index in picks}):
+        (filename, mime_type), size = pool[index]
+        path, sha256, size = blob_store.add_stream(io.BytesIO(rng.randbytes(size)))
+        files[index] = (filename, mime_type, path, sha256, size)
+    attachment_rows = []
+    references = {}
+    for card_id, uploaded_by, index in picks:
+        filename, mime_type, path, sha256, size = files[index]
+        attachment_rows.append({
+            'filename': sha256, 'original_filename': filename, 'file_path': path, 'file_size': size,
+            'mime_type': mime_type, 'sha256': sha256, 'card_id': card_id,
+            'uploaded_by': uploaded_by, 'uploaded_at': now
+        })
+        references[sha256] = references.get(sha256, 0) + 1
+    insert(FileAttachment, attachment_rows)
+    # add_stream took one reference per file; the attachment rows are the real ones
+    for sha256, count in references.items():
+        db.session.execute(db.update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count + count - 1))
+    counts['attachments'] = len(attachment_rows)
+
+    sync_sequences(User, Board, BoardMember, Label, List, Card, Checklist, ChecklistItem, FileAttachment)
+    db.session.commit()
+    search_index.rebuild()
+    return counts
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+            database.create_tables()
+            search_index.rebuild()
+        started = time.perf_counter()
+        counts = seed(args)
+        for name, count in counts.items():
+            print(f"{name}: {count}")
+        print(f"Seeded in {time.perf_counter() - started:.1f}s; every user's password is {args.password!r}")
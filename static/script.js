@@ -40,8 +40,25 @@ function initializeBoardEvents() {
         });
     }
     
+    bindBoardCardButtons(document);
+    
+    // Sorting reloads the first page in the new order
+    const boardSort = document.getElementById('board-sort');
+    if (boardSort) {
+        boardSort.addEventListener('change', function() {
+            window.location.href = `/dashboard?sort=${encodeURIComponent(this.value)}`;
+        });
+    }
+    
+    const loadMoreButton = document.getElementById('load-more-boards');
+    if (loadMoreButton) {
+        loadMoreButton.addEventListener('click', loadMoreBoards);
+    }
+}
+
+function bindBoardCardButtons(root) {
     // Open Board Buttons
-    document.querySelectorAll('.btn-open-board').forEach(button => {
+    root.querySelectorAll('.btn-open-board').forEach(button => {
         button.addEventListener('click', function() {
             const boardId = this.getAttribute('data-board-id');
             console.log('Open board button clicked for board:', boardId);
@@ -50,7 +67,7 @@ function initializeBoardEvents() {
     });
     
     // Delete Board Buttons
-    document.querySelectorAll('.btn-delete-board').forEach(button => {
+    root.querySelectorAll('.btn-delete-board').forEach(button => {
         button.addEventListener('click', function() {
             const boardId = this.getAttribute('data-board-id');
             console.log('Delete board button clicked for board:', boardId);
@@ -115,7 +132,7 @@ function openBoard(boardId) {
     
     boardModal.style.display = 'block';
     
-    fetch(`/api/boards/${boardId}`)
+    fetch(`/api/boards/${boardId}?cards_limit=${BOARD_CARDS_WINDOW}&fields=summary`)
         .then(response => {
             console.log('Board API response status:', response.status);
             if (!response.ok) {
@@ -128,6 +145,8 @@ function openBoard(boardId) {
             console.log('Board data received:', board);
             boardContent.innerHTML = renderBoardView(board);
             initializeDragAndDrop();
+            observeMoreCards();
+            subscribeToBoardEvents(board.id, board.version);
         })
         .catch(error => {
             console.error('Error loading board:', error);
@@ -141,6 +160,255 @@ function openBoard(boardId) {
         });
 }
 
+// Live updates: the server pushes each committed change to the open board
+let boardEvents = null;
+
+function subscribeToBoardEvents(boardId, version) {
+    unsubscribeFromBoardEvents();
+    if (!window.EventSource) {
+        return;
+    }
+
+    boardEvents = new EventSource(`/api/boards/${boardId}/events?since=${version}`);
+    boardEvents.addEventListener('changes', event => {
+        applyBoardChanges(JSON.parse(event.data));
+    });
+    boardEvents.addEventListener('reset', () => {
+        unsubscribeFromBoardEvents();
+        openBoard(boardId);
+    });
+    boardEvents.addEventListener('deleted', () => {
+        unsubscribeFromBoardEvents();
+        closeBoardModal();
+        alert('This board has been deleted.');
+        location.reload();
+    });
+    boardEvents.addEventListener('revoked', () => {
+        unsubscribeFromBoardEvents();
+        closeBoardModal();
+        alert('You no longer have access to this board.');
+        location.reload();
+    });
+}
+
+function unsubscribeFromBoardEvents() {
+    if (boardEvents) {
+        boardEvents.close();
+        boardEvents = null;
+    }
+}
+
+// Re-fetch the board only when live updates are not delivering our own changes
+function refreshBoard() {
+    if (!boardEvents || boardEvents.readyState !== EventSource.OPEN) {
+        openBoard(currentBoardId);
+    }
+}
+
+function comparePositions(a, b) {
+    if (a.position !== b.position) {
+        return a.position < b.position ? -1 : 1;
+    }
+    return a.id - b.id;
+}
+
+function applyBoardChanges(changes) {
+    const board = currentBoardData;
+    if (!board || changes.board_id !== board.id || changes.version <= board.version) {
+        return;
+    }
+
+    const deletedLists = new Set(changes.lists.deleted);
+    board.lists = board.lists.filter(list => !deletedLists.has(list.id));
+    changes.lists.upserted.forEach(list => {
+        const existing = board.lists.find(item => item.id === list.id);
+        if (existing) {
+            Object.assign(existing, list);
+        } else {
+            board.lists.push({ ...list, cards: [] });
+        }
+    });
+    board.lists.sort(comparePositions);
+
+    // Upserted cards may have moved, so take them out everywhere and re-insert
+    const touchedCards = new Set(changes.cards.deleted.concat(changes.cards.upserted.map(card => card.id)));
+    board.lists.forEach(list => {
+        list.cards = list.cards.filter(card => !touchedCards.has(card.id));
+    });
+    changes.cards.upserted.forEach(card => {
+        const list = board.lists.find(item => item.id === card.list_id);
+        // Past the loaded window of a long list it arrives with the next page instead
+        const lastLoaded = list && list.next_cursor ? list.cards[list.cards.length - 1] : null;
+        if (list && !(lastLoaded && comparePositions(card, lastLoaded) > 0)) {
+            list.cards.push(card);
+        }
+    });
+
+    const updatedLabels = new Map(changes.labels.upserted.map(label => [label.id, label]));
+    const deletedLabels = new Set(changes.labels.deleted);
+    if (board.labels) {
+        board.labels = board.labels.filter(label => !deletedLabels.has(label.id) && !updatedLabels.has(label.id))
+            .concat(changes.labels.upserted)
+            .sort((a, b) => a.id - b.id);
+    }
+    board.lists.forEach(list => {
+        list.cards.sort(comparePositions);
+        list.cards.forEach(card => {
+            if (card.label_ids) {
+                card.label_ids = card.label_ids.filter(id => !deletedLabels.has(id));
+            }
+            if (card.labels) {
+                card.labels = card.labels
+                    .filter(label => !deletedLabels.has(label.id))
+                    .map(label => updatedLabels.has(label.id) ? { ...label, ...updatedLabels.get(label.id) } : label);
+            }
+        });
+    });
+
+    const deletedMembers = new Set(changes.members.deleted);
+    board.members = board.members.filter(member => !deletedMembers.has(member.id));
+    changes.members.upserted.forEach(member => {
+        const existing = board.members.find(item => item.id === member.id);
+        if (existing) {
+            Object.assign(existing, member);
+        } else {
+            board.members.push(member);
+        }
+    });
+
+    board.version = changes.version;
+    renderCurrentBoardLists();
+}
+
+// Redraw lists and members from currentBoardData, unless the user is dragging or editing
+function renderCurrentBoardLists() {
+    const container = document.getElementById('lists-container');
+    if (!container || draggedCard || draggedList) {
+        return;
+    }
+    const active = document.activeElement;
+    if (active && container.contains(active) && (active.isContentEditable || ['INPUT', 'TEXTAREA'].includes(active.tagName))) {
+        return;
+    }
+
+    const addListForm = document.getElementById('add-list-form');
+    const addListButton = container.querySelector('.add-list-button');
+    const scrollTops = {};
+    container.querySelectorAll('.cards-container').forEach(cards => {
+        scrollTops[cards.id] = cards.scrollTop;
+    });
+    container.innerHTML = renderLists(currentBoardData.lists || []);
+    container.appendChild(addListForm);
+    container.appendChild(addListButton);
+    container.querySelectorAll('.cards-container').forEach(cards => {
+        cards.scrollTop = scrollTops[cards.id] || 0;
+    });
+
+    const membersList = document.querySelector('.board-members-bar .members-list');
+    if (membersList) {
+        membersList.innerHTML = `
+            <span class="members-label">Members:</span>
+            ${renderMembersPreview(currentBoardData.members, currentBoardData.owner)}
+        `;
+    }
+    initializeDragAndDrop();
+    observeMoreCards();
+}
+
+// Long lists load in windows: the board comes with the first cards of each
+// list and the rest follow a page at a time as the list scrolls into view
+const BOARD_CARDS_WINDOW = 50;
+let moreCardsObserver = null;
+const loadingCardLists = new Set();
+
+function renderMoreCardsSentinel(list) {
+    return list.next_cursor ? `<div class="load-more-cards" data-list-id="${list.id}">Loading more cards...</div>` : '';
+}
+
+function observeMoreCards() {
+    if (moreCardsObserver) {
+        moreCardsObserver.disconnect();
+    }
+    const sentinels = document.querySelectorAll('.load-more-cards');
+    if (!window.IntersectionObserver) {
+        sentinels.forEach(sentinel => {
+            sentinel.textContent = 'Load more cards';
+            sentinel.addEventListener('click', () => loadMoreCards(parseInt(sentinel.getAttribute('data-list-id'))));
+        });
+        return;
+    }
+    moreCardsObserver = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                loadMoreCards(parseInt(entry.target.getAttribute('data-list-id')));
+            }
+        });
+    }, { rootMargin: '200px' });
+    sentinels.forEach(sentinel => moreCardsObserver.observe(sentinel));
+}
+
+function loadMoreCards(listId) {
+    const list = currentBoardData && currentBoardData.lists.find(item => item.id === listId);
+    if (!list || !list.next_cursor || loadingCardLists.has(listId)) {
+        return;
+    }
+    loadingCardLists.add(listId);
+    const boardId = currentBoardData.id;
+
+    fetch(`/api/lists/${listId}/cards?after=${encodeURIComponent(list.next_cursor)}&limit=${BOARD_CARDS_WINDOW}&fields=summary`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(page => {
+            if (!currentBoardData || currentBoardData.id !== boardId) {
+                return;
+            }
+            // Live updates may already have delivered some of these
+            const known = new Set(list.cards.map(card => card.id));
+            const cards = page.cards.filter(card => !known.has(card.id));
+            list.cards = list.cards.concat(cards);
+            list.next_cursor = page.next_cursor;
+
+            const sentinel = document.querySelector(`.load-more-cards[data-list-id="${listId}"]`);
+            if (!sentinel) {
+                return;
+            }
+            const fragment = document.createElement('div');
+            fragment.innerHTML = cards.length ? renderCards(cards, listId) : '';
+            fragment.querySelectorAll('.card').forEach(card => {
+                card.addEventListener('dragstart', handleCardDragStart);
+                card.addEventListener('dragend', handleCardDragEnd);
+                sentinel.parentNode.insertBefore(card, sentinel);
+            });
+            if (list.next_cursor) {
+                if (moreCardsObserver) {
+                    // Observing afresh reports it again if still in view, loading the next page
+                    moreCardsObserver.unobserve(sentinel);
+                    moreCardsObserver.observe(sentinel);
+                }
+            } else {
+                sentinel.remove();
+            }
+        })
+        .catch(error => {
+            console.error('Error loading cards:', error);
+        })
+        .finally(() => {
+            loadingCardLists.delete(listId);
+        });
+}
+
+// Lists whose cards are only partly loaded; reordering them keeps the unloaded rest in place
+function partiallyLoadedListIds(listIds) {
+    return listIds.filter(listId => {
+        const list = currentBoardData && currentBoardData.lists.find(item => item.id === parseInt(listId));
+        return list && list.next_cursor;
+    }).map(listId => parseInt(listId));
+}
+
 function renderBoardView(board) {
     console.log('Rendering board view for:', board.title);
     return `
@@ -240,6 +508,7 @@ function renderLists(lists) {
             </div>
             <div class="cards-container" id="cards-container-${list.id}">
                 ${renderCards(list.cards || [], list.id)}
+                ${renderMoreCardsSentinel(list)}
                 
                 <!-- Add Card Form (initially hidden) -->
                 <div class="add-card-form" id="add-card-form-${list.id}" style="display: none;">
@@ -509,7 +778,7 @@ function addSelectedUserToBoard() {
         document.getElementById('board-settings-modal').style.display = 'none';
         
         // Refresh board view
-        openBoard(currentBoardId);
+        refreshBoard();
     })
     .catch(error => {
         console.error('Error adding user to board:', error);
@@ -652,7 +921,7 @@ function saveCardDetails(cardId) {
     .then(updatedCard => {
         console.log('Card updated successfully:', updatedCard);
         closeCardModal();
-        openBoard(currentBoardId);
+        refreshBoard();
     })
     .catch(error => {
         console.error('Error updating card:', error);
@@ -778,14 +1047,14 @@ function handleDrop(e) {
     target.classList.remove('drag-over', 'card-drag-over');
     
     if (draggedCard) {
-        handleCardDrop(target, draggedCard);
+        handleCardDrop(target, draggedCard, e.clientY);
     } else if (draggedList) {
         handleListDrop(target, draggedList);
     }
     return false;
 }
 
-function handleCardDrop(target, draggedCard) {
+function handleCardDrop(target, draggedCard, dropY) {
     const cardId = draggedCard.getAttribute('data-card-id');
     let targetListId = null;
     
@@ -798,34 +1067,64 @@ function handleCardDrop(target, draggedCard) {
     if (!targetListId) return;
     
     const originalListId = draggedCard.getAttribute('data-list-id');
+    const container = document.getElementById(`cards-container-${targetListId}`);
     
+    // Insert before the first card whose middle is below the drop point
+    const siblings = Array.from(container.querySelectorAll('.card')).filter(card => card !== draggedCard);
+    const nextCard = siblings.find(card => {
+        const rect = card.getBoundingClientRect();
+        return dropY < rect.top + rect.height / 2;
+    });
+    const emptyZone = container.querySelector('.drop-zone-empty');
+    if (emptyZone) {
+        emptyZone.remove();
+    }
+    container.insertBefore(draggedCard, nextCard || container.querySelector('.load-more-cards') || document.getElementById(`add-card-form-${targetListId}`));
+    draggedCard.setAttribute('data-list-id', targetListId);
+    
+    console.log(`Moving card ${cardId} from list ${originalListId} to list ${targetListId}`);
+    
+    const cards = {};
+    cards[targetListId] = getCardIdsInList(targetListId);
     if (targetListId !== originalListId) {
-        console.log(`Moving card ${cardId} from list ${originalListId} to list ${targetListId}`);
-        
-        fetch(`/api/cards/${cardId}`, {
-            method: 'PUT',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                list_id: parseInt(targetListId)
-            })
-        })
-        .then(response => {
-            if (!response.ok) {
-                throw new Error('Failed to move card');
-            }
-            return response.json();
-        })
-        .then(data => {
-            console.log('Card moved successfully');
-            openBoard(currentBoardId);
-        })
-        .catch(error => {
-            console.error('Error moving card:', error);
-            alert('Error moving card: ' + error.message);
-        });
+        cards[originalListId] = getCardIdsInList(originalListId);
+    }
+    const order = { cards: cards };
+    const partialLists = partiallyLoadedListIds(Object.keys(cards));
+    if (partialLists.length) {
+        order.partial_lists = partialLists;
     }
+    saveBoardOrder(order);
+}
+
+function getCardIdsInList(listId) {
+    const container = document.getElementById(`cards-container-${listId}`);
+    return Array.from(container.querySelectorAll('.card')).map(card => parseInt(card.getAttribute('data-card-id')));
+}
+
+// Persist a new ordering of lists and/or cards with a single request
+function saveBoardOrder(order) {
+    return fetch(`/api/boards/${currentBoardId}/order`, {
+        method: 'PATCH',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(order)
+    })
+    .then(response => {
+        if (!response.ok) {
+            throw new Error('Failed to save order');
+        }
+        return response.json();
+    })
+    .then(result => {
+        console.log('Board order saved:', result);
+    })
+    .catch(error => {
+        console.error('Error saving order:', error);
+        alert('Error saving order: ' + error.message);
+        openBoard(currentBoardId);
+    });
 }
 
 function handleListDrop(target, draggedList) {
@@ -852,13 +1151,10 @@ function updateListPositions() {
     const listsContainer = document.getElementById('lists-container');
     const lists = listsContainer.querySelectorAll('.list:not(.add-list-form):not(.add-list-button)');
     
-    const updates = Array.from(lists).map((list, index) => {
-        const listId = list.getAttribute('data-list-id');
-        console.log(`List ${listId} new position: ${index}`);
-        return { listId, position: index };
-    });
+    const listIds = Array.from(lists).map(list => parseInt(list.getAttribute('data-list-id')));
     
-    console.log('List position updates:', updates);
+    console.log('List order:', listIds);
+    saveBoardOrder({ lists: listIds });
 }
 
 // List Management Functions
@@ -924,7 +1220,7 @@ function createList() {
     .then(newList => {
         console.log('List created successfully:', newList);
         hideAddListForm();
-        openBoard(currentBoardId);
+        refreshBoard();
     })
     .catch(error => {
         console.error('Error creating list:', error);
@@ -993,7 +1289,7 @@ function createCard(listId) {
     .then(newCard => {
         console.log('Card created successfully:', newCard);
         hideAddCardForm(listId);
-        openBoard(currentBoardId);
+        refreshBoard();
     })
     .catch(error => {
         console.error('Error creating card:', error);
@@ -1012,6 +1308,7 @@ function updateListTitle(listId, newTitle) {
 
 function closeBoardModal() {
     console.log('Closing board modal');
+    unsubscribeFromBoardEvents();
     const boardModal = document.getElementById('board-modal');
     if (boardModal) {
         boardModal.style.display = 'none';
@@ -1096,7 +1393,7 @@ function deleteList(listId) {
         })
         .then(data => {
             console.log('List deleted successfully');
-            openBoard(currentBoardId);
+            refreshBoard();
         })
         .catch(error => {
             console.error('Error deleting list:', error);
@@ -1120,7 +1417,7 @@ function deleteCard(cardId) {
         })
         .then(data => {
             console.log('Card deleted successfully');
-            openBoard(currentBoardId);
+            refreshBoard();
         })
         .catch(error => {
             console.error('Error deleting card:', error);
@@ -1129,6 +1426,63 @@ function deleteCard(cardId) {
     }
 }
 
+// Dashboard pagination: further pages come from /api/boards as JSON
+function renderBoardTile(board) {
+    return `
+        <div class="board-card" data-board-id="${board.id}">
+            <h3>${escapeHtml(board.title)}</h3>
+            <p class="board-description">${escapeHtml(board.description) || 'No description'}</p>
+            <div class="board-meta">
+                <span class="board-owner">Owner: ${board.is_owner ? 'You' : escapeHtml(board.owner.username)}</span>
+                ${board.member_count ? `<span class="board-members">👥 ${board.member_count} members</span>` : ''}
+            </div>
+            <div class="board-stats">
+                <span>${board.list_count} lists</span>
+                <span>${board.card_count} cards</span>
+                ${board.overdue_count ? `<span class="board-overdue">${board.overdue_count} overdue</span>` : ''}
+            </div>
+            <div class="board-actions">
+                <button class="btn-open-board" data-board-id="${board.id}">Open</button>
+                ${board.is_owner ? `<button class="btn-delete-board" data-board-id="${board.id}">Delete</button>` : ''}
+            </div>
+        </div>
+    `;
+}
+
+function loadMoreBoards() {
+    const button = document.getElementById('load-more-boards');
+    const cursor = button.getAttribute('data-cursor');
+    const sort = button.getAttribute('data-sort');
+    button.disabled = true;
+    
+    fetch(`/api/boards?sort=${encodeURIComponent(sort)}&cursor=${encodeURIComponent(cursor)}`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Failed to load boards');
+            }
+            return response.json();
+        })
+        .then(data => {
+            const page = document.createElement('div');
+            page.innerHTML = data.boards.map(renderBoardTile).join('');
+            bindBoardCardButtons(page);
+            const grid = document.getElementById('boards-grid');
+            while (page.firstElementChild) {
+                grid.appendChild(page.firstElementChild);
+            }
+            if (data.next_cursor) {
+                button.setAttribute('data-cursor', data.next_cursor);
+                button.disabled = false;
+            } else {
+                button.parentElement.remove();
+            }
+        })
+        .catch(error => {
+            console.error('Error loading boards:', error);
+            button.disabled = false;
+        });
+}
+
 function escapeHtml(unsafe) {
     if (!unsafe) return '';
     return unsafe
@@ -1168,6 +1522,7 @@ function renderCardAttachments(attachments) {
                             <button onclick="event.stopPropagation(); deleteAttachment(${attachment.id})" 
                                     class="btn-delete-attachment" title="Delete">×</button>
                         </div>
+                        ${renderAttachmentPreview(attachment)}
                     </div>
                 `).join('')}
             </div>
@@ -1175,6 +1530,24 @@ function renderCardAttachments(attachments) {
     `;
 }
 
+// Images show their thumbnail; audio and video play in place, and the
+// browser fetches only the byte ranges it needs
+function renderAttachmentPreview(attachment) {
+    const src = `${attachment.download_url}?inline=1`;
+    if (attachment.thumbnail_url) {
+        return `<a class="attachment-preview-link" href="${src}" target="_blank" onclick="event.stopPropagation()">
+            <img class="attachment-preview" src="${attachment.thumbnail_url}" alt="${escapeHtml(attachment.filename)}" loading="lazy">
+        </a>`;
+    }
+    if (attachment.mime_type && attachment.mime_type.startsWith('video/')) {
+        return `<video class="attachment-preview" src="${src}" controls preload="metadata"></video>`;
+    }
+    if (attachment.mime_type && attachment.mime_type.startsWith('audio/')) {
+        return `<audio class="attachment-preview" src="${src}" controls preload="metadata"></audio>`;
+    }
+    return '';
+}
+
 function formatFileSize(bytes) {
     if (bytes === 0) return '0 Bytes';
     const k = 1024;
@@ -1239,37 +1612,30 @@ function handleFileUpload(event) {
     
     console.log('Uploading file:', file.name, 'to card:', cardId);
     
-    // Validate file size (16MB limit)
-    if (file.size > 16 * 1024 * 1024) {
-        alert('File too large. Maximum size is 16MB.');
+    // Validate file size (1GB limit)
+    if (file.size > 1024 * 1024 * 1024) {
+        alert('File too large. Maximum size is 1GB.');
         return;
     }
     
-    const formData = new FormData();
-    formData.append('file', file);
-    
     // Show upload progress
     const uploadArea = document.querySelector('.file-upload-area');
     if (uploadArea) {
         uploadArea.innerHTML = `
             <div class="upload-progress">
-                <div class="upload-text">Uploading ${file.name}...</div>
+                <div class="upload-text">Uploading ${escapeHtml(file.name)}...</div>
                 <div class="progress-bar">
-                    <div class="progress-fill"></div>
+                    <div class="progress-fill" style="width: 0%"></div>
                 </div>
             </div>
         `;
     }
     
-    fetch(`/api/cards/${cardId}/attachments`, {
-        method: 'POST',
-        body: formData
-    })
-    .then(response => {
-        if (!response.ok) {
-            throw new Error('Upload failed');
+    uploadFileInChunks(cardId, file, fraction => {
+        const progressFill = document.querySelector('.file-upload-area .progress-fill');
+        if (progressFill) {
+            progressFill.style.width = `${Math.round(fraction * 100)}%`;
         }
-        return response.json();
     })
     .then(attachment => {
         console.log('File uploaded successfully:', attachment);
@@ -1288,13 +1654,91 @@ function handleFileUpload(event) {
                 <div class="file-upload-prompt">
                     <div class="upload-icon">📎</div>
                     <div class="upload-text">Click to upload or drag and drop</div>
-                    <div class="upload-hint">Max file size: 16MB</div>
+                    <div class="upload-hint">Max file size: 1GB</div>
                 </div>
             `;
         }
     });
 }
 
+// Chunked, resumable upload: start a session, PUT each chunk at the offset
+// the server holds, then complete it into an attachment
+const UPLOAD_MAX_RETRIES = 5;
+// Files up to this size are hashed first, so the server can check it received them intact
+const UPLOAD_HASH_LIMIT = 64 * 1024 * 1024;
+
+function hashFile(file) {
+    if (file.size > UPLOAD_HASH_LIMIT || !window.crypto || !window.crypto.subtle) {
+        return Promise.resolve(null);
+    }
+    return file.arrayBuffer()
+        .then(buffer => crypto.subtle.digest('SHA-256', buffer))
+        .then(digest => Array.from(new Uint8Array(digest)).map(byte => byte.toString(16).padStart(2, '0')).join(''))
+        .catch(() => null);
+}
+
+function uploadFileInChunks(cardId, file, onProgress) {
+    return hashFile(file)
+    .then(sha256 => fetch(`/api/cards/${cardId}/uploads`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            filename: file.name,
+            size: file.size,
+            mime_type: file.type || null,
+            sha256: sha256
+        })
+    }))
+    .then(response => response.json().then(data => {
+        if (!response.ok) {
+            throw new Error(data.error || 'Upload failed');
+        }
+        return sendUploadChunks(file, data, data.offset, 0, onProgress)
+            .then(upload => fetch(`${upload.upload_url}/complete`, { method: 'POST' }))
+            .then(response => response.json().then(data => {
+                if (!response.ok) {
+                    throw new Error(data.error || 'Upload failed');
+                }
+                return data;
+            }));
+    }));
+}
+
+function sendUploadChunks(file, upload, offset, failures, onProgress) {
+    onProgress(file.size ? offset / file.size : 1);
+    if (offset >= file.size) {
+        return Promise.resolve(upload);
+    }
+    
+    const end = Math.min(offset + upload.chunk_size, file.size);
+    return fetch(`${upload.upload_url}?offset=${offset}`, {
+        method: 'PUT',
+        headers: {
+            'Content-Type': 'application/octet-stream',
+        },
+        body: file.slice(offset, end)
+    })
+    .then(response => response.json().then(data => ({ response, data })))
+    .catch(error => ({ error }))
+    .then(({ response, data, error }) => {
+        if (response && response.ok) {
+            return sendUploadChunks(file, upload, data.offset, 0, onProgress);
+        }
+        
+        // Dropped connections and offset mismatches resume from the server's offset
+        const serverOffset = data && data.offset !== undefined ? data.offset : null;
+        const retryable = error || (serverOffset !== null && response.status !== 413);
+        if (!retryable || failures >= UPLOAD_MAX_RETRIES) {
+            throw error || new Error(data.error || 'Upload failed');
+        }
+        console.log(`Upload interrupted at ${offset} bytes, retrying`);
+        return new Promise(resolve => setTimeout(resolve, 1000 * (failures + 1)))
+            .then(() => sendUploadChunks(file, upload, serverOffset !== null ? serverOffset : offset, failures + 1, onProgress));
+    });
+}
+
 // Update the renderCardDetails function to include file attachments
 function renderCardDetails(card) {
     const dueDate = card.due_date ? new Date(card.due_date).toISOString().split('T')[0] : '';
@@ -1336,7 +1780,7 @@ function renderCardDetails(card) {
                             <div class="file-upload-prompt">
                                 <div class="upload-icon">📎</div>
                                 <div class="upload-text">Click to upload or drag and drop</div>
-                                <div class="upload-hint">Max file size: 16MB</div>
+                                <div class="upload-hint">Max file size: 1GB</div>
                             </div>
                         </div>
                         
@@ -1836,7 +2280,7 @@ function renderCardDetails(card) {
                             <div class="file-upload-prompt">
                                 <div class="upload-icon">📎</div>
                                 <div class="upload-text">Click to upload or drag and drop</div>
-                                <div class="upload-hint">Max file size: 16MB</div>
+                                <div class="upload-hint">Max file size: 1GB</div>
                             </div>
                         </div>
                         
@@ -2358,7 +2802,7 @@ function renderCardDetails(card) {
                             <div class="file-upload-prompt">
                                 <div class="upload-icon">📎</div>
                                 <div class="upload-text">Click to upload or drag and drop</div>
-                                <div class="upload-hint">Max file size: 16MB</div>
+                                <div class="upload-hint">Max file size: 1GB</div>
                             </div>
                         </div>
                         
@@ -2385,43 +2829,83 @@ function renderCards(cards, listId) {
         return '<div class="drop-zone-empty">Drop cards here</div>';
     }
     
-    return cards.map(card => `
+    return cards.map(card => {
+        const labels = cardLabels(card);
+        const attachmentCount = cardAttachmentCount(card);
+        return `
         <div class="card" data-card-id="${card.id}" data-list-id="${listId}" draggable="true" onclick="openCardDetails(${card.id})">
-            ${card.labels && card.labels.length > 0 ? `
+            ${labels.length > 0 ? `
                 <div class="card-labels-preview">
-                    ${card.labels.map(label => `
+                    ${labels.map(label => `
                         <span class="card-label-preview" style="background-color: ${label.color}" title="${escapeHtml(label.name)}"></span>
                     `).join('')}
                 </div>
             ` : ''}
+            ${renderCardCover(card)}
             <div class="card-content">
                 ${card.due_date ? renderDueDate(card.due_date) : ''}
                 <div class="card-title">${escapeHtml(card.title)}</div>
-                ${card.description ? `<div class="card-description">${escapeHtml(card.description)}</div>` : ''}
                 ${renderCardBadges(card)}
-                ${card.attachments && card.attachments.length > 0 ? `
+                ${attachmentCount > 0 ? `
                     <div class="card-attachment-badge">
-                        📎 ${card.attachments.length}
+                        📎 ${attachmentCount}
                     </div>
                 ` : ''}
-                <div class="card-meta">
-                    <div class="card-creator">
-                        Created by: ${escapeHtml(card.created_by.username)}
+                ${card.created_by ? `
+                    <div class="card-meta">
+                        <div class="card-creator">
+                            Created by: ${escapeHtml(card.created_by.username)}
+                        </div>
                     </div>
-                </div>
+                ` : ''}
             </div>
             <div class="card-actions">
                 <button onclick="event.stopPropagation(); deleteCard(${card.id})" class="btn-delete-card" title="Delete card">×</button>
             </div>
         </div>
-    `).join('');
+    `;
+    }).join('');
+}
+
+// Board cards come as compact summaries (label_ids, attachment_count, ...);
+// these also accept the full card shape
+function cardLabels(card) {
+    if (card.labels) {
+        return card.labels;
+    }
+    const boardLabels = new Map(((currentBoardData && currentBoardData.labels) || []).map(label => [label.id, label]));
+    return (card.label_ids || []).map(id => boardLabels.get(id)).filter(Boolean);
+}
+
+function cardAttachmentCount(card) {
+    return card.attachment_count !== undefined ? card.attachment_count : (card.attachments || []).length;
+}
+
+function cardChecklistProgress(card) {
+    if (card.checklist_progress !== undefined) {
+        return card.checklist_progress;
+    }
+    if (!card.checklists || card.checklists.length === 0) {
+        return null;
+    }
+    return {
+        completed: card.checklists.reduce((sum, cl) => sum + cl.completed_count, 0),
+        total: card.checklists.reduce((sum, cl) => sum + cl.total_count, 0)
+    };
+}
+
+// The first image attachment's thumbnail, a few KB instead of the full file
+function renderCardCover(card) {
+    const cover = card.cover_url !== undefined ? card.cover_url
+        : ((card.attachments || []).find(attachment => attachment.thumbnail_url) || {}).thumbnail_url;
+    return cover ? `<img class="card-cover" src="${cover}" alt="" loading="lazy">` : '';
 }
 
 // Update renderCardBadges to include label badge
 function renderCardBadges(card) {
     const badges = [];
     
-    if (card.description) {
+    if (card.has_description || card.description) {
         badges.push('<span class="card-badge description-badge" title="Has description">📝</span>');
     }
     
@@ -2429,18 +2913,19 @@ function renderCardBadges(card) {
         badges.push('<span class="card-badge due-date-badge" title="Has due date">📅</span>');
     }
     
-    if (card.attachments && card.attachments.length > 0) {
-        badges.push(`<span class="card-badge attachment-badge" title="${card.attachments.length} attachment${card.attachments.length !== 1 ? 's' : ''}">📎</span>`);
+    const attachmentCount = cardAttachmentCount(card);
+    if (attachmentCount > 0) {
+        badges.push(`<span class="card-badge attachment-badge" title="${attachmentCount} attachment${attachmentCount !== 1 ? 's' : ''}">📎</span>`);
     }
     
-    if (card.checklists && card.checklists.length > 0) {
-        const totalItems = card.checklists.reduce((sum, cl) => sum + cl.total_count, 0);
-        const completedItems = card.checklists.reduce((sum, cl) => sum + cl.completed_count, 0);
-        badges.push(`<span class="card-badge checklist-badge" title="${completedItems}/${totalItems} checklist items completed">✅</span>`);
+    const progress = cardChecklistProgress(card);
+    if (progress) {
+        badges.push(`<span class="card-badge checklist-badge" title="${progress.completed}/${progress.total} checklist items completed">✅ ${progress.completed}/${progress.total}</span>`);
     }
     
-    if (card.labels && card.labels.length > 0) {
-        badges.push(`<span class="card-badge label-badge" title="${card.labels.length} label${card.labels.length !== 1 ? 's' : ''}">🏷️</span>`);
+    const labels = cardLabels(card);
+    if (labels.length > 0) {
+        badges.push(`<span class="card-badge label-badge" title="${labels.length} label${labels.length !== 1 ? 's' : ''}">🏷️</span>`);
     }
     
     return badges.length > 0 ? `
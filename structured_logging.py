@@ -0,0 +1,185 @@
+"""JSON logging that keeps log I/O off the request path.
+
+Records are put on an in-memory queue by a ``QueueHandler`` and written to
+stdout, one JSON object per line, by a ``QueueListener`` thread. A request
+only pays for building the record; if the writer falls behind, records are
+dropped (and counted) rather than blocking the request.
+
+Each record carries the ``request_id`` of the request that logged it: the
+incoming ``X-Request-ID`` header when it is a sensible value (as set by a
+proxy), otherwise a new one, echoed back in the response's ``X-Request-ID``.
+Fields passed with ``extra={...}`` appear as keys of the JSON object.
+
+``LOG_LEVEL`` sets the level (default ``INFO``). ``LOG_SAMPLING`` keeps
+only a share of a chatty logger's records below WARNING, e.g.
+``app.board_load=0.01,live_updates=0.1``; warnings and errors are always
+kept.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+DEFAULT_LEVEL = 'INFO'
+DEFAULT_QUEUE_SIZE = 10000
+REQUEST_ID_HEADER = 'X-Request-ID'
+VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,64}$')
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'request_id'}
+
+_handler = None
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        elif record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request's id, in the thread that logged them"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random ``rate`` share of records below WARNING"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that never blocks: a full queue drops the record"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Resolve the message and traceback now, while the arguments are
+        # still current, and leave the JSON encoding to the listener thread
+        record = _detach(record, self.formatter or logging.Formatter())
+        if self.dropped:
+            record.dropped_records = self.dropped
+            self.dropped = 0
+        return record
+
+
+def _detach(record, formatter):
+    detached = logging.makeLogRecord(vars(record))
+    detached.msg = record.getMessage()
+    detached.args = None
+    if record.exc_info:
+        detached.exc_text = formatter.formatException(record.exc_info)
+    detached.exc_info = None
+    detached.stack_info = None
+    return detached
+
+
+def parse_sampling(value):
+    """``"name=rate,name=rate"`` as a dict"""
+    rates = {}
+    for part in (value or '').split(','):
+        if not part.strip():
+            continue
+        name, _, rate = part.partition('=')
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def _start_listener():
+    """(Re)start the writer thread; a forked child does not inherit the parent's"""
+    global _listener
+    _handler.queue = queue.Queue(_handler.queue.maxsize)
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(_handler.queue, stream)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure(level=None, sampling=None, queue_size=DEFAULT_QUEUE_SIZE):
+    """Route the root logger through the queue; safe to call more than once"""
+    global _handler
+    root = logging.getLogger()
+    root.setLevel((level or os.environ.get('LOG_LEVEL') or DEFAULT_LEVEL).upper())
+    if sampling is None:
+        sampling = os.environ.get('LOG_SAMPLING')
+    if not isinstance(sampling, dict):
+        sampling = parse_sampling(sampling)
+    for name, rate in sampling.items():
+        logger = logging.getLogger(name)
+        for existing in [f for f in logger.filters if isinstance(f, SamplingFilter)]:
+            logger.removeFilter(existing)
+        logger.addFilter(SamplingFilter(rate))
+
+    if _handler is not None:
+        return
+    _handler = DroppingQueueHandler(queue.Queue(queue_size))
+    _handler.addFilter(RequestIdFilter())
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+    _start_listener()
+    os.register_at_fork(after_in_child=_start_listener)
+    # Write out whatever is still queued when the process exits
+    atexit.register(_stop_listener)
+
+
+def init_app(app):
+    configure(app.config.get('LOG_LEVEL'), app.config.get('LOG_SAMPLING'))
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        g.request_id = incoming if VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+
+    @app.after_request
+    def echo_request_id(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
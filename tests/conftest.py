@@ -0,0 +1,57 @@
+"""Shared fixtures: the app on a scratch database.
+
+app.py configures its database when it is imported, so ``DATABASE_URL`` is
+pointed at a temporary SQLite file first, or at ``TEST_DATABASE_URL`` when
+that is set (for instance a local PostgreSQL; its tables are emptied after
+every test). Uploads go to the same temporary directory.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH = tempfile.mkdtemp(prefix='taskhive-tests-')
+sys.path.insert(0, ROOT)
+os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL') or f"sqlite:///{os.path.join(SCRATCH, 'test.db')}"
+os.environ.pop('METRICS_DIR', None)
+os.chdir(SCRATCH)
+
+import access  # noqa: E402
+import search_index  # noqa: E402
+from app import app as flask_app, _board_cache  # noqa: E402
+from models import db, User  # noqa: E402
+
+PASSWORD = 'secret'
+
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        if search_index.is_enabled():
+            db.session.execute(db.text('DELETE FROM search_index'))
+        db.session.commit()
+    access._cache.clear()
+    _board_cache.clear()
+
+
+@pytest.fixture
+def login(app):
+    """``login(username)`` creates the user and returns a client signed in as them"""
+    def login(username):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@example.com')
+            user.set_password(PASSWORD)
+            db.session.add(user)
+            db.session.commit()
+        client = app.test_client()
+        response = client.post('/login', data={'username': username, 'password': PASSWORD})
+        assert response.status_code == 302
+        return client
+    return login
@@ -0,0 +1,66 @@
+import metrics
+import pytest
+
+
+@pytest.fixture
+def board(login):
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    return client, board_id, list_id
+
+
+def test_batch_is_measured_as_one_request(board, monkeypatch):
+    client, _, list_id = board
+    registry = metrics.Registry()
+    monkeypatch.setattr(metrics.metrics, 'registry', registry)
+
+    response = client.post('/api/batch', json={'operations': [
+        {'method': 'POST', 'path': f'/api/lists/{list_id}/cards', 'body': {'title': 'Launch'}},
+        {'method': 'POST', 'path': '/api/cards/$0.id/checklists', 'body': {'title': 'Steps'}},
+    ]})
+    assert response.status_code == 200
+
+    endpoint = (('endpoint', 'run_batch'),)
+    counters = registry._counters
+    assert counters[('taskhive_http_requests_total', endpoint + (('method', 'POST'), ('status', '200')))] == 1
+    assert registry._histograms[('taskhive_http_request_duration_seconds', endpoint + (('method', 'POST'),))][-1] == 1
+    queries = counters[('taskhive_db_queries_total', endpoint)]
+    assert queries > 0
+    assert registry._histograms[('taskhive_db_queries_per_request', endpoint)][-2:] == [queries, 1]
+    # Every statement of the operations counts towards the batch
+    assert {dict(labels)['endpoint'] for _, labels in counters} == {'run_batch'}
+
+
+def test_missing_object_fails_the_batch_with_404(board):
+    client, _, list_id = board
+    response = client.post('/api/batch', json={'operations': [
+        {'method': 'POST', 'path': f'/api/lists/{list_id}/cards', 'body': {'title': 'Launch'}},
+        {'method': 'PUT', 'path': '/api/cards/999999', 'body': {'title': 'Gone'}},
+    ]})
+    assert response.status_code == 404
+    assert response.get_json()['index'] == 1
+    assert client.get(f'/api/lists/{list_id}/cards').get_json()['cards'] == []
+
+
+def test_missing_object_outside_a_batch_is_404(board):
+    client, _, _ = board
+    assert client.get('/api/cards/999999').status_code == 404
+    assert client.post('/api/lists/999999/cards', json={'title': 'Card'}).status_code == 404
+
+
+def test_operation_needs_a_method(board):
+    client, _, list_id = board
+    response = client.post('/api/batch', json={'operations': [
+        {'path': f'/api/lists/{list_id}/cards', 'body': {'title': 'Launch'}}
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['index'] == 0
+
+
+@pytest.mark.parametrize('body', ['x', [1], 5, None, {}, {'operations': []}])
+def test_batch_body_must_be_an_object_with_operations(board, body):
+    client, _, _ = board
+    response = client.post('/api/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'operations must be a non-empty list'}
@@ -0,0 +1,109 @@
+import io
+import os
+
+import pytest
+
+from models import db, Blob, FileAttachment
+
+CONTENT = b'shared content ' * 64
+
+
+@pytest.fixture
+def board(login):
+    """``(client, board_id, list_id, card_ids)`` of a board with two cards"""
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    card_ids = [
+        client.post(f'/api/lists/{list_id}/cards', json={'title': title}).get_json()['id']
+        for title in ('First', 'Second')
+    ]
+    return client, board_id, list_id, card_ids
+
+
+def attach(client, card_id, content=CONTENT, filename='notes.txt'):
+    response = client.post(f'/api/cards/{card_id}/attachments', data={
+        'file': (io.BytesIO(content), filename)
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()['id']
+
+
+def attach_in_chunks(client, card_id, content=CONTENT):
+    upload = client.post(f'/api/cards/{card_id}/uploads', json={'filename': 'notes.txt', 'size': len(content)}).get_json()
+    half = len(content) // 2
+    assert client.put(f"{upload['upload_url']}?offset=0", data=content[:half]).status_code == 200
+    assert client.put(f"{upload['upload_url']}?offset={half}", data=content[half:]).status_code == 200
+    response = client.post(f"{upload['upload_url']}/complete")
+    assert response.status_code == 200
+    return response.get_json()['id']
+
+
+def blobs(app):
+    with app.app_context():
+        return [(blob.ref_count, blob.path) for blob in Blob.query.all()]
+
+
+def test_same_content_is_stored_once(app, board):
+    client, _, _, (first_id, second_id) = board
+    attach(client, first_id)
+    attach_in_chunks(client, second_id)
+
+    [(ref_count, path)] = blobs(app)
+    assert ref_count == 2
+    with open(path, 'rb') as f:
+        assert f.read() == CONTENT
+    with app.app_context():
+        assert {attachment.file_path for attachment in FileAttachment.query.all()} == {path}
+
+
+def test_deleting_attachments_releases_the_blob(app, board):
+    client, _, _, (first_id, second_id) = board
+    attachment_ids = [attach(client, first_id), attach(client, second_id)]
+    [(_, path)] = blobs(app)
+
+    assert client.delete(f'/api/attachments/{attachment_ids[0]}').status_code == 200
+    assert blobs(app) == [(1, path)]
+    assert os.path.exists(path)
+
+    assert client.delete(f'/api/attachments/{attachment_ids[1]}').status_code == 200
+    assert blobs(app) == []
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize('deleted', ['card', 'list', 'board'])
+def test_cascading_deletes_release_the_blob(app, board, deleted):
+    client, board_id, list_id, (first_id, second_id) = board
+    attach(client, first_id)
+    attach(client, first_id, filename='again.txt')
+    [(_, path)] = blobs(app)
+
+    if deleted == 'card':
+        # The other card keeps the content alive
+        attach(client, second_id)
+        assert client.delete(f'/api/cards/{first_id}').status_code == 200
+        assert blobs(app) == [(1, path)]
+        assert os.path.exists(path)
+        assert client.delete(f'/api/cards/{second_id}').status_code == 200
+    else:
+        url = f'/api/lists/{list_id}' if deleted == 'list' else f'/api/boards/{board_id}'
+        assert client.delete(url).status_code == 200
+    assert blobs(app) == []
+    assert not os.path.exists(path)
+
+
+def test_rollback_puts_the_file_back(app, board):
+    client, _, _, (card_id, _) = board
+    attachment_id = attach(client, card_id)
+    [(_, path)] = blobs(app)
+
+    with app.app_context():
+        db.session.delete(db.session.get(FileAttachment, attachment_id))
+        db.session.flush()
+        assert not os.path.exists(path)
+        db.session.rollback()
+
+    assert os.path.exists(path)
+    assert blobs(app) == [(1, path)]
+    with open(path, 'rb') as f:
+        assert f.read() == CONTENT
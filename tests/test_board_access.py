@@ -0,0 +1,40 @@
+import app as app_module
+from models import db, BoardMember, User
+
+
+def remove_member_elsewhere(app, board_id, username):
+    """Remove a membership the way another worker process would, leaving this one's cache alone"""
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).one().id
+        db.session.execute(db.delete(BoardMember).where(
+            BoardMember.board_id == board_id, BoardMember.user_id == user_id
+        ))
+        app_module.record_change(board_id, 'member', user_id, 'deleted')
+        db.session.commit()
+
+
+def test_member_removed_by_another_process_loses_access_at_once(app, login):
+    alice = login('alice')
+    bob = login('bob')
+    board_id = alice.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    assert bob.get(f'/api/boards/{board_id}').status_code == 403
+    assert alice.post(f'/api/boards/{board_id}/members', json={'username': 'bob'}).status_code == 200
+
+    # Twice, so the second check is answered from the cache
+    assert bob.get(f'/api/boards/{board_id}').status_code == 200
+    assert bob.get(f'/api/boards/{board_id}/members').status_code == 200
+
+    remove_member_elsewhere(app, board_id, 'bob')
+    assert bob.get(f'/api/boards/{board_id}').status_code == 403
+    assert alice.get(f'/api/boards/{board_id}').status_code == 200
+
+
+def test_search_only_covers_current_boards(app, login):
+    alice = login('alice')
+    bob = login('bob')
+    board_id = alice.post('/api/boards', json={'title': 'Launch plan'}).get_json()['id']
+    alice.post(f'/api/boards/{board_id}/members', json={'username': 'bob'})
+    assert [board['id'] for board in bob.get('/api/search?q=launch').get_json()['boards']] == [board_id]
+
+    remove_member_elsewhere(app, board_id, 'bob')
+    assert bob.get('/api/search?q=launch').get_json().get('boards', []) == []
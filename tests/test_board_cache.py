@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture
+def board(login):
+    """``(client, ids)`` with the ids of a board holding one list and one card"""
+    client = login('alice')
+    login('bob')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    card_id = client.post(f'/api/lists/{list_id}/cards', json={'title': 'Card'}).get_json()['id']
+    return client, {'board': board_id, 'list': list_id, 'card': card_id}
+
+
+MUTATIONS = {
+    'add card': lambda client, ids: client.post(f"/api/lists/{ids['list']}/cards", json={'title': 'Another'}),
+    'edit card': lambda client, ids: client.put(f"/api/cards/{ids['card']}", json={'title': 'Renamed'}),
+    'delete card': lambda client, ids: client.delete(f"/api/cards/{ids['card']}"),
+    'add list': lambda client, ids: client.post(f"/api/boards/{ids['board']}/lists", json={'title': 'Done'}),
+    'add label': lambda client, ids: client.post(
+        f"/api/boards/{ids['board']}/labels", json={'name': 'Urgent', 'color': '#eb5a46'}
+    ),
+    'add checklist': lambda client, ids: client.post(f"/api/cards/{ids['card']}/checklists", json={'title': 'Steps'}),
+    'add member': lambda client, ids: client.post(f"/api/boards/{ids['board']}/members", json={'username': 'bob'}),
+}
+
+
+def test_repeat_read_is_not_modified(board):
+    client, ids = board
+    url = f"/api/boards/{ids['board']}"
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    repeat = client.get(url, headers={'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.data == b''
+    assert repeat.headers['ETag'] == etag
+    assert client.get(url).data == first.data
+
+
+@pytest.mark.parametrize('mutation', list(MUTATIONS))
+def test_mutation_moves_the_version_on(board, mutation):
+    client, ids = board
+    url = f"/api/boards/{ids['board']}"
+    before = client.get(url)
+    version = before.get_json()['version']
+
+    assert MUTATIONS[mutation](client, ids).status_code in (200, 201)
+
+    after = client.get(url, headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.get_json()['version'] > version
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert after.data != before.data
@@ -0,0 +1,46 @@
+import app as app_module
+import live_updates
+from models import db, BoardChange
+
+
+def test_change_log_is_pruned_and_old_versions_must_reload(app, login, monkeypatch):
+    monkeypatch.setattr(app_module, 'BOARD_CHANGE_RETENTION', 4)
+    monkeypatch.setattr(app_module, 'BOARD_CHANGE_PRUNE_INTERVAL', 2)
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    for number in range(9):
+        client.post(f'/api/lists/{list_id}/cards', json={'title': f'Card {number}'})
+
+    version = client.get(f'/api/boards/{board_id}').get_json()['version']
+    assert version == 10
+    with app.app_context():
+        versions = db.session.execute(
+            db.select(BoardChange.version).where(BoardChange.board_id == board_id)
+        ).scalars().all()
+    assert min(versions) == version - 4 + 1
+
+    response = client.get(f'/api/boards/{board_id}/changes?since={version - 4}')
+    assert response.status_code == 200
+    assert len(response.get_json()['cards']['upserted']) == 4
+
+    response = client.get(f'/api/boards/{board_id}/changes?since={version - 5}')
+    assert response.status_code == 409
+    assert response.get_json()['version'] == version
+
+
+def test_event_stream_behind_the_change_log_is_reset(app, login, monkeypatch):
+    monkeypatch.setattr(app_module, 'BOARD_CHANGE_RETENTION', 2)
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    for number in range(3):
+        client.post(f'/api/lists/{list_id}/cards', json={'title': f'Card {number}'})
+
+    behind = live_updates.Subscription(board_id, 1, 0)
+    recent = live_updates.Subscription(board_id, 1, 2)
+    with app.app_context():
+        live_updates.broker._dispatch({board_id: [behind, recent]})
+    assert behind.final_message.startswith('event: reset')
+    assert recent.final_message is None
+    assert recent.since == 4
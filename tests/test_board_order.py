@@ -0,0 +1,43 @@
+import pytest
+
+
+@pytest.fixture
+def board(login):
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_ids = [client.post(f'/api/boards/{board_id}/lists', json={'title': title}).get_json()['id']
+                for title in ('Todo', 'Done')]
+    card_ids = [client.post(f'/api/lists/{list_ids[0]}/cards', json={'title': title}).get_json()['id']
+                for title in ('One', 'Two')]
+    return client, board_id, list_ids, card_ids
+
+
+@pytest.mark.parametrize('body', [
+    {'lists': [1, '2']},
+    {'lists': [1, None]},
+    {'lists': 'abc'},
+    {'cards': ['x']},
+    {'cards': {'x': [1]}},
+    {'cards': {'1': [1, None]}},
+    {'cards': {'1': [1, '2']}},
+    {'cards': {'1': [1, 2]}, 'partial_lists': [None]},
+    ['lists'],
+])
+def test_malformed_order_is_rejected(board, body):
+    client, board_id, _, _ = board
+    response = client.patch(f'/api/boards/{board_id}/order', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_reorder_lists_and_cards(board):
+    client, board_id, list_ids, card_ids = board
+    response = client.patch(f'/api/boards/{board_id}/order', json={
+        'lists': list_ids[::-1],
+        'cards': {str(list_ids[0]): card_ids[:1], str(list_ids[1]): card_ids[1:]}
+    })
+    assert response.status_code == 200
+
+    lists = client.get(f'/api/boards/{board_id}').get_json()['lists']
+    assert [board_list['id'] for board_list in lists] == list_ids[::-1]
+    assert [[card['id'] for card in board_list['cards']] for board_list in lists] == [card_ids[1:], card_ids[:1]]
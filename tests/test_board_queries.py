@@ -0,0 +1,47 @@
+from sqlalchemy import event
+
+from models import db
+
+
+def count_queries(app, function):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        function()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return len(statements)
+
+
+def add_cards(client, list_id, label_id, count):
+    for number in range(count):
+        card = client.post(f'/api/lists/{list_id}/cards', json={'title': f'Card {number}'}).get_json()
+        client.post(f'/api/cards/{card["id"]}/labels/{label_id}')
+        checklist = client.post(f'/api/cards/{card["id"]}/checklists', json={'title': 'Steps'}).get_json()
+        client.post(f'/api/checklists/{checklist["id"]}/items', json={'text': 'Step'})
+
+
+def test_board_load_query_count_does_not_grow_with_cards(app, login):
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    label_id = client.post(f'/api/boards/{board_id}/labels', json={'name': 'Bug', 'color': '#ff0000'}).get_json()['id']
+
+    def load_board():
+        response = client.get(f'/api/boards/{board_id}')
+        assert response.status_code == 200
+        return response.get_json()
+
+    add_cards(client, list_id, label_id, 5)
+    few = count_queries(app, load_board)
+    add_cards(client, list_id, label_id, 50)
+    many = count_queries(app, load_board)
+
+    assert sum(len(board_list['cards']) for board_list in load_board()['lists']) == 55
+    assert few == many
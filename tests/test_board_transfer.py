@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+
+def import_board(client, records):
+    return client.post('/api/boards/import', data='\n'.join(json.dumps(record) for record in records))
+
+
+def test_export_imports_as_a_copy(login):
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Road map'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    label_id = client.post(f'/api/boards/{board_id}/labels', json={'name': 'Bug', 'color': '#f00'}).get_json()['id']
+    card_id = client.post(f'/api/lists/{list_id}/cards', json={'title': 'Launch'}).get_json()['id']
+    client.post(f'/api/cards/{card_id}/labels/{label_id}')
+    checklist_id = client.post(f'/api/cards/{card_id}/checklists', json={'title': 'Steps'}).get_json()['id']
+    client.post(f'/api/checklists/{checklist_id}/items', json={'text': 'Write notes'})
+
+    export = client.get(f'/api/boards/{board_id}/export')
+    assert export.status_code == 200
+    assert export.mimetype == 'application/x-ndjson'
+    response = client.post('/api/boards/import', data=export.get_data())
+    assert response.status_code == 201
+
+    def contents(board_id):
+        board = client.get(f'/api/boards/{board_id}').get_json()
+        return [(board_list['title'], [(card['title'], [label['name'] for label in card['labels']])
+                                       for card in board_list['cards']]) for board_list in board['lists']]
+
+    copy_id = response.get_json()['id']
+    assert copy_id != board_id
+    assert contents(copy_id) == contents(board_id) == [('Todo', [('Launch', ['Bug'])])]
+
+
+@pytest.mark.parametrize('color', ['red', '#12345', '#abc\n', '#000" onmouseover="x', None, 7])
+def test_import_rejects_label_colors_create_label_would(login, color):
+    client = login('alice')
+    response = import_board(client, [
+        {'type': 'board', 'title': 'Imported'},
+        {'type': 'label', 'id': 1, 'name': 'Bug', 'color': color},
+    ])
+    assert response.status_code == 400
+    assert response.get_json()['line'] == 2
+    assert client.get('/api/boards').get_json()['boards'] == []
+
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    assert client.post(f'/api/boards/{board_id}/labels', json={'name': 'Bug', 'color': color}).status_code == 400
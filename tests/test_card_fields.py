@@ -0,0 +1,84 @@
+import io
+
+import pytest
+
+SUMMARY = {
+    'id', 'title', 'position', 'due_date', 'has_description', 'label_ids',
+    'attachment_count', 'cover_url', 'checklist_progress'
+}
+
+
+@pytest.fixture
+def card(login):
+    """``(client, board_id, list_id, card_id, label_id)`` of a card with a label, an attachment and a checklist"""
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    card_id = client.post(f'/api/lists/{list_id}/cards', json={
+        'title': 'Launch', 'description': 'A long description ' * 20
+    }).get_json()['id']
+    label_id = client.post(f'/api/boards/{board_id}/labels', json={'name': 'Urgent', 'color': '#eb5a46'}).get_json()['id']
+    client.post(f'/api/cards/{card_id}/labels/{label_id}')
+    client.post(f'/api/cards/{card_id}/attachments', data={
+        'file': (io.BytesIO(b'notes'), 'notes.txt')
+    }, content_type='multipart/form-data')
+    checklist_id = client.post(f'/api/cards/{card_id}/checklists', json={'title': 'Steps'}).get_json()['id']
+    item_ids = [
+        client.post(f'/api/checklists/{checklist_id}/items', json={'text': text}).get_json()['id']
+        for text in ('Write', 'Review')
+    ]
+    client.put(f'/api/checklist-items/{item_ids[0]}', json={'is_completed': True})
+    return client, board_id, list_id, card_id, label_id
+
+
+def test_board_summary_carries_only_the_compact_fields(card):
+    client, board_id, _, card_id, label_id = card
+    board = client.get(f'/api/boards/{board_id}?fields=summary').get_json()
+    [summary] = board['lists'][0]['cards']
+    assert set(summary) == SUMMARY
+    assert summary['id'] == card_id
+    assert summary['label_ids'] == [label_id]
+    assert summary['has_description'] is True
+    assert summary['attachment_count'] == 1
+    assert summary['checklist_progress'] == {'completed': 1, 'total': 2}
+    # Label ids are resolved against the board's labels
+    assert [label['id'] for label in board['labels']] == [label_id]
+
+    # The full payload is a different representation, cached apart
+    full = client.get(f'/api/boards/{board_id}')
+    assert 'description' in full.get_json()['lists'][0]['cards'][0]
+    assert full.headers['ETag'] != client.get(f'/api/boards/{board_id}?fields=summary').headers['ETag']
+
+
+@pytest.mark.parametrize('fields, keys', [
+    ('summary', SUMMARY),
+    ('title', {'id', 'title'}),
+    ('title,description,summary', SUMMARY | {'description'}),
+])
+def test_card_fields_are_projected(card, fields, keys):
+    client, _, list_id, card_id, _ = card
+    assert set(client.get(f'/api/cards/{card_id}?fields={fields}').get_json()) == keys
+    [listed] = client.get(f'/api/lists/{list_id}/cards?fields={fields}').get_json()['cards']
+    assert set(listed) == keys
+
+
+def test_search_results_are_projected(card):
+    client, _, _, card_id, _ = card
+    [result] = client.get('/api/search?q=launch&fields=title').get_json()['cards']
+    assert result['id'] == card_id and result['title'] == 'Launch'
+    assert not {'description', 'labels', 'list', 'board', 'created_by'} & set(result)
+    assert {'score', 'highlights', 'snippet'} <= set(result)
+
+
+@pytest.mark.parametrize('url', [
+    '/api/boards/{board_id}?fields=title,secret',
+    '/api/cards/{card_id}?fields=secret',
+    '/api/lists/{list_id}/cards?fields=secret',
+    '/api/search?q=launch&fields=secret',
+    '/api/boards/{board_id}/search?q=launch&fields=secret',
+])
+def test_unknown_field_is_refused(card, url):
+    client, board_id, list_id, card_id, _ = card
+    response = client.get(url.format(board_id=board_id, list_id=list_id, card_id=card_id))
+    assert response.status_code == 400
+    assert 'secret' in response.get_json()['error']
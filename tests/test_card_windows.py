@@ -0,0 +1,69 @@
+import pytest
+
+
+@pytest.fixture
+def board(login):
+    """``(client, board_id, long_list_id, short_list_id)``: seven cards in one list, two in the other"""
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    long_id, short_id = [
+        client.post(f'/api/boards/{board_id}/lists', json={'title': title}).get_json()['id']
+        for title in ('Backlog', 'Doing')
+    ]
+    for list_id, count in ((long_id, 7), (short_id, 2)):
+        for number in range(count):
+            client.post(f'/api/lists/{list_id}/cards', json={'title': f'Card {number}'})
+    return client, board_id, long_id, short_id
+
+
+def card_ids(cards):
+    return [card['id'] for card in cards]
+
+
+def test_board_loads_a_window_of_each_list(board):
+    client, board_id, long_id, short_id = board
+    lists = client.get(f'/api/boards/{board_id}').get_json()['lists']
+    assert all('next_cursor' not in data for data in lists)
+    full = {data['id']: card_ids(data['cards']) for data in lists}
+
+    windowed = {data['id']: data for data in client.get(f'/api/boards/{board_id}?cards_limit=3').get_json()['lists']}
+    assert card_ids(windowed[long_id]['cards']) == full[long_id][:3]
+    assert windowed[long_id]['next_cursor'] is not None
+    assert card_ids(windowed[short_id]['cards']) == full[short_id]
+    assert windowed[short_id]['next_cursor'] is None
+
+
+def test_list_pages_continue_from_the_window(board):
+    client, board_id, long_id, _ = board
+    full = next(
+        card_ids(data['cards']) for data in client.get(f'/api/boards/{board_id}').get_json()['lists']
+        if data['id'] == long_id
+    )
+    window = next(
+        data for data in client.get(f'/api/boards/{board_id}?cards_limit=3').get_json()['lists']
+        if data['id'] == long_id
+    )
+
+    loaded = card_ids(window['cards'])
+    cursor = window['next_cursor']
+    while cursor:
+        page = client.get(f'/api/lists/{long_id}/cards', query_string={'after': cursor, 'limit': 3}).get_json()
+        assert page['list_id'] == long_id and len(page['cards']) <= 3
+        loaded += card_ids(page['cards'])
+        cursor = page['next_cursor']
+    assert loaded == full
+
+    first = client.get(f'/api/lists/{long_id}/cards', query_string={'limit': 100}).get_json()
+    assert card_ids(first['cards']) == full and first['next_cursor'] is None
+
+
+@pytest.mark.parametrize('url', [
+    '/api/lists/{list_id}/cards?after=not-a-cursor',
+    '/api/lists/{list_id}/cards?after=WzFd',
+    '/api/lists/{list_id}/cards?limit=0',
+    '/api/boards/{board_id}?cards_limit=0',
+    '/api/boards/{board_id}?cards_limit=many',
+])
+def test_bad_windows_are_refused(board, url):
+    client, board_id, list_id, _ = board
+    assert client.get(url.format(board_id=board_id, list_id=list_id)).status_code == 400
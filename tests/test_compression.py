@@ -0,0 +1,64 @@
+import gzip
+import io
+
+import pytest
+
+
+@pytest.fixture
+def board(login):
+    """``(client, board_id)`` of a board whose payload is well over the compression threshold"""
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    for number in range(20):
+        client.post(f'/api/lists/{list_id}/cards', json={'title': f'Card {number}', 'description': 'Details ' * 20})
+    return client, board_id
+
+
+def test_large_response_is_gzipped_with_a_weak_etag(board):
+    client, board_id = board
+    url = f'/api/boards/{board_id}'
+    plain = client.get(url, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.data) > 1024
+
+    compressed = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert int(compressed.headers['Content-Length']) == len(compressed.data) < len(plain.data)
+    assert gzip.decompress(compressed.data) == plain.data
+
+    etag = compressed.headers['ETag']
+    assert etag == f"W/{plain.headers['ETag']}"
+    revalidated = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.parametrize('accept', ['gzip;q=0', 'gzip;q=0, identity', '*;q=0, identity', 'br;q=0'])
+def test_refused_encodings_are_not_used(board, accept):
+    client, board_id = board
+    response = client.get(f'/api/boards/{board_id}', headers={'Accept-Encoding': accept})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['id'] == board_id
+
+
+def test_small_response_is_sent_as_is(app, board, monkeypatch):
+    client, board_id = board
+    size = len(client.get(f'/api/boards/{board_id}').data)
+    monkeypatch.setitem(app.config, 'COMPRESS_MIN_SIZE', size + 1)
+    response = client.get(f'/api/boards/{board_id}', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_file_downloads_are_not_compressed(board):
+    client, board_id = board
+    card_id = client.get(f'/api/boards/{board_id}').get_json()['lists'][0]['cards'][0]['id']
+    attachment = client.post(f'/api/cards/{card_id}/attachments', data={
+        'file': (io.BytesIO(b'plain text ' * 500), 'notes.txt')
+    }, content_type='multipart/form-data').get_json()
+    response = client.get(attachment['download_url'], headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == b'plain text ' * 500
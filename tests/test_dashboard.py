@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, BoardMember, User
+
+
+def board_ids(boards):
+    return [board['id'] for board in boards]
+
+
+@pytest.fixture
+def boards(app, login):
+    """A client for alice, who owns or belongs to seven boards with some activity"""
+    client = login('alice')
+    bob = login('bob')
+    shared_id = bob.post('/api/boards', json={'title': 'Shared'}).get_json()['id']
+    bob.post(f'/api/boards/{shared_id}/members', json={'username': 'alice'})
+
+    titles = ['Roadmap', 'Backlog', 'Roadmap', 'Hiring', 'Backlog', 'Ops']
+    ids = [client.post('/api/boards', json={'title': title}).get_json()['id'] for title in titles]
+    # Touch some boards so activity order differs from creation order
+    for board_id in (ids[0], ids[3], shared_id):
+        client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'})
+    return client
+
+
+def test_board_owned_and_joined_is_listed_once(app, login):
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Mine'}).get_json()['id']
+    with app.app_context():
+        alice = User.query.filter_by(username='alice').one()
+        db.session.add(BoardMember(board_id=board_id, user_id=alice.id))
+        db.session.commit()
+
+    listed = client.get('/api/boards').get_json()['boards']
+    assert board_ids(listed) == [board_id]
+    assert listed[0]['is_owner'] is True
+
+
+def test_aggregates_describe_each_board(app, login):
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_ids = [client.post(f'/api/boards/{board_id}/lists', json={'title': title}).get_json()['id'] for title in 'AB']
+    past = (datetime.utcnow() - timedelta(days=2)).isoformat()
+    future = (datetime.utcnow() + timedelta(days=2)).isoformat()
+    for due_date in (past, future, None):
+        card_id = client.post(f'/api/lists/{list_ids[0]}/cards', json={'title': 'Card'}).get_json()['id']
+        client.put(f'/api/cards/{card_id}', json={'due_date': due_date})
+
+    [board] = client.get('/api/boards').get_json()['boards']
+    assert (board['list_count'], board['card_count'], board['overdue_count']) == (2, 3, 1)
+
+
+@pytest.mark.parametrize('sort', ['activity', 'created', 'title'])
+def test_every_sort_pages_by_cursor(boards, sort):
+    client = boards
+    everything = client.get('/api/boards', query_string={'sort': sort, 'limit': 100}).get_json()
+    assert everything['next_cursor'] is None
+    expected = board_ids(everything['boards'])
+    assert len(expected) == 7
+
+    key = {'activity': 'last_activity', 'created': 'created_at', 'title': 'title'}[sort]
+    keys = [(board[key], board['id']) for board in everything['boards']]
+    assert keys == sorted(keys, reverse=sort != 'title')
+
+    paged = []
+    cursor = None
+    for _ in range(10):
+        params = {'sort': sort, 'limit': 2}
+        if cursor:
+            params['cursor'] = cursor
+        page = client.get('/api/boards', query_string=params).get_json()
+        assert len(page['boards']) <= 2
+        paged += board_ids(page['boards'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert paged == expected
+
+
+@pytest.mark.parametrize('params', [{'sort': 'members'}, {'limit': 0}, {'cursor': 'not-a-cursor'}])
+def test_bad_paging_parameters_are_refused(boards, params):
+    assert boards.get('/api/boards', query_string=params).status_code == 400
+
+
+def test_cursor_only_continues_its_own_sort(boards):
+    cursor = boards.get('/api/boards', query_string={'sort': 'activity', 'limit': 1}).get_json()['next_cursor']
+    assert boards.get('/api/boards', query_string={'sort': 'title', 'cursor': cursor}).status_code == 400
@@ -0,0 +1,72 @@
+import io
+
+import pytest
+
+from dev_proxy import OffloadProxy
+
+CONTENT = b'0123456789' * 100
+
+
+@pytest.fixture(params=['x-accel-redirect', 'x-sendfile'])
+def offload(request, app, login, monkeypatch):
+    """``(client, download_url, header)`` for an attachment downloaded in each offload mode"""
+    monkeypatch.setitem(app.config, 'ATTACHMENT_OFFLOAD', request.param)
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    card_id = client.post(f'/api/lists/{list_id}/cards', json={'title': 'Card'}).get_json()['id']
+    attachment = client.post(f'/api/cards/{card_id}/attachments', data={
+        'file': (io.BytesIO(CONTENT), 'notes.txt')
+    }, content_type='multipart/form-data').get_json()
+    header = 'X-Accel-Redirect' if request.param == 'x-accel-redirect' else 'X-Sendfile'
+    return client, attachment['download_url'], header
+
+
+def proxy(app, monkeypatch):
+    monkeypatch.setattr(app, 'wsgi_app', OffloadProxy(
+        app.wsgi_app, app.config['ATTACHMENT_OFFLOAD_PREFIX'], app.config['UPLOAD_FOLDER']
+    ))
+
+
+@pytest.fixture
+def proxied(app, monkeypatch):
+    proxy(app, monkeypatch)
+
+
+def test_app_leaves_the_body_to_the_proxy(offload):
+    client, url, header = offload
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == b''
+    assert header in response.headers
+    assert 'attachment' in response.headers['Content-Disposition']
+
+
+def test_proxy_sends_the_file(offload, proxied):
+    client, url, header = offload
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert header not in response.headers
+    assert 'attachment' in response.headers['Content-Disposition']
+
+
+def test_proxy_answers_range_requests(offload, proxied):
+    client, url, _ = offload
+    response = client.get(url, headers={'Range': 'bytes=0-9'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 0-9/{len(CONTENT)}'
+    assert response.data == CONTENT[:10]
+
+
+def test_revalidation_is_answered_without_a_redirect(app, offload, monkeypatch):
+    client, url, header = offload
+    etag = client.get(url).headers['ETag']
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert header not in response.headers
+
+    proxy(app, monkeypatch)
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
@@ -0,0 +1,63 @@
+import hashlib
+import io
+
+import pytest
+
+CONTENT = bytes(range(256)) * 4
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def download(login):
+    """``(client, download_url)`` of an attachment holding CONTENT"""
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    card_id = client.post(f'/api/lists/{list_id}/cards', json={'title': 'Card'}).get_json()['id']
+    attachment = client.post(f'/api/cards/{card_id}/attachments', data={
+        'file': (io.BytesIO(CONTENT), 'data.txt')
+    }, content_type='multipart/form-data').get_json()
+    return client, attachment['download_url']
+
+
+def test_download_is_tagged_with_the_content_hash(download):
+    client, url = download
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers['ETag'] == f'"{SHA256}"'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert 'immutable' in response.headers['Cache-Control']
+
+
+def test_range_request_gets_part_of_the_file(download):
+    client, url = download
+    response = client.get(url, headers={'Range': 'bytes=0-9'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 0-9/{len(CONTENT)}'
+    assert response.data == CONTENT[:10]
+
+
+def test_matching_etag_is_not_modified(download):
+    client, url = download
+    response = client.get(url, headers={'If-None-Match': f'"{SHA256}"'})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_unsatisfiable_range_is_refused(download):
+    client, url = download
+    response = client.get(url, headers={'Range': f'bytes={len(CONTENT) + 10}-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+
+@pytest.mark.parametrize('if_range, status, body', [
+    (f'"{SHA256}"', 206, CONTENT[10:20]),
+    ('"stale"', 200, CONTENT),
+])
+def test_range_applies_only_while_if_range_matches(download, if_range, status, body):
+    client, url = download
+    response = client.get(url, headers={'Range': 'bytes=10-19', 'If-Range': if_range})
+    assert response.status_code == status
+    assert response.data == body
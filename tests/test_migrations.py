@@ -0,0 +1,18 @@
+import pytest
+
+import database
+import migrations
+from models import db
+
+
+def test_fresh_database_upgrades_and_hot_queries_use_indexes(app):
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            pytest.skip('Plan checks are only implemented for SQLite')
+        db.drop_all()
+        migrations.schema_version.drop(db.engine, checkfirst=True)
+        database.create_tables()
+
+        migrations.upgrade()
+        assert migrations.applied_versions() == {version for version, _, _ in migrations.MIGRATIONS}
+        assert migrations.check_plans() == []
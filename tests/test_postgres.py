@@ -0,0 +1,74 @@
+"""PostgreSQL-only behaviour; run with TEST_DATABASE_URL=postgresql://... (skipped on SQLite)"""
+import json
+
+import pytest
+
+import board_transfer
+import database
+from models import db, Card, Checklist, ChecklistItem
+
+
+@pytest.fixture(autouse=True)
+def postgres_only(app):
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            pytest.skip('TEST_DATABASE_URL does not point at PostgreSQL')
+
+
+def test_engine_uses_a_bounded_pre_pinged_pool(app):
+    with app.app_context():
+        assert db.engine.pool.size() == database.DEFAULT_POOL_SIZE
+        assert db.engine.pool._pre_ping
+        # Runs under the advisory lock; a second run finds every table in place
+        database.create_tables()
+
+
+def test_board_load(app, login):
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    label_id = client.post(f'/api/boards/{board_id}/labels', json={'name': 'Bug', 'color': '#ff0000'}).get_json()['id']
+    card_id = client.post(f'/api/lists/{list_id}/cards', json={'title': 'Card', 'description': 'Text'}).get_json()['id']
+    client.post(f'/api/cards/{card_id}/labels/{label_id}')
+
+    board = client.get(f'/api/boards/{board_id}?fields=summary').get_json()
+    assert board['labels'] == [{'id': label_id, 'name': 'Bug', 'color': '#ff0000'}]
+    card, = board['lists'][0]['cards']
+    assert (card['id'], card['label_ids'], card['has_description']) == (card_id, [label_id], True)
+
+
+def test_batch_insert(app, login):
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    operations = [{'method': 'POST', 'path': f'/api/lists/{list_id}/cards', 'body': {'title': 'Launch'}},
+                  {'method': 'POST', 'path': '/api/cards/$0.id/checklists', 'body': {'title': 'Steps'}}]
+    operations += [{'method': 'POST', 'path': '/api/checklists/$1.id/items', 'body': {'text': f'Step {number}'}}
+                   for number in range(20)]
+
+    response = client.post('/api/batch', json={'operations': operations})
+    assert response.status_code == 200
+    checklist, = client.get(f"/api/cards/{response.get_json()['results'][0]['body']['id']}").get_json()['checklists']
+    assert [item['text'] for item in checklist['items']] == [f'Step {number}' for number in range(20)]
+
+
+def test_import_maps_ids_across_insert_batches(app, login):
+    client = login('alice')
+    count = board_transfer.BATCH_SIZE * 2 + 500
+    lines = [{'type': 'board', 'title': 'Imported'}, {'type': 'list', 'id': 'l', 'title': 'Todo'}]
+    lines += [{'type': 'card', 'id': number, 'list_id': 'l', 'title': f'Card {number}'} for number in range(count)]
+    lines += [{'type': 'checklist', 'id': number, 'card_id': number, 'title': f'Steps {number}'} for number in range(count)]
+    lines += [{'type': 'checklist_item', 'checklist_id': number, 'text': f'Item {number}'} for number in range(count)]
+
+    response = client.post('/api/boards/import', data='\n'.join(json.dumps(line) for line in lines))
+    assert response.status_code == 201
+    assert response.get_json()['imported']['checklist_item'] == count
+
+    with app.app_context():
+        rows = db.session.execute(
+            db.select(Card.title, Checklist.title, ChecklistItem.text)
+            .join(Checklist, Checklist.card_id == Card.id)
+            .join(ChecklistItem, ChecklistItem.checklist_id == Checklist.id)
+        ).all()
+    assert len(rows) == count
+    assert all(card.split()[1] == checklist.split()[1] == item.split()[1] for card, checklist, item in rows)
@@ -0,0 +1,122 @@
+import pytest
+
+import search_index
+
+
+@pytest.fixture
+def board(login):
+    """``(client, board_id, list_id)`` of an empty board with one list"""
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    return client, board_id, list_id
+
+
+def add_card(client, list_id, title, description=''):
+    return client.post(f'/api/lists/{list_id}/cards', json={'title': title, 'description': description}).get_json()['id']
+
+
+def found(client, query, **params):
+    response = client.get('/api/search', query_string={'q': query, **params})
+    assert response.status_code == 200
+    return [card['id'] for card in response.get_json().get('cards', [])]
+
+
+def test_card_edits_and_deletes_are_searchable_at_once(board):
+    client, _, list_id = board
+    card_id = add_card(client, list_id, 'Quarterly report')
+    assert found(client, 'quarterly') == [card_id]
+
+    client.put(f'/api/cards/{card_id}', json={'title': 'Annual summary', 'description': 'for the auditors'})
+    assert found(client, 'quarterly') == []
+    assert found(client, 'annual') == [card_id]
+    assert found(client, 'auditors') == [card_id]
+
+    client.delete(f'/api/cards/{card_id}')
+    assert found(client, 'annual') == []
+
+
+def test_label_changes_are_searchable_at_once(board):
+    client, board_id, list_id = board
+    card_id = add_card(client, list_id, 'Launch')
+    label_id = client.post(f'/api/boards/{board_id}/labels', json={'name': 'Urgent', 'color': '#eb5a46'}).get_json()['id']
+    assert found(client, 'urgent') == []
+
+    client.post(f'/api/cards/{card_id}/labels/{label_id}')
+    assert found(client, 'urgent') == [card_id]
+
+    client.put(f'/api/labels/{label_id}', json={'name': 'Blocked'})
+    assert found(client, 'urgent') == []
+    assert found(client, 'blocked') == [card_id]
+
+    client.delete(f'/api/labels/{label_id}')
+    assert found(client, 'blocked') == []
+
+
+def test_checklist_changes_are_searchable_at_once(board):
+    client, _, list_id = board
+    card_id = add_card(client, list_id, 'Launch')
+    checklist_id = client.post(f'/api/cards/{card_id}/checklists', json={'title': 'Steps'}).get_json()['id']
+    item_id = client.post(f'/api/checklists/{checklist_id}/items', json={'text': 'Call the printer'}).get_json()['id']
+
+    response = client.get('/api/search', query_string={'q': 'printer'}).get_json()
+    assert [card['id'] for card in response['cards']] == [card_id]
+    assert response['cards'][0]['matching_checklist_items'][0]['item_text'] == 'Call the printer'
+
+    client.put(f'/api/checklist-items/{item_id}', json={'text': 'Book the venue'})
+    assert found(client, 'printer') == []
+    assert found(client, 'venue') == [card_id]
+
+    client.delete(f'/api/checklists/{checklist_id}')
+    assert found(client, 'venue') == []
+
+
+def test_results_are_ranked_by_bm25(board):
+    if not search_index.is_enabled():
+        pytest.skip('ranking needs the SQLite FTS5 index')
+    client, _, list_id = board
+    in_checklist = add_card(client, list_id, 'Misc')
+    checklist_id = client.post(f'/api/cards/{in_checklist}/checklists', json={'title': 'Steps'}).get_json()['id']
+    client.post(f'/api/checklists/{checklist_id}/items', json={'text': 'budget'})
+    in_description = add_card(client, list_id, 'Misc', 'budget')
+    in_title = add_card(client, list_id, 'Budget')
+
+    # Title matches weigh most, then descriptions, then checklist items
+    response = client.get('/api/search', query_string={'q': 'budget'}).get_json()
+    assert [card['id'] for card in response['cards']] == [in_title, in_description, in_checklist]
+    scores = [card['score'] for card in response['cards']]
+    assert scores == sorted(scores) and len(set(scores)) == 3
+
+
+def test_pages_cover_every_hit_once(board):
+    client, _, list_id = board
+    # Equal titles tie on score, so the id breaks the tie within a page and across pages
+    card_ids = {add_card(client, list_id, 'Alpha') for _ in range(5)}
+    card_ids |= {add_card(client, list_id, 'Misc', 'alpha ' * count) for count in range(1, 4)}
+    board_ids = {client.post('/api/boards', json={'title': f'Alpha {number}'}).get_json()['id'] for number in range(4)}
+
+    seen_cards, seen_boards = [], []
+    cursor = None
+    for _ in range(10):
+        params = {'q': 'alpha', 'limit': 3}
+        if cursor:
+            params['cursor'] = cursor
+        page = client.get('/api/search', query_string=params).get_json()
+        assert len(page['cards']) <= 3 and len(page['boards']) <= 3
+        seen_cards += [card['id'] for card in page['cards']]
+        seen_boards += [result['id'] for result in page['boards']]
+        cursor = page['next_cursor']
+        assert page['has_more'] == (cursor is not None)
+        if cursor is None:
+            break
+
+    assert len(seen_cards) == len(set(seen_cards)) and set(seen_cards) == card_ids
+    assert len(seen_boards) == len(set(seen_boards)) and set(seen_boards) == board_ids
+
+
+@pytest.mark.parametrize('params', [{'cursor': 'not-a-cursor'}, {'cursor': 'WzFd'}, {'limit': 0}])
+def test_bad_paging_parameters_are_refused(board, params):
+    client, _, list_id = board
+    add_card(client, list_id, 'Alpha')
+    response = client.get('/api/search', query_string={'q': 'alpha', **params})
+    assert response.status_code == 400
@@ -0,0 +1,156 @@
+import io
+import os
+import time
+
+import pytest
+
+import thumbnails
+from models import db, AttachmentThumbnail, Blob, FileAttachment, User
+
+pytest.importorskip('PIL')
+from PIL import Image  # noqa: E402
+
+
+def png(width=600, height=400, color=(200, 40, 40)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def board(login):
+    client = login('alice')
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    card_ids = [
+        client.post(f'/api/lists/{list_id}/cards', json={'title': title}).get_json()['id']
+        for title in ('First', 'Second')
+    ]
+    return client, board_id, card_ids
+
+
+def attach(client, card_id, content, filename='photo.png'):
+    response = client.post(f'/api/cards/{card_id}/attachments', data={
+        'file': (io.BytesIO(content), filename, 'image/png')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def stored_thumbnails(app):
+    with app.app_context():
+        return [
+            (thumbnail.sha256, thumbnail.attachment_id, thumbnail.size, thumbnail.file_path)
+            for thumbnail in AttachmentThumbnail.query.order_by(AttachmentThumbnail.size)
+        ]
+
+
+def wait_for_thumbnails(app, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not stored_thumbnails(app):
+        assert time.monotonic() < deadline, 'thumbnails were not rendered'
+        time.sleep(0.05)
+    return stored_thumbnails(app)
+
+
+def card_attachment(client, card_id):
+    return client.get(f'/api/cards/{card_id}').get_json()['attachments'][0]
+
+
+def test_an_image_is_rendered_once_for_all_its_attachments(app, board, monkeypatch):
+    client, _, (first_id, second_id) = board
+    content = png()
+    first = attach(client, first_id, content)
+    rendered = wait_for_thumbnails(app)
+
+    with app.app_context():
+        sha256 = db.session.query(Blob.sha256).scalar()
+    assert [(key, attachment_id, size) for key, attachment_id, size, _ in rendered] == [
+        (sha256, None, 128), (sha256, None, 320), (sha256, None, 800)
+    ]
+    assert all(os.path.basename(path).startswith(f'{sha256}-') for *_, path in rendered)
+
+    # A second attachment of the same content reuses them without rendering
+    monkeypatch.setattr(thumbnails, '_get_executor', lambda: pytest.fail('rendered again'))
+    second = attach(client, second_id, content, 'copy.png')
+    assert second['thumbnail_url'] == f"/api/attachments/{second['id']}/thumbnail/800"
+    assert stored_thumbnails(app) == rendered
+
+    for attachment, card_id in ((first, first_id), (second, second_id)):
+        url = card_attachment(client, card_id)['thumbnail_url']
+        assert url == f"/api/attachments/{attachment['id']}/thumbnail/800"
+        response = client.get(url)
+        assert response.status_code == 200
+        assert Image.open(io.BytesIO(response.data)).size == (600, 400)
+
+
+def test_thumbnails_are_removed_with_the_last_attachment_of_the_blob(app, board):
+    client, _, (first_id, second_id) = board
+    content = png()
+    first = attach(client, first_id, content)
+    paths = [path for *_, path in wait_for_thumbnails(app)]
+    second = attach(client, second_id, content, 'copy.png')
+
+    assert client.delete(f"/api/attachments/{first['id']}").status_code == 200
+    assert all(os.path.exists(path) for path in paths)
+    assert card_attachment(client, second_id)['thumbnail_url'] is not None
+
+    assert client.delete(f"/api/attachments/{second['id']}").status_code == 200
+    assert stored_thumbnails(app) == []
+    assert not any(os.path.exists(path) for path in paths)
+
+
+def test_payloads_link_the_thumbnail_for_their_size(app, board):
+    client, board_id, (card_id, _) = board
+    attachment = attach(client, card_id, png())
+    assert attachment['thumbnail_url'] is None
+    wait_for_thumbnails(app)
+
+    board_data = client.get(f'/api/boards/{board_id}').get_json()
+    list_data = board_data['lists'][0]
+    card = next(card for card in list_data['cards'] if card['id'] == card_id)
+    assert card['attachments'][0]['thumbnail_url'] == f"/api/attachments/{attachment['id']}/thumbnail/320"
+    assert card_attachment(client, card_id)['thumbnail_url'] == f"/api/attachments/{attachment['id']}/thumbnail/800"
+
+    cards = client.get(f"/api/lists/{list_data['id']}/cards?fields=id,cover_url").get_json()['cards']
+    assert cards[0]['cover_url'] == f"/api/attachments/{attachment['id']}/thumbnail/320"
+
+    response = client.get(f"/api/attachments/{attachment['id']}/thumbnail/320")
+    assert response.status_code == 200
+    assert Image.open(io.BytesIO(response.data)).size == (320, 213)
+
+
+def test_deleting_the_card_removes_its_thumbnails(app, board):
+    client, _, (card_id, _) = board
+    attach(client, card_id, png())
+    paths = [path for *_, path in wait_for_thumbnails(app)]
+
+    assert client.delete(f'/api/cards/{card_id}').status_code == 200
+    assert stored_thumbnails(app) == []
+    assert not any(os.path.exists(path) for path in paths)
+
+
+def test_files_from_before_the_blob_store_keep_their_own_thumbnails(app, board):
+    client, _, (card_id, _) = board
+    with app.app_context():
+        file_path = os.path.join(app.config['UPLOAD_FOLDER'], 'legacy_photo.png')
+        with open(file_path, 'wb') as f:
+            f.write(png())
+        attachment = FileAttachment(
+            filename='legacy_photo.png', original_filename='photo.png', file_path=file_path,
+            file_size=os.path.getsize(file_path), mime_type='image/png', card_id=card_id,
+            uploaded_by=User.query.filter_by(username='alice').one().id
+        )
+        db.session.add(attachment)
+        db.session.commit()
+        attachment_id = attachment.id
+        thumbnails.schedule(attachment)
+
+    rendered = wait_for_thumbnails(app)
+    assert [(key, owner) for key, owner, _, _ in rendered] == [(None, attachment_id)] * 3
+    assert card_attachment(client, card_id)['thumbnail_url'] == f'/api/attachments/{attachment_id}/thumbnail/800'
+
+    assert client.delete(f'/api/attachments/{attachment_id}').status_code == 200
+    assert stored_thumbnails(app) == []
+    assert not any(os.path.exists(path) for *_, path in rendered)
+    assert not os.path.exists(file_path)
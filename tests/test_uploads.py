@@ -0,0 +1,183 @@
+import hashlib
+import io
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import UPLOAD_CLAIM_TIMEOUT
+from models import db, UploadSession
+
+
+def make_board(client):
+    """``(board_id, list_id, card_id)`` of a new board holding one card"""
+    board_id = client.post('/api/boards', json={'title': 'Board'}).get_json()['id']
+    list_id = client.post(f'/api/boards/{board_id}/lists', json={'title': 'Todo'}).get_json()['id']
+    card_id = client.post(f'/api/lists/{list_id}/cards', json={'title': 'Card'}).get_json()['id']
+    return board_id, list_id, card_id
+
+
+def make_card(client):
+    return make_board(client)[2]
+
+
+def start(client, card_id, content, sha256=None):
+    body = {'filename': 'notes.txt', 'size': len(content)}
+    if sha256:
+        body['sha256'] = sha256
+    response = client.post(f'/api/cards/{card_id}/uploads', json=body)
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def upload(client, card_id, content, sha256=None):
+    """Run the whole chunked upload protocol in one chunk; returns the completion response"""
+    upload_url = start(client, card_id, content, sha256)['upload_url']
+    assert client.put(f'{upload_url}?offset=0', data=content).status_code == 200
+    return client.post(f'{upload_url}/complete')
+
+
+def test_knowing_a_hash_does_not_attach_the_file(login):
+    content = b'alice keeps her secrets here'
+    sha256 = hashlib.sha256(content).hexdigest()
+    alice = login('alice')
+    assert upload(alice, make_card(alice), content, sha256=sha256).status_code == 200
+
+    bob = login('bob')
+    card_id = make_card(bob)
+    response = bob.post(f'/api/cards/{card_id}/uploads', json={
+        'filename': 'stolen.txt', 'size': len(content), 'sha256': sha256
+    })
+    assert response.status_code == 201
+    data = response.get_json()
+    assert 'complete' not in data and 'attachment' not in data
+    assert data['offset'] == 0
+    assert bob.get(f'/api/cards/{card_id}/attachments').get_json() == []
+
+    # Completing without sending the bytes is refused
+    assert bob.post(f"{data['upload_url']}/complete").status_code == 409
+
+
+def set_claim(app, upload_id, writing_since):
+    with app.app_context():
+        upload = db.session.get(UploadSession, upload_id)
+        upload.writing_since = writing_since
+        db.session.commit()
+
+
+def test_only_one_request_writes_an_upload(app, login):
+    client = login('alice')
+    content = b'0123456789'
+    data = start(client, make_card(client), content)
+    url = data['upload_url']
+
+    set_claim(app, data['upload_id'], datetime.utcnow())
+    assert client.put(f'{url}?offset=0', data=content).status_code == 409
+
+    # A claim held past the timeout belongs to a writer that died
+    set_claim(app, data['upload_id'], datetime.utcnow() - UPLOAD_CLAIM_TIMEOUT - timedelta(seconds=1))
+    response = client.put(f'{url}?offset=0', data=content)
+    assert response.status_code == 200
+    assert response.get_json()['offset'] == len(content)
+    with app.app_context():
+        assert db.session.get(UploadSession, data['upload_id']).writing_since is None
+
+
+def test_checksum_is_taken_from_the_file_on_disk(app, login):
+    client = login('alice')
+    content = b'0123456789'
+    data = start(client, make_card(client), content, sha256=hashlib.sha256(content).hexdigest())
+    assert client.put(f"{data['upload_url']}?offset=0", data=content).status_code == 200
+
+    with app.app_context():
+        file_path = db.session.get(UploadSession, data['upload_id']).file_path
+    with open(file_path, 'r+b') as f:
+        f.write(b'X')
+
+    response = client.post(f"{data['upload_url']}/complete")
+    assert response.status_code == 422
+    assert response.get_json()['sha256'] == hashlib.sha256(b'X123456789').hexdigest()
+
+
+def partial_file(app, upload_id):
+    with app.app_context():
+        return db.session.get(UploadSession, upload_id).file_path
+
+
+@pytest.mark.parametrize('deleted', ['card', 'list', 'board'])
+def test_deleting_the_card_removes_partial_uploads(app, login, deleted):
+    client = login('alice')
+    board_id, list_id, card_id = make_board(client)
+    data = start(client, card_id, b'0123456789')
+    assert client.put(f"{data['upload_url']}?offset=0", data=b'01234').status_code == 200
+    file_path = partial_file(app, data['upload_id'])
+    assert os.path.exists(file_path)
+
+    url = {'card': f'/api/cards/{card_id}', 'list': f'/api/lists/{list_id}', 'board': f'/api/boards/{board_id}'}
+    assert client.delete(url[deleted]).status_code == 200
+    assert not os.path.exists(file_path)
+    assert client.get(data['upload_url']).status_code == 404
+
+
+def test_chunk_must_start_at_the_received_offset(login):
+    client = login('alice')
+    data = start(client, make_card(client), b'0123456789')
+    response = client.put(f"{data['upload_url']}?offset=5", data=b'56789')
+    assert response.status_code == 409
+    assert response.get_json()['offset'] == 0
+
+
+def test_chunk_past_the_declared_size_is_refused(login):
+    client = login('alice')
+    data = start(client, make_card(client), b'0123456789')
+    response = client.put(f"{data['upload_url']}?offset=0", data=b'0123456789X')
+    assert response.status_code == 413
+    assert client.get(data['upload_url']).get_json()['offset'] == 0
+
+
+def test_upload_resumes_after_a_dropped_connection(login):
+    client = login('alice')
+    content = b'0123456789'
+    data = start(client, make_card(client), content, sha256=hashlib.sha256(content).hexdigest())
+    url = data['upload_url']
+
+    # The body ends after four of the ten bytes it announced
+    response = client.put(f'{url}?offset=0', input_stream=io.BytesIO(content[:4]),
+                          environ_overrides={'CONTENT_LENGTH': str(len(content))})
+    assert response.status_code == 400
+    assert response.get_json()['offset'] == 4
+
+    status = client.get(url)
+    assert status.get_json()['offset'] == 4
+    assert status.headers['Upload-Offset'] == '4'
+    assert client.put(f'{url}?offset=4', data=content[4:]).status_code == 200
+
+    attachment = client.post(f'{url}/complete').get_json()
+    assert client.get(attachment['download_url']).data == content
+
+
+def test_checksum_mismatch_discards_the_upload(app, login):
+    client = login('alice')
+    card_id = make_card(client)
+    data = start(client, card_id, b'0123456789', sha256=hashlib.sha256(b'something else').hexdigest())
+    file_path = partial_file(app, data['upload_id'])
+    assert client.put(f"{data['upload_url']}?offset=0", data=b'0123456789').status_code == 200
+
+    response = client.post(f"{data['upload_url']}/complete")
+    assert response.status_code == 422
+    assert response.get_json()['sha256'] == hashlib.sha256(b'0123456789').hexdigest()
+    assert not os.path.exists(file_path)
+    assert client.get(data['upload_url']).status_code == 404
+    assert client.get(f'/api/cards/{card_id}/attachments').get_json() == []
+
+
+def test_cancel_removes_the_upload(app, login):
+    client = login('alice')
+    data = start(client, make_card(client), b'0123456789')
+    file_path = partial_file(app, data['upload_id'])
+    assert client.put(f"{data['upload_url']}?offset=0", data=b'01234').status_code == 200
+
+    assert client.delete(data['upload_url']).status_code == 200
+    assert not os.path.exists(file_path)
+    assert client.get(data['upload_url']).status_code == 404
+    assert client.put(f"{data['upload_url']}?offset=5", data=b'56789').status_code == 404
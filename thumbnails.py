@@ -0,0 +1,296 @@
+"""Thumbnails for image attachments, rendered in a background process pool.
+
+``schedule`` is called once an image attachment is committed and returns
+straight away; a worker process decodes the image with Pillow and writes
+one downscaled copy per size in ``THUMBNAIL_SIZES`` (never upscaling, so a
+small image gets fewer) under ``<UPLOAD_FOLDER>/thumbnails/``. When the
+worker is done the files are recorded as ``AttachmentThumbnail`` rows and
+``on_ready`` is called so the board's version moves on and open viewers
+pick the thumbnails up.
+
+Thumbnails belong to the content, not to the attachment: they are keyed by
+the blob's SHA-256, rendered once and shared by every attachment of that
+blob, and deleted when the blob store collects it. Only files stored
+before the blob store have thumbnails keyed by attachment id.
+
+Pillow is optional: without it, or with ``THUMBNAIL_WORKERS = 0``, nothing
+is scheduled and payloads simply carry no ``thumbnail_url``. Thumbnail files
+are removed after the commit that deletes their rows.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import db, AttachmentThumbnail, Blob, FileAttachment
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (128, 320, 800)
+DEFAULT_WORKERS = 2
+SOURCE_MIME_TYPES = {'image/png', 'image/jpeg', 'image/gif'}
+
+_app = None
+_on_ready = None
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def init_app(app, on_ready):
+    """``on_ready(attachment)`` runs, inside a transaction it must commit, once thumbnails are stored"""
+    global _app, _on_ready
+    _app = app
+    _on_ready = on_ready
+    app.config.setdefault('THUMBNAIL_SIZES', DEFAULT_SIZES)
+    app.config.setdefault('THUMBNAIL_WORKERS', DEFAULT_WORKERS)
+
+
+def enabled():
+    return Image is not None and _app is not None and _app.config['THUMBNAIL_WORKERS'] > 0
+
+
+def thumbnail_root():
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], 'thumbnails')
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Not fork: a forked worker would inherit the request threads' locks
+            # and database connections mid-use
+            _executor = ProcessPoolExecutor(
+                max_workers=_app.config['THUMBNAIL_WORKERS'],
+                mp_context=multiprocessing.get_context('forkserver')
+            )
+        return _executor
+
+
+def _discard_broken_executor(error):
+    """A worker that died (e.g. killed decoding a huge image) breaks the pool; start a new one next time"""
+    global _executor
+    if isinstance(error, BrokenExecutor):
+        with _executor_lock:
+            _executor = None
+
+
+def render(source_path, output_dir, name, sizes):
+    """Write thumbnails of an image; runs in a worker process.
+
+    Returns ``[(size, width, height, path, mime_type), ...]``, smallest first.
+    """
+    results = []
+    with Image.open(source_path) as image:
+        largest = max(sizes)
+        # Let JPEG decode straight at a reduced scale
+        image.draft('RGB', (largest, largest))
+        image.seek(0)  # First frame of an animated GIF
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        has_alpha = image.mode in ('RGBA', 'LA')
+        extension, format_name, mime_type = ('png', 'PNG', 'image/png') if has_alpha else ('jpg', 'JPEG', 'image/jpeg')
+
+        for size in sorted(sizes):
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+            path = os.path.join(output_dir, f'{name}-{size}.{extension}')
+            scratch_path = f'{path}.incoming-{uuid.uuid4().hex}'
+            if format_name == 'JPEG':
+                thumbnail.save(scratch_path, format_name, quality=82, optimize=True, progressive=True)
+            else:
+                thumbnail.save(scratch_path, format_name, optimize=True)
+            os.replace(scratch_path, path)
+            results.append((size, thumbnail.width, thumbnail.height, path, mime_type))
+            if max(image.size) <= size:
+                # Larger sizes would be identical copies
+                break
+    return results
+
+
+def schedule(attachment):
+    """Queue thumbnail rendering for a committed attachment; a no-op for non-images.
+
+    Never raises: a broken pool only costs the attachment its thumbnails.
+    """
+    if not enabled() or attachment.mime_type not in SOURCE_MIME_TYPES:
+        return None
+    attachment_id = attachment.id
+    sha256 = attachment.sha256
+    if sha256 and db.session.query(db.exists().where(_key(sha256, attachment_id))).scalar():
+        # Another attachment of the same content already has them
+        return None
+    try:
+        output_dir = thumbnail_root()
+        os.makedirs(output_dir, exist_ok=True)
+        future = _get_executor().submit(
+            render,
+            attachment.file_path,
+            output_dir,
+            sha256 or str(attachment_id),
+            tuple(_app.config['THUMBNAIL_SIZES'])
+        )
+    except Exception as e:
+        # The attachment itself is stored; it just goes without thumbnails
+        _discard_broken_executor(e)
+        logger.exception('Error scheduling thumbnails for attachment %s', attachment_id)
+        return None
+    future.add_done_callback(lambda done: _store(attachment_id, sha256, done))
+    return future
+
+
+def _key(sha256, attachment_id):
+    """Filter for the thumbnails of an attachment: its blob's, or its own for files from before the blob store"""
+    if sha256:
+        return AttachmentThumbnail.sha256 == sha256
+    return AttachmentThumbnail.attachment_id == attachment_id
+
+
+def _store(attachment_id, sha256, future):
+    try:
+        results = future.result()
+    except Exception as e:
+        _discard_broken_executor(e)
+        logger.error('Error rendering thumbnails for attachment %s: %s', attachment_id, e)
+        return
+
+    with _app.app_context():
+        try:
+            if sha256:
+                owner = db.session.get(Blob, sha256)
+                attachments = FileAttachment.query.filter_by(sha256=sha256).all()
+            else:
+                owner = db.session.get(FileAttachment, attachment_id)
+                attachments = [owner] if owner is not None else []
+            if owner is None:
+                # Deleted while rendering
+                for _, _, _, path, _ in results:
+                    if os.path.exists(path):
+                        os.remove(path)
+                return
+            existing = {size for size, in db.session.query(AttachmentThumbnail.size).filter(
+                _key(sha256, attachment_id)
+            )}
+            for size, width, height, path, mime_type in results:
+                if size not in existing:
+                    db.session.add(AttachmentThumbnail(
+                        sha256=sha256, attachment_id=None if sha256 else attachment_id, size=size,
+                        width=width, height=height, file_path=path, mime_type=mime_type
+                    ))
+            for attachment in attachments:
+                _on_ready(attachment)
+            db.session.commit()
+        except IntegrityError:
+            # Another attachment of the same content stored the same files first
+            db.session.rollback()
+        except Exception:
+            db.session.rollback()
+            logger.exception('Error storing thumbnails for attachment %s', attachment_id)
+
+
+def thumbnailed_ids(attachments):
+    """The ids of those ``attachments`` that have thumbnails, in one query per kind of key"""
+    sha256s = {attachment.sha256 for attachment in attachments if attachment.sha256}
+    legacy_ids = [attachment.id for attachment in attachments if not attachment.sha256]
+    blobs = set()
+    if sha256s:
+        blobs = {row[0] for row in db.session.query(AttachmentThumbnail.sha256).filter(
+            AttachmentThumbnail.sha256.in_(list(sha256s))
+        ).distinct()}
+    legacy = set()
+    if legacy_ids:
+        legacy = {row[0] for row in db.session.query(AttachmentThumbnail.attachment_id).filter(
+            AttachmentThumbnail.attachment_id.in_(legacy_ids)
+        ).distinct()}
+    return {
+        attachment.id for attachment in attachments
+        if (attachment.sha256 in blobs if attachment.sha256 else attachment.id in legacy)
+    }
+
+
+def cover_attachment_ids(card_ids):
+    """``{card_id: attachment_id}`` of each card's first attachment with thumbnails, in one query"""
+    if not card_ids:
+        return {}
+    card_ids = list(card_ids)
+    thumbnailed = db.union_all(
+        db.select(FileAttachment.card_id, FileAttachment.id).join(
+            AttachmentThumbnail, AttachmentThumbnail.sha256 == FileAttachment.sha256
+        ).where(FileAttachment.card_id.in_(card_ids)),
+        db.select(FileAttachment.card_id, FileAttachment.id).join(
+            AttachmentThumbnail, AttachmentThumbnail.attachment_id == FileAttachment.id
+        ).where(FileAttachment.card_id.in_(card_ids))
+    ).subquery()
+    return dict(db.session.execute(
+        db.select(thumbnailed.c.card_id, db.func.min(thumbnailed.c.id)).group_by(thumbnailed.c.card_id)
+    ).all())
+
+
+def best_thumbnail(attachment, size):
+    """The smallest thumbnail at least ``size`` across, else the largest there is"""
+    thumbnails = AttachmentThumbnail.query.filter(_key(attachment.sha256, attachment.id)).order_by(
+        AttachmentThumbnail.size
+    ).all()
+    for thumbnail in thumbnails:
+        if thumbnail.size >= size:
+            return thumbnail
+    return thumbnails[-1] if thumbnails else None
+
+
+def remove_after_commit(session, paths):
+    """Unlink thumbnail files once ``session`` commits the deletion of their rows"""
+    if paths:
+        session.info.setdefault('thumbnail_trash', []).extend(paths)
+
+
+def delete_for_blobs(session, sha256s):
+    """Delete the thumbnails of blobs being collected in the current flush"""
+    connection = session.connection()
+    condition = AttachmentThumbnail.sha256.in_(list(sha256s))
+    remove_after_commit(session, connection.execute(
+        db.select(AttachmentThumbnail.file_path).where(condition)
+    ).scalars().all())
+    connection.execute(db.delete(AttachmentThumbnail).where(condition))
+
+
+def move_to_blob(attachment):
+    """Hand a converted attachment's own thumbnails over to its blob, unless the blob has some already"""
+    if db.session.query(db.exists().where(_key(attachment.sha256, attachment.id))).scalar():
+        for thumbnail in AttachmentThumbnail.query.filter_by(attachment_id=attachment.id):
+            db.session.delete(thumbnail)
+    else:
+        db.session.execute(
+            db.update(AttachmentThumbnail).where(AttachmentThumbnail.attachment_id == attachment.id)
+            .values(sha256=attachment.sha256, attachment_id=None),
+            execution_options={'synchronize_session': False}
+        )
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_deleted_thumbnails(session, flush_context):
+    remove_after_commit(session, [obj.file_path for obj in session.deleted if isinstance(obj, AttachmentThumbnail)])
+
+
+@event.listens_for(Session, 'after_commit')
+def _unlink_deleted_thumbnails(session):
+    for path in session.info.pop('thumbnail_trash', []):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _keep_thumbnails_after_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('thumbnail_trash', None)